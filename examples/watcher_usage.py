@@ -47,8 +47,7 @@ def main():
                 print(f"   File: {file_data['filename']}")
                 print(f"   Type: {file_data['file_type']}")
                 print(f"   Size: {file_data['size_bytes']} bytes")
-                print(f"   Hash: {file_data['file_hash'][:8]}...")
-                print(f"   Text Preview: {file_data['text'][:50].replace(chr(10), ' ')}...")
+                print(f"   Path: {file_data['filepath']}")
                 print("-" * 50)
             
             time.sleep(0.5)
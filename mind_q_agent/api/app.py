@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from mind_q_agent.api.settings import settings
+from mind_q_agent.api.resources import lifespan
 from mind_q_agent.api.routers import documents, search, graph, realtime, preferences, concepts, system, chat
 
 from fastapi.routing import APIRoute
@@ -15,7 +16,8 @@ def create_app() -> FastAPI:
         description="API for Mind-Q Agent, designed for integration with n8n.",
         version="0.1.0",
         openapi_url="/api/v1/openapi.json",
-        generate_unique_id_function=custom_generate_unique_id
+        generate_unique_id_function=custom_generate_unique_id,
+        lifespan=lifespan
     )
 
     # Configure CORS
@@ -0,0 +1,284 @@
+"""
+Process-wide resource registry for the Mind-Q API.
+
+Owns exactly one embedding model, one ChromaDB client/collection and one
+KùzuDB database per process, and hands them out to routers through FastAPI
+dependency providers.
+"""
+
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+from sentence_transformers import SentenceTransformer
+
+from mind_q_agent.api.settings import settings
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
+from mind_q_agent.vector.chroma_vector import ChromaVectorDB
+from mind_q_agent.vector.embedding_cache import EmbeddingCache
+from mind_q_agent.ingestion.pipeline import IngestionPipeline
+from mind_q_agent.ingestion.runner import IngestionRunner
+from mind_q_agent.ingestion.jobs import JobStore
+from mind_q_agent.ingestion.pdf_extractor import get_pdf_extractor
+from mind_q_agent.ingestion.uploads import UploadIngestor
+from mind_q_agent.llm.registry import provider_registry
+from mind_q_agent.rag.context import ContextBuilder
+from mind_q_agent.search.engine import SearchEngine
+from mind_q_agent.search.lexical import LexicalIndex
+from mind_q_agent.search.reranker import CrossEncoderReranker
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceRegistry:
+    """
+    Lazily creates and caches shared heavyweight resources.
+
+    Every getter is thread-safe and returns the same instance for the
+    lifetime of the process (until shutdown() is called).
+    """
+
+    def __init__(
+        self,
+        kuzu_path: str,
+        chroma_path: str,
+        model_name: str,
+        embedding_cache_path: Optional[str] = None,
+        lexical_index_path: Optional[str] = None
+    ):
+        """
+        Initialize the registry (nothing is loaded until first use).
+
+        Args:
+            kuzu_path: Path to the KùzuDB database
+            chroma_path: Path to the ChromaDB directory
+            model_name: SentenceTransformer model used for all embeddings
+            embedding_cache_path: Optional SQLite file persisting computed embeddings
+            lexical_index_path: Optional SQLite file of the BM25 chunk index
+        """
+        self.kuzu_path = kuzu_path
+        self.chroma_path = chroma_path
+        self.model_name = model_name
+        self.embedding_cache_path = embedding_cache_path
+        self.lexical_index_path = lexical_index_path
+
+        self._lock = threading.RLock()
+        self._embedding_model: Optional[SentenceTransformer] = None
+        self._graph_db: Optional[KuzuGraphDB] = None
+        self._vector_db: Optional[ChromaVectorDB] = None
+        self._lexical_index: Optional[LexicalIndex] = None
+        self._pipeline: Optional[IngestionPipeline] = None
+        self._runner: Optional[IngestionRunner] = None
+        self._uploads: Optional[UploadIngestor] = None
+        self.jobs = JobStore()
+        self._search_engine: Optional[SearchEngine] = None
+        self._context_builder: Optional[ContextBuilder] = None
+
+    def get_embedding_model(self) -> SentenceTransformer:
+        """Return the shared embedding model, loading it on first use."""
+        with self._lock:
+            if self._embedding_model is None:
+                logger.info(f"Loading shared embedding model: {self.model_name}")
+                self._embedding_model = SentenceTransformer(self.model_name)
+            return self._embedding_model
+
+    def get_graph_db(self) -> KuzuGraphDB:
+        """Return the shared KùzuDB handle, opening it on first use."""
+        with self._lock:
+            if self._graph_db is None:
+                self._graph_db = KuzuGraphDB(self.kuzu_path)
+            return self._graph_db
+
+    def get_vector_db(self) -> ChromaVectorDB:
+        """Return the shared ChromaDB handle, opening it on first use."""
+        with self._lock:
+            if self._vector_db is None:
+                self._vector_db = ChromaVectorDB(
+                    self.chroma_path,
+                    model_name=self.model_name,
+                    model=self.get_embedding_model(),
+                    embedding_cache=EmbeddingCache(self.model_name, db_path=self.embedding_cache_path)
+                )
+            return self._vector_db
+
+    def get_lexical_index(self) -> LexicalIndex:
+        """Return the shared BM25 chunk index, opening it on first use."""
+        with self._lock:
+            if self._lexical_index is None:
+                self._lexical_index = LexicalIndex(self.lexical_index_path)
+            return self._lexical_index
+
+    def get_pipeline(self) -> IngestionPipeline:
+        """Return the shared ingestion pipeline."""
+        with self._lock:
+            if self._pipeline is None:
+                self._pipeline = IngestionPipeline(
+                    self.get_graph_db(), self.get_vector_db(), lexical_index=self.get_lexical_index()
+                )
+            return self._pipeline
+
+    def get_runner(self) -> IngestionRunner:
+        """Return the shared ingestion runner."""
+        with self._lock:
+            if self._runner is None:
+                self._runner = IngestionRunner(self.get_pipeline())
+            return self._runner
+
+    def get_upload_ingestor(self) -> UploadIngestor:
+        """Return the shared upload ingestor."""
+        with self._lock:
+            if self._uploads is None:
+                self._uploads = UploadIngestor(self.get_runner(), self.jobs)
+            return self._uploads
+
+    def get_search_engine(self) -> SearchEngine:
+        """Return the shared search engine."""
+        with self._lock:
+            if self._search_engine is None:
+                reranker = CrossEncoderReranker() if ConfigManager.get("search", "rerank", False) else None
+                self._search_engine = SearchEngine(
+                    self.get_vector_db(), lexical_index=self.get_lexical_index(), reranker=reranker
+                )
+            return self._search_engine
+
+    def get_context_builder(self) -> ContextBuilder:
+        """Return the shared RAG context builder."""
+        with self._lock:
+            if self._context_builder is None:
+                self._context_builder = ContextBuilder(self.get_search_engine(), self.get_graph_db())
+            return self._context_builder
+
+    def startup(self) -> None:
+        """
+        Eagerly open the databases and load the models (the reranker's too,
+        when enabled, so no search waits for it).
+
+        Failures are logged rather than raised so the API can still start;
+        the affected endpoints then report the error.
+        """
+        for name, getter in (("graph DB", self.get_graph_db), ("vector DB", self.get_vector_db)):
+            try:
+                getter()
+            except Exception as e:
+                logger.error(f"Failed to initialize {name}: {e}")
+        try:
+            self.backfill_lexical_index()
+        except Exception as e:
+            logger.error(f"Failed to build lexical index: {e}")
+        if ConfigManager.get("search", "rerank", False):
+            try:
+                self.get_search_engine().reranker.load()
+            except Exception as e:
+                logger.error(f"Failed to load reranker model: {e}")
+
+    def backfill_lexical_index(self) -> int:
+        """
+        Index the vector store's chunks when the lexical index is empty
+        (first start with an existing knowledge base).
+
+        Returns:
+            Number of chunks indexed
+        """
+        index = self.get_lexical_index()
+        vector_db = self.get_vector_db()
+        if len(index) > 0 or vector_db.count() == 0:
+            return 0
+        indexed = index.backfill(vector_db.iter_chunks())
+        logger.info(f"Lexical index built from {indexed} stored chunks")
+        return indexed
+
+    def shutdown(self) -> None:
+        """Release all resources."""
+        with self._lock:
+            if self._graph_db is not None:
+                self._graph_db.close()
+            if self._vector_db is not None:
+                self._vector_db.embedding_cache.close()
+            if self._lexical_index is not None:
+                self._lexical_index.close()
+            get_pdf_extractor().shutdown()
+            self._pipeline = None
+            self._runner = None
+            self._uploads = None
+            self._search_engine = None
+            self._context_builder = None
+            self._vector_db = None
+            self._lexical_index = None
+            self._graph_db = None
+            self._embedding_model = None
+            logger.info("Shared resources released")
+
+
+# Global instance
+registry = ResourceRegistry(
+    kuzu_path=settings.KUZU_DB_PATH,
+    chroma_path=settings.CHROMA_DB_PATH,
+    model_name=settings.EMBEDDING_MODEL,
+    embedding_cache_path=settings.EMBEDDING_CACHE_PATH,
+    lexical_index_path=settings.LEXICAL_INDEX_PATH
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """FastAPI lifespan: warm up shared resources on startup, release on shutdown."""
+    registry.startup()
+    yield
+    await provider_registry.aclose()
+    registry.shutdown()
+
+
+# Dependency Providers
+def get_graph_db() -> KuzuGraphDB:
+    try:
+        return registry.get_graph_db()
+    except Exception as e:
+        logger.error(f"Graph DB unavailable: {e}")
+        raise HTTPException(status_code=500, detail="Graph DB not initialized")
+
+
+def get_vector_db() -> ChromaVectorDB:
+    try:
+        return registry.get_vector_db()
+    except Exception as e:
+        logger.error(f"Vector DB unavailable: {e}")
+        raise HTTPException(status_code=500, detail="Vector DB not initialized")
+
+
+def get_pipeline() -> IngestionPipeline:
+    try:
+        return registry.get_pipeline()
+    except Exception as e:
+        logger.error(f"Ingestion pipeline unavailable: {e}")
+        raise HTTPException(status_code=500, detail="Ingestion pipeline not initialized")
+
+
+def get_runner() -> IngestionRunner:
+    try:
+        return registry.get_runner()
+    except Exception as e:
+        logger.error(f"Ingestion runner unavailable: {e}")
+        raise HTTPException(status_code=500, detail="Ingestion pipeline not initialized")
+
+
+def get_upload_ingestor() -> UploadIngestor:
+    try:
+        return registry.get_upload_ingestor()
+    except Exception as e:
+        logger.error(f"Upload ingestor unavailable: {e}")
+        raise HTTPException(status_code=500, detail="Ingestion pipeline not initialized")
+
+
+def get_job_store() -> JobStore:
+    return registry.jobs
+
+
+def get_search_engine() -> SearchEngine:
+    try:
+        return registry.get_search_engine()
+    except Exception as e:
+        logger.error(f"Search engine unavailable: {e}")
+        raise HTTPException(status_code=500, detail="Search engine not initialized")
@@ -29,14 +29,14 @@ async def get_converter():
     # TODO: Replace with real LLM provider injection
     # Use real Ollama Provider (qwen2.5:3b)
     from mind_q_agent.llm.config import ModelConfig
-    from mind_q_agent.llm.providers.ollama import OllamaProvider
+    from mind_q_agent.llm.registry import provider_registry
 
     config = ModelConfig(
         provider="ollama",
         model_name="qwen2.5:3b",
         temperature=0.1 # Low temp for structured JSON
     )
-    llm = OllamaProvider(config)
+    llm = provider_registry.get(config)
     
     loader = TemplateLoader()
     return WorkflowConverter(llm, loader)
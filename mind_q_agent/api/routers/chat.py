@@ -1,11 +1,17 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, AsyncGenerator
+from typing import Any, Optional, List, Dict, AsyncGenerator, Tuple
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 import logging
+import numpy as np
+from mind_q_agent.api.resources import registry
+from mind_q_agent.config.manager import ConfigManager
 from mind_q_agent.llm.processing import response_processor
 from mind_q_agent.llm.config import ModelConfig
+from mind_q_agent.llm.registry import provider_registry
+from mind_q_agent.llm.response_cache import CachedResponse, SemanticResponseCache
 from mind_q_agent.rag.context import ContextBuilder
 
 router = APIRouter(
@@ -29,59 +35,134 @@ class ChatResponse(BaseModel):
     context_used: bool = True
     sources: List[str] = []
 
-# Dependency (Singleton-like)
-from mind_q_agent.llm.providers.ollama import OllamaProvider
-from mind_q_agent.llm.providers.openai import OpenAIProvider
-from mind_q_agent.llm.providers.gemini import GeminiProvider
-from mind_q_agent.llm.providers.llamacpp import LlamaCppProvider
-
 # Dependency (Singleton-like)
 class ChatService:
-    def __init__(self):
-        self.context_builder = ContextBuilder()
+    """
+    RAG chat: context retrieval, generation, and a semantic answer cache.
+    
+    Answers are cached per (provider, model) and reused for sufficiently
+    similar questions until a document they were grounded in changes or a
+    closer one is added. Embedding and
+    retrieval run in the thread pool, off the event loop.
+    Providers come from the shared registry, which owns their connections.
+    """
+    # Characters per chunk when replaying a cached answer as a stream
+    REPLAY_CHUNK_SIZE = 64
+
+    def __init__(
+        self,
+        context_builder: Optional[ContextBuilder] = None,
+        response_cache: Optional[SemanticResponseCache] = None
+    ):
+        self._context_builder = context_builder
+        self._response_cache = response_cache
+        self.cache_enabled = response_cache is not None or bool(ConfigManager.get("chat", "cache_enabled", True))
+
+    @property
+    def context_builder(self) -> ContextBuilder:
+        if self._context_builder is None:
+            self._context_builder = registry.get_context_builder()
+        return self._context_builder
+
+    @property
+    def response_cache(self) -> Optional[SemanticResponseCache]:
+        if self._response_cache is None and self.cache_enabled:
+            self._response_cache = SemanticResponseCache(registry.get_vector_db())
+        return self._response_cache
     
     def _get_provider(self, provider_name: str, config: ModelConfig):
-        if provider_name == "ollama":
-            return OllamaProvider(config)
-        elif provider_name == "openai":
-            return OpenAIProvider(config)
-        elif provider_name == "gemini":
-            return GeminiProvider(config)
-        elif provider_name == "llamacpp":
-            return LlamaCppProvider(config)
+        return provider_registry.get(config)
+
+    def _lookup(self, req: ChatRequest) -> Tuple[Optional[CachedResponse], Optional[np.ndarray]]:
+        """Cached answer for the request (if any) and the query embedding to store under."""
+        if not self.cache_enabled:
+            return None, None
+        try:
+            cache = self.response_cache
+            embedding = cache.embed(req.message)
+            return cache.lookup((req.provider, req.model), req.message, embedding), embedding
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+            return None, None
+
+    def _prepare(self, req: ChatRequest) -> Tuple[str, Optional[List[str]], int]:
+        """System prompt, the documents its context came from, and the KB generation before retrieval."""
+        generation = self.response_cache.vector_store.generation if self._response_cache is not None else 0
+        system_prompt, context = self.context_builder.prepare(req.message, provider=req.provider, model=req.model)
+        doc_hashes = [doc["id"] for doc in context.documents] if context is not None else None
+        return system_prompt, doc_hashes, generation
+
+    def _store(
+        self,
+        req: ChatRequest,
+        embedding: Optional[np.ndarray],
+        response: str,
+        doc_hashes: Optional[List[str]],
+        generation: int
+    ) -> None:
+        # Answers built on failed retrieval are not reused
+        if embedding is None or doc_hashes is None:
+            return
+        try:
+            self.response_cache.store(
+                (req.provider, req.model), req.message, response, doc_hashes, generation, embedding
+            )
+        except Exception as e:
+            logger.warning(f"Answer cache store failed: {e}")
+        
+    async def get_response(self, req: ChatRequest) -> ChatResponse:
+        cached, embedding = await run_in_threadpool(self._lookup, req)
+        if cached is not None:
+            raw_response = cached.response
         else:
-             raise ValueError(f"Provider {provider_name} not supported")
+            # 1. Build Context
+            system_prompt, doc_hashes, generation = await run_in_threadpool(self._prepare, req)
+            
+            # 2. Init Provider
+            config = ModelConfig(
+                provider=req.provider,
+                model_name=req.model,
+                temperature=req.temperature
+            )
+            
+            provider = self._get_provider(req.provider, config)
+            raw_response = await provider.generate(req.message, system_prompt=system_prompt)
+            self._store(req, embedding, raw_response, doc_hashes, generation)
+                
+        # Process response for citations
+        final_text, sources = response_processor.extract_citations(raw_response)
         
-    async def get_response(self, req: ChatRequest):
-        # 1. Build Context
-        system_prompt = self.context_builder.build_system_prompt(req.message)
+        return ChatResponse(
+            response=final_text,
+            sources=sources,
+            context_used=True if sources else False
+        )
+
+    async def stream_response(self, req: ChatRequest) -> AsyncGenerator[str, None]:
+        """Stream an answer, replaying a cached one in chunks when available."""
+        cached, embedding = await run_in_threadpool(self._lookup, req)
+        if cached is not None:
+            for start in range(0, len(cached.response), self.REPLAY_CHUNK_SIZE):
+                yield cached.response[start:start + self.REPLAY_CHUNK_SIZE]
+            return
+
+        # 1. Context
+        system_prompt, doc_hashes, generation = await run_in_threadpool(self._prepare, req)
         
-        # 2. Init Provider
+        # 2. Provider
         config = ModelConfig(
             provider=req.provider,
             model_name=req.model,
             temperature=req.temperature
         )
-        
         provider = self._get_provider(req.provider, config)
-            
-        try:
-            if req.stream:
-                return provider.stream(req.message, system_prompt=system_prompt)
-            else:
-                raw_response = await provider.generate(req.message, system_prompt=system_prompt)
-                
-                # Process response for citations
-                final_text, sources = response_processor.extract_citations(raw_response)
-                
-                return ChatResponse(
-                    response=final_text,
-                    sources=sources,
-                    context_used=True if sources else False
-                )
-        finally:
-             if not req.stream:
-                 await provider.close()
+        
+        chunks: List[str] = []
+        async for chunk in provider.stream(req.message, system_prompt=system_prompt):
+            chunks.append(chunk)
+            yield chunk
+        # Only answers streamed to completion are cached
+        self._store(req, embedding, "".join(chunks), doc_hashes, generation)
 
 # Initialize Service
 try:
@@ -103,43 +184,22 @@ async def chat(req: ChatRequest):
         if not req.stream:
             return await chat_service.get_response(req)
         
-        # For streaming, we need a StreamingResponse
+        # For streaming, cached and generated answers share one StreamingResponse path
         else:
-            # We need to manage the provider lifecycle differently for streaming
-            # Re-creating provider logic here for simplicity of generator
-            
-            async def event_generator():
-                # 1. Context
-                system_prompt = chat_service.context_builder.build_system_prompt(req.message)
-                
-                # 2. Provider
-                config = ModelConfig(
-                    provider=req.provider,
-                    model_name=req.model,
-                    temperature=req.temperature
-                )
-                
-                # Use the new factory method (conceptually, though _get_provider is instance method)
-                # Ideally ChatService should expose a get_provider method publically or we duplicate logic for now (KISS)
-                if req.provider == "ollama":
-                     provider = OllamaProvider(config)
-                elif req.provider == "openai":
-                     provider = OpenAIProvider(config)
-                elif req.provider == "gemini":
-                     provider = GeminiProvider(config)
-                elif req.provider == "llamacpp":
-                     provider = LlamaCppProvider(config)
-                else:
-                     raise ValueError(f"Provider {req.provider} not supported")
-                
-                try:
-                    async for chunk in provider.stream(req.message, system_prompt=system_prompt):
-                        yield chunk
-                finally:
-                    await provider.close()
-
-            return StreamingResponse(event_generator(), media_type="text/plain")
+            return StreamingResponse(chat_service.stream_response(req), media_type="text/plain")
 
     except Exception as e:
         logger.error(f"Chat failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache", response_model=Dict[str, Any])
+def chat_cache_stats():
+    """Hit/miss metrics of the semantic answer cache."""
+    if not chat_service or not chat_service.cache_enabled:
+        return {"enabled": False}
+    return {"enabled": True, **chat_service.response_cache.stats()}
+
+@router.get("/providers", response_model=Dict[str, Any])
+def chat_provider_stats():
+    """Cached LLM providers, connection pools and llama.cpp residency."""
+    return provider_registry.stats()
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, HTTPException, Path, Depends
 import logging
 from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
-from mind_q_agent.api.settings import settings
+from mind_q_agent.api.resources import get_graph_db
 
 router = APIRouter(
     prefix="/concepts",
@@ -10,21 +10,14 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-# Singleton
-try:
-    graph_db = KuzuGraphDB(settings.KUZU_DB_PATH)
-except Exception as e:
-    logger.error(f"Failed to initialize Graph DB: {e}")
-    graph_db = None
-
 @router.post("/{name}/boost")
-def boost_concept(name: str = Path(..., description="Concept name")):
+def boost_concept(
+    name: str = Path(..., description="Concept name"),
+    graph_db: KuzuGraphDB = Depends(get_graph_db)
+):
     """
     Boost a concept's global frequency.
     """
-    if not graph_db:
-        raise HTTPException(status_code=500, detail="Graph DB not initialized")
-    
     try:
         # Check if concept exists first
         concept = graph_db.get_concept(name)
@@ -40,13 +33,13 @@ def boost_concept(name: str = Path(..., description="Concept name")):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{name}/mute")
-def mute_concept(name: str = Path(..., description="Concept name")):
+def mute_concept(
+    name: str = Path(..., description="Concept name"),
+    graph_db: KuzuGraphDB = Depends(get_graph_db)
+):
     """
     Mute a concept (set is_ignored=true).
     """
-    if not graph_db:
-        raise HTTPException(status_code=500, detail="Graph DB not initialized")
-    
     try:
         # Check if concept exists
         concept = graph_db.get_concept(name)
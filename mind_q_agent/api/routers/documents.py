@@ -1,15 +1,11 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from typing import List, Dict, Any
-import shutil
-import os
-from pathlib import Path
 import logging
 
-from mind_q_agent.ingestion.pipeline import IngestionPipeline
-from mind_q_agent.ingestion.file_parser import FileParser
+from mind_q_agent.ingestion.jobs import JobStore
+from mind_q_agent.ingestion.uploads import ArchiveLimitError, UploadIngestor
 from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
-from mind_q_agent.vector.chroma_vector import ChromaVectorDB
-from mind_q_agent.api.settings import settings
+from mind_q_agent.api.resources import get_graph_db, get_job_store, get_upload_ingestor
 
 router = APIRouter(
     prefix="/documents",
@@ -18,68 +14,71 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-# Initialize singletons for DBs (Poor man's dependency injection for now)
-# In a real prod app, use FastAPI Depends
-try:
-    graph_db = KuzuGraphDB(settings.KUZU_DB_PATH)
-    vector_db = ChromaVectorDB(settings.CHROMA_DB_PATH)
-    pipeline = IngestionPipeline(graph_db, vector_db)
-except Exception as e:
-    logger.error(f"Failed to initialize DBs: {e}")
-    # We allow app to start, but endpoints might fail. 
-    # Better to fail fast, but for dev we continue.
-    graph_db = None
-    pipeline = None
-
-@router.post("/upload")
+@router.post("/upload", status_code=202)
 async def upload_document(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    uploads: UploadIngestor = Depends(get_upload_ingestor)
 ):
     """
-    Upload a document (PDF, MD, TXT), parse it, and ingest it.
+    Upload a document (PDF, MD, TXT) for background ingestion.
+    
+    The file is saved in chunks and hashed while streaming; parsing and
+    ingestion run in the background. Poll GET /documents/jobs/{job_id}.
     """
-    if not pipeline:
-        raise HTTPException(status_code=500, detail="Ingestion pipeline not initialized")
-
     try:
-        # 1. Parse content immediately to get text
-        text = await FileParser.parse_file(file)
-        
-        if not text.strip():
-            raise HTTPException(status_code=400, detail="File is empty or could not be parsed")
-
-        # 2. Save file temporarily (optional, but good for record/hashing consistency)
-        upload_dir = Path("data/uploads")
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        file_path = upload_dir / (file.filename or "untitled")
-        
-        # Write bytes
-        with open(file_path, "wb") as f:
-            await file.seek(0)
-            shutil.copyfileobj(file.file, f)
-            
-        # 3. Trigger Ingestion
-        # We'll do it synchronously to give immediate feedback for this phase
-        success = await pipeline.process_document(file_path.absolute(), text)
-        
-        if not success:
-             return {"message": "Document already exists (deduplicated)", "filename": file.filename}
+        job = await uploads.accept(file)
+        return {
+            "message": "Document accepted for ingestion",
+            "job_id": job.id,
+            "status": job.status,
+            "filename": job.filename,
+            "sha256": job.sha256,
+            "size_bytes": job.size_bytes
+        }
+    except Exception as e:
+        logger.error(f"Upload failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        return {"message": "Document uploaded and ingested successfully", "filename": file.filename}
+@router.post("/batch", status_code=202)
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    uploads: UploadIngestor = Depends(get_upload_ingestor)
+):
+    """
+    Upload many documents, or zip/tar archives of them, as one background job.
 
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
+    Documents are ingested in groups with batched NLP and embedding. Each
+    finished file is published as a `batch_file_progress` event on /ws/events;
+    poll GET /documents/jobs/{job_id} for per-file status.
+    """
+    try:
+        job = await uploads.accept_batch(files)
+        return {
+            "message": "Batch accepted for ingestion",
+            "job_id": job.id,
+            "status": job.status,
+            "total": len(job.files),
+            "files": [entry["filename"] for entry in job.files],
+            "size_bytes": job.size_bytes
+        }
+    except ArchiveLimitError as e:
+        logger.warning(f"Batch upload rejected: {e}")
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        logger.error(f"Upload failed: {e}")
+        logger.error(f"Batch upload failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, jobs: JobStore = Depends(get_job_store)):
+    """Get the status of a background ingestion job (with per-file progress for batches)."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
 @router.get("/", response_model=List[Dict[str, Any]])
-def list_documents():
+def list_documents(graph_db: KuzuGraphDB = Depends(get_graph_db)):
     """List all documents from the Graph DB."""
-    if not graph_db:
-         raise HTTPException(status_code=500, detail="Graph DB not initialized")
-    
     query = """
         MATCH (d:Document)
         RETURN d.hash as hash, d.title as title, d.created_at as created_at, d.size_bytes as size
@@ -96,11 +95,8 @@ def list_documents():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{doc_hash}")
-def get_document(doc_hash: str):
+def get_document(doc_hash: str, graph_db: KuzuGraphDB = Depends(get_graph_db)):
     """Get metadata for a specific document."""
-    if not graph_db:
-         raise HTTPException(status_code=500, detail="Graph DB not initialized")
-
     query = """
         MATCH (d:Document {hash: $hash})
         RETURN d.hash as hash, d.title as title, d.created_at as created_at, d.source_path as path
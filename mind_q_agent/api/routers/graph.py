@@ -1,9 +1,9 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Dict, Any, Optional
 import logging
 
 from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
-from mind_q_agent.api.settings import settings
+from mind_q_agent.api.resources import get_graph_db
 
 router = APIRouter(
     prefix="/graph",
@@ -12,21 +12,11 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-# Singleton wrapper
-try:
-    graph_db = KuzuGraphDB(settings.KUZU_DB_PATH)
-except Exception as e:
-    logger.error(f"Failed to initialize Graph DB: {e}")
-    graph_db = None
-
 @router.get("/analytics")
-def get_analytics():
+def get_analytics(graph_db: KuzuGraphDB = Depends(get_graph_db)):
     """
     Get detailed breakdown of system statistics.
     """
-    if not graph_db:
-        raise HTTPException(status_code=500, detail="Graph DB not initialized")
-    
     try:
         node_count = graph_db.get_node_count()
         edge_count = graph_db.get_edge_count()
@@ -46,13 +36,10 @@ def get_analytics():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/stats")
-def get_graph_stats():
+def get_graph_stats(graph_db: KuzuGraphDB = Depends(get_graph_db)):
     """
     Get detailed statistics about the knowledge graph.
     """
-    if not graph_db:
-        raise HTTPException(status_code=500, detail="Graph DB not initialized")
-    
     try:
         node_count = graph_db.get_node_count()
         edge_count = graph_db.get_edge_count()
@@ -71,13 +58,10 @@ def get_graph_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/visualize")
-def get_graph_visualization(limit: int = 100):
+def get_graph_visualization(limit: int = 100, graph_db: KuzuGraphDB = Depends(get_graph_db)):
     """
     Get graph data in Cytoscape JSON format for visualization.
     """
-    if not graph_db:
-        raise HTTPException(status_code=500, detail="Graph DB not initialized")
-
     try:
         # Fetch nodes (Documents and Concepts)
         # Limiting to most recent Documents and most connected Concepts/Entities
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 import logging
 
 from mind_q_agent.search.engine import SearchEngine
-from mind_q_agent.vector.chroma_vector import ChromaVectorDB
-from mind_q_agent.api.settings import settings
+from mind_q_agent.api.resources import get_search_engine
 
 router = APIRouter(
     prefix="/search",
@@ -13,28 +13,53 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-# Singleton wrapper
-try:
-    vector_db = ChromaVectorDB(settings.CHROMA_DB_PATH)
-    search_engine = SearchEngine(vector_db)
-except Exception as e:
-    logger.error(f"Failed to initialize Search Engine: {e}")
-    search_engine = None
+MODE_PATTERN = "^(semantic|lexical|hybrid)$"
+# Scores are vector distances only in semantic mode (lower is better in every mode)
+MODE_DESCRIPTION = "semantic (vector distance), lexical (-BM25) or hybrid (-fused RRF score)"
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=64, description="Search queries")
+    limit: int = Field(5, ge=1, le=50, description="Max results per query")
+    mode: Optional[str] = Field(None, pattern=MODE_PATTERN, description=MODE_DESCRIPTION)
 
 @router.get("/", response_model=List[Dict[str, Any]])
 def search(
     q: str = Query(..., min_length=1, description="Search query"),
-    limit: int = Query(5, ge=1, le=50, description="Max results")
+    limit: int = Query(5, ge=1, le=50, description="Max results"),
+    mode: Optional[str] = Query(None, pattern=MODE_PATTERN, description=MODE_DESCRIPTION),
+    search_engine: SearchEngine = Depends(get_search_engine)
 ):
     """
-    Perform semantic search on the knowledge base.
+    Search the knowledge base (default mode from config search.mode).
     """
-    if not search_engine:
-        raise HTTPException(status_code=500, detail="Search engine not initialized")
-    
     try:
-        results = search_engine.search(q, limit=limit)
+        results = search_engine.search(q, limit=limit, mode=mode)
         return results
     except Exception as e:
         logger.error(f"Search endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/batch", response_model=List[Dict[str, Any]])
+def search_batch(
+    req: BatchSearchRequest,
+    search_engine: SearchEngine = Depends(get_search_engine)
+):
+    """
+    Run several searches in one batched embedding and vector query.
+    
+    Returns one {"query", "results"} entry per query, in request order.
+    """
+    try:
+        results = search_engine.search_many(req.queries, limit=req.limit, mode=req.mode)
+        return [
+            {"query": query, "results": hits}
+            for query, hits in zip(req.queries, results)
+        ]
+    except Exception as e:
+        logger.error(f"Batch search endpoint error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache", response_model=Dict[str, Any])
+def search_cache_stats(search_engine: SearchEngine = Depends(get_search_engine)):
+    """Hit/miss metrics of the search result cache."""
+    return search_engine.cache_stats()
@@ -1,5 +1,7 @@
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
+from mind_q_agent.api.resources import registry
 from mind_q_agent.tools import YouTubeSearchTool, ArxivSearchTool
 
 from mind_q_agent.learning.suggestions import SuggestionService
@@ -15,12 +17,23 @@ router = APIRouter(prefix="/smart", tags=["smart-features"])
 # Initialize tools
 youtube_tool = YouTubeSearchTool()
 arxiv_tool = ArxivSearchTool()
-suggestion_service = SuggestionService()
 monitor_service = TopicMonitorService()
 progress_service = LearningProgressService()
 tagging_service = SmartTaggingService()
-qa_service = QAService()
-research_assistant = ResearchAssistant()
+
+
+# Knowledge base services, wired to the shared resources on first use
+@lru_cache(maxsize=None)
+def get_qa_service() -> QAService:
+    return QAService(registry.get_context_builder())
+
+@lru_cache(maxsize=None)
+def get_suggestion_service() -> SuggestionService:
+    return SuggestionService(registry.get_search_engine())
+
+@lru_cache(maxsize=None)
+def get_research_assistant() -> ResearchAssistant:
+    return ResearchAssistant(registry.get_search_engine(), qa=get_qa_service())
 
 # --- Learning Progress ---
 class GoalRequest(BaseModel):
@@ -40,12 +53,12 @@ class ResearchRequest(BaseModel):
 @router.post("/research/generate")
 async def generate_report(req: ResearchRequest):
     """Generate a research report"""
-    return await research_assistant.generate_report(req.topic, req.depth)
+    return await get_research_assistant().generate_report(req.topic, req.depth)
 
 @router.post("/qa/ask")
 async def ask_question(req: QARequest):
     """Ask a question (RAG + Web)"""
-    return await qa_service.answer_question(req.question)
+    return await get_qa_service().answer_question(req.question)
 
 @router.post("/tags/generate")
 async def generate_tags(req: TagRequest):
@@ -110,7 +123,7 @@ async def search_arxiv(q: str, max_results: int = 5):
 @router.get("/suggestions")
 async def get_proactive_suggestions(user_id: str = "user1", limit: int = 5):
     """Get proactive suggestions based on user activity"""
-    return await suggestion_service.get_suggestions(user_id, limit)
+    return await get_suggestion_service().get_suggestions(user_id, limit)
 
 @router.get("/search/suggestions")
 async def get_search_suggestions(q: str):
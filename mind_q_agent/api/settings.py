@@ -12,11 +12,26 @@ class Settings(BaseSettings):
     # Database
     KUZU_DB_PATH: str = os.getenv("KUZU_DB_PATH", "./data/mind_q_db")
     CHROMA_DB_PATH: str = os.getenv("CHROMA_DB_PATH", "./data/chroma_db")
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache.sqlite3")
+    LEXICAL_INDEX_PATH: str = os.getenv("LEXICAL_INDEX_PATH", "./data/lexical_index.sqlite3")
 
     # LLM - LlamaCpp
     LLAMACPP_MODEL_PATH: str = os.getenv("LLAMACPP_MODEL_PATH", "./models/mistral-7b-instruct-v0.2.Q4_K_M.gguf")
     LLAMACPP_N_CTX: int = int(os.getenv("LLAMACPP_N_CTX", 2048))
+    # Tokens of LLAMACPP_N_CTX kept free for the answer when packing RAG context
+    LLAMACPP_ANSWER_RESERVE: int = int(os.getenv("LLAMACPP_ANSWER_RESERVE", 512))
     LLAMACPP_N_GPU_LAYERS: int = int(os.getenv("LLAMACPP_N_GPU_LAYERS", -1))
+    # Seconds the resident model may sit unused before it is unloaded (0 = never)
+    LLAMACPP_IDLE_UNLOAD_SECONDS: float = float(os.getenv("LLAMACPP_IDLE_UNLOAD_SECONDS", 600))
+    
+    # LLM HTTP connection pools (shared per provider base URL)
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", 60))
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 10))
+    LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 120))
+    # Provider instances kept by the provider registry (least recently used evicted)
+    LLM_MAX_PROVIDERS: int = int(os.getenv("LLM_MAX_PROVIDERS", 32))
     
     class Config:
         env_file = ".env"
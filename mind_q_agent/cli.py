@@ -1,24 +1,36 @@
 import argparse
+import asyncio
 import sys
 import logging
 from pathlib import Path
-from queue import Queue
 import time
+from typing import List, Optional
 
+from mind_q_agent.api.settings import settings
 from mind_q_agent.config.manager import ConfigManager
 from mind_q_agent.utils.logger import setup_logging
 from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
 from mind_q_agent.vector.chroma_vector import ChromaVectorDB
+from mind_q_agent.ingestion.manifest import FileManifest
 from mind_q_agent.ingestion.pipeline import IngestionPipeline
-from mind_q_agent.ingestion.worker import IngestionWorker
+from mind_q_agent.ingestion.pool import IngestionPool
+from mind_q_agent.ingestion.runner import IngestionRunner
+from mind_q_agent.ingestion.text_reader import SUPPORTED_EXTENSIONS
 from mind_q_agent.watcher.file_watcher import FileWatcher
-from mind_q_agent.search.engine import SearchEngine
+from mind_q_agent.watcher.scanner import iter_files
+from mind_q_agent.search.engine import SEARCH_MODES, SearchEngine
+from mind_q_agent.search.lexical import LexicalIndex
+from mind_q_agent.search.reranker import CrossEncoderReranker
+from mind_q_agent.vector.embedding_cache import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
 class MindQCli:
     """Command Line Interface for Mind-Q Agent."""
 
+    # Files read and ingested together by `ingest`
+    INGEST_GROUP_SIZE = 256
+
     def __init__(self):
         self.config = ConfigManager()
         setup_logging(log_file="mind_q.log")
@@ -34,13 +46,26 @@ class MindQCli:
             # Collection name not in default.yaml, provide fallback
             vector_collection = self.config.get("db", "vector_collection", "mind_q_collection")
             
+            cache_path = self.config.get("db", "embedding_cache_path")
+            lexical_path = self.config.get("db", "lexical_index_path")
+            
             self.graph_db = KuzuGraphDB(db_path=db_path)
+            # Cache entries are keyed by the model that embeds the documents
             self.vector_store = ChromaVectorDB(
                 db_path=vector_path,
-                collection_name=vector_collection
+                collection_name=vector_collection,
+                model_name=settings.EMBEDDING_MODEL,
+                embedding_cache=EmbeddingCache(settings.EMBEDDING_MODEL, db_path=cache_path)
             )
-            self.pipeline = IngestionPipeline(self.graph_db, self.vector_store)
-            self.search_engine = SearchEngine(self.vector_store)
+            self.lexical_index = LexicalIndex(lexical_path)
+            # First start against an existing knowledge base: index its chunks once
+            if len(self.lexical_index) == 0 and self.vector_store.count() > 0:
+                indexed = self.lexical_index.backfill(self.vector_store.iter_chunks())
+                logger.info(f"Lexical index built from {indexed} stored chunks")
+            self.pipeline = IngestionPipeline(self.graph_db, self.vector_store, lexical_index=self.lexical_index)
+            self.runner = IngestionRunner(self.pipeline)
+            reranker = CrossEncoderReranker() if self.config.get("search", "rerank", False) else None
+            self.search_engine = SearchEngine(self.vector_store, lexical_index=self.lexical_index, reranker=reranker)
             logger.info("Components initialized.")
         except Exception as e:
             logger.critical(f"Failed to initialize components: {e}")
@@ -52,13 +77,14 @@ class MindQCli:
         subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
         # Command: ingest
-        ingest_parser = subparsers.add_parser("ingest", help="Batch ingest documents from directory")
-        ingest_parser.add_argument("--dir", required=True, help="Directory path to scan")
+        ingest_parser = subparsers.add_parser("ingest", help="Batch ingest documents from a directory tree")
+        ingest_parser.add_argument("--dir", required=True, help="Directory path to scan (recursively)")
 
         # Command: search
-        search_parser = subparsers.add_parser("search", help="Semantic search")
+        search_parser = subparsers.add_parser("search", help="Semantic, lexical or hybrid search")
         search_parser.add_argument("query", help="Search query string")
         search_parser.add_argument("--limit", type=int, default=5, help="Number of results")
+        search_parser.add_argument("--mode", choices=SEARCH_MODES, help="Retrieval mode (default: config search.mode)")
 
         # Command: watch
         watch_parser = subparsers.add_parser("watch", help="Start background file watcher daemon")
@@ -73,44 +99,37 @@ class MindQCli:
         if args.command == "ingest":
             self.ingest(args.dir)
         elif args.command == "search":
-            self.search(args.query, args.limit)
+            self.search(args.query, args.limit, args.mode)
         elif args.command == "watch":
             self.watch(args.dir)
 
     def ingest(self, dir_path: str):
-        """Ingest all supported files in a directory."""
+        """Ingest all supported files in a directory tree."""
         path = Path(dir_path)
         if not path.exists() or not path.is_dir():
             logger.error(f"Invalid directory: {dir_path}")
             return
 
         logger.info(f"Scanning directory: {path}")
-        count = 0
-        for file_path in path.glob("*"):
-            if file_path.suffix in ['.txt', '.md', '.pdf']:
-                try:
-                    # Simple text read for now, ideally reuse FileWatcher logic or extract logic
-                    # For consistency, let's just read text here or instantiate a watcher to scan once?
-                    # Let's read text directly here for simplicity of 'batch ingest'
-                    if file_path.suffix == '.pdf':
-                        import fitz
-                        doc = fitz.open(file_path)
-                        text = "".join([page.get_text() for page in doc])
-                    else:
-                        text = file_path.read_text(encoding='utf-8', errors='ignore')
-                    
-                    if text.strip():
-                        if self.pipeline.process_document(file_path, text):
-                            count += 1
-                except Exception as e:
-                    logger.error(f"Failed to ingest {file_path}: {e}")
+        files = sorted(Path(entry.path) for entry in iter_files(path, SUPPORTED_EXTENSIONS))
+        # Documents are handed to the runner in groups so entity extraction
+        # runs batched (nlp.pipe) without holding the whole corpus in memory.
+        count = asyncio.run(self._ingest_files(files))
         
         logger.info(f"Batch ingestion complete. Processed {count} documents.")
 
-    def search(self, query: str, limit: int):
+    async def _ingest_files(self, files: List[Path]) -> int:
+        """Ingest files group by group on one event loop."""
+        count = 0
+        for start in range(0, len(files), self.INGEST_GROUP_SIZE):
+            group = files[start:start + self.INGEST_GROUP_SIZE]
+            count += await self.runner.ingest_batch([(file_path, None) for file_path in group])
+        return count
+
+    def search(self, query: str, limit: int, mode: Optional[str] = None):
         """Execute search and print results."""
         logger.info(f"Searching for: '{query}'")
-        results = self.search_engine.search(query, limit)
+        results = self.search_engine.search(query, limit, mode=mode)
         
         if not results:
             print("No results found.")
@@ -125,14 +144,15 @@ class MindQCli:
             
     def watch(self, dir_path: str):
         """Start daemon mode."""
-        event_queue = Queue()
+        # Files already ingested (unchanged or byte-identical) are skipped before extraction
+        manifest = FileManifest(self.config.get("db", "manifest_path"))
         
-        # Start Worker
-        worker = IngestionWorker(event_queue, self.pipeline)
-        worker.start()
+        # Start extraction workers and the graph writer
+        pool = IngestionPool(self.pipeline, runner=self.runner, manifest=manifest)
+        pool.start()
         
-        # Start Watcher
-        watcher = FileWatcher(dir_path, event_queue)
+        # Start Watcher (blocks when the pool's bounded queue is full)
+        watcher = FileWatcher(dir_path, pool.queue, manifest=manifest)
         watcher.start()
         
         logger.info(f"Mind-Q Daemon started. Watching: {dir_path}")
@@ -144,6 +164,6 @@ class MindQCli:
         except KeyboardInterrupt:
             logger.info("\nStopping daemon...")
             watcher.stop()
-            event_queue.put("STOP")
-            worker.join()
+            pool.stop()
+            manifest.close()
             logger.info("Daemon stopped.")
@@ -1,6 +1,6 @@
 import logging
 import re
-from typing import Dict, List, Set, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import spacy
 from dateutil.parser import parse as parse_date
@@ -16,15 +16,41 @@ class EntityExtractor:
     - Dates via Regex + dateutil parsing.
     - Emails via Regex.
     - General Concepts (deduplicated noun phrases).
+    - Mentions (token offsets of every entity/concept occurrence).
+    
+    Long texts are parsed in bounded segments split at page/paragraph
+    boundaries, so spaCy's memory use per document is capped by
+    `segment_size` rather than by the document length.
     """
 
-    def __init__(self, model_name: str = "en_core_web_sm"):
+    ENTITY_LABELS = ("PERSON", "ORG", "GPE")
+    # Pipeline components whose output is never read
+    UNUSED_COMPONENTS = ("lemmatizer",)
+    # Preferred segment boundaries, strongest first: page, paragraph, line, sentence, word
+    SEGMENT_BREAKS = ("\f", "\n\n", "\n", ". ", " ")
+
+    def __init__(
+        self,
+        model_name: str = "en_core_web_sm",
+        segment_size: int = 100000,
+        nlp: Optional[Any] = None
+    ):
         """
         Initialize the extractor with a specific spaCy model.
         
         Args:
             model_name: spaCy model to load (default: en_core_web_sm)
+            segment_size: Maximum characters parsed by spaCy at once
+            nlp: Already loaded spaCy pipeline to use instead of loading one
         """
+        if segment_size <= 0:
+            raise ValueError(f"segment_size must be positive, got {segment_size}")
+        
+        if nlp is not None:
+            self.nlp = nlp
+            self.segment_size = min(segment_size, self.nlp.max_length)
+            return
+        
         try:
             logger.info(f"Loading spaCy model: {model_name}...")
             if not spacy.util.is_package(model_name):
@@ -32,6 +58,7 @@ class EntityExtractor:
                 spacy.cli.download(model_name)
                 
             self.nlp = spacy.load(model_name)
+            self.segment_size = min(segment_size, self.nlp.max_length)
             logger.info("spaCy model loaded successfully.")
         except Exception as e:
             logger.error(f"Failed to load spaCy model: {e}")
@@ -45,38 +72,138 @@ class EntityExtractor:
             text: Input text content
             
         Returns:
-            Dictionary with keys: entities, dates, emails, concepts
+            Dictionary with keys: entities, dates, emails, concepts, mentions
+        """
+        return next(self.extract_many([text]))
+
+    def extract_many(
+        self,
+        texts: Iterable[str],
+        batch_size: int = 32,
+        n_process: int = 1,
+        ner_only: bool = False
+    ) -> Iterator[Dict[str, List[Any]]]:
+        """
+        Extract entities from many texts using spaCy's batched `nlp.pipe`.
+        
+        Results are streamed in input order, one per text, so callers can
+        start writing early documents while later ones are still parsed.
+        
+        Args:
+            texts: Input texts (any iterable, consumed lazily)
+            batch_size: Number of texts spaCy processes per batch
+            n_process: Number of worker processes (-1 = all CPUs)
+            ner_only: Skip the dependency parser; no concepts are extracted
+            
+        Yields:
+            One dictionary per text with keys: entities, dates, emails, concepts, mentions
+        """
+        disable = [
+            name for name in self.UNUSED_COMPONENTS + (("parser",) if ner_only else ())
+            if name in self.nlp.pipe_names
+        ]
+        docs = self.nlp.pipe(
+            self._segment_stream(texts),
+            as_tuples=True,
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=disable
+        )
+        
+        # Segments arrive in order; merge them back into one result per text
+        result = self._empty_result()
+        token_base = 0
+        concepts: Set[str] = set()
+        for doc, (char_base, text) in docs:
+            result["entities"].extend(self._extract_named_entities(doc))
+            concepts.update(self._extract_concepts(doc))
+            result["mentions"].extend(self._extract_mentions(doc, token_base, char_base))
+            token_base += len(doc)
+            
+            if text is not None:
+                # Last segment of this text: regex extraction runs on the full text
+                result["dates"] = self._extract_dates(text)
+                result["emails"] = self._extract_emails(text)
+                result["concepts"] = list(concepts)
+                result["mentions"].sort(key=lambda m: m["token"])
+                yield result
+                
+                result = self._empty_result()
+                token_base = 0
+                concepts = set()
+
+    def _segment_stream(self, texts: Iterable[str]) -> Iterator[Tuple[str, Tuple[int, Optional[str]]]]:
         """
-        if not text or not text.strip():
-            return {
-                "entities": [],
-                "dates": [],
-                "emails": [],
-                "concepts": []
-            }
-
-        doc = self.nlp(text)
+        Yield (segment, (char_offset, full_text_or_None)) for nlp.pipe.
         
+        The full text is attached only to the last segment of each text,
+        which marks where one document ends and the next begins.
+        """
+        for text in texts:
+            text = text or ""
+            if not text.strip():
+                # Nothing to parse, but still produce a result for this text
+                yield "", (0, "")
+                continue
+            
+            segments = self._segment(text)
+            for i, (start, segment) in enumerate(segments):
+                is_last = i == len(segments) - 1
+                yield segment, (start, text if is_last else None)
+
+    def _segment(self, text: str) -> List[Tuple[int, str]]:
+        """
+        Split text into segments of at most segment_size characters.
+        
+        Each cut is placed at the strongest boundary (page, paragraph, line,
+        sentence, word) found in the second half of the segment.
+        
+        Returns:
+            (start_char, segment_text) pairs covering the whole text
+        """
+        segments: List[Tuple[int, str]] = []
+        start = 0
+        while len(text) - start > self.segment_size:
+            end = start + self.segment_size
+            cut = end
+            for sep in self.SEGMENT_BREAKS:
+                pos = text.rfind(sep, start + self.segment_size // 2, end)
+                if pos != -1:
+                    cut = pos + len(sep)
+                    break
+            segments.append((start, text[start:cut]))
+            start = cut
+        segments.append((start, text[start:]))
+        return segments
+
+    def _empty_result(self) -> Dict[str, List[Any]]:
         return {
-            "entities": self._extract_named_entities(doc),
-            "dates": self._extract_dates(text),
-            "emails": self._extract_emails(text),
-            "concepts": self._extract_concepts(doc)
+            "entities": [],
+            "dates": [],
+            "emails": [],
+            "concepts": [],
+            "mentions": []
         }
 
     def _extract_named_entities(self, doc) -> List[Dict[str, str]]:
         """Extract PERSON, ORG, GPE entities."""
         entities = []
         for ent in doc.ents:
-            if ent.label_ in ["PERSON", "ORG", "GPE"]:
-                clean_text = ent.text.strip()
-                if len(clean_text) >= 3:
-                    entities.append({
-                        "text": clean_text,
-                        "label": ent.label_
-                    })
+            clean_text = self._entity_text(ent)
+            if clean_text:
+                entities.append({
+                    "text": clean_text,
+                    "label": ent.label_
+                })
         return entities
 
+    def _entity_text(self, ent) -> str:
+        """Return the cleaned entity text, or '' if the entity is filtered out."""
+        if ent.label_ not in self.ENTITY_LABELS:
+            return ""
+        clean_text = ent.text.strip()
+        return clean_text if len(clean_text) >= 3 else ""
+
     def _extract_dates(self, text: str) -> List[Dict[str, str]]:
         """Extract and normalize dates using regex and dateutil."""
         # Simple regex for common date formats (YYYY-MM-DD, DD Month YYYY)
@@ -113,13 +240,61 @@ class EntityExtractor:
         Filters out stop words and short tokens.
         """
         concepts = set()
-        for chunk in doc.noun_chunks:
-            # Filter logic:
-            # 1. Root must be a noun
-            # 2. Not purely stop words
-            # 3. Length > 2 characters
-            clean_text = chunk.text.strip().lower()
-            if len(clean_text) > 2 and not chunk.root.is_stop:
+        for chunk in self._noun_chunks(doc):
+            clean_text = self._concept_text(chunk)
+            if clean_text:
                 concepts.add(clean_text)
         
         return list(concepts)
+
+    def _noun_chunks(self, doc):
+        """Noun chunks of a doc, or none when the parser was disabled."""
+        if not doc.has_annotation("DEP"):
+            return []
+        return doc.noun_chunks
+
+    def _concept_text(self, chunk) -> str:
+        """Return the normalized noun chunk text, or '' if the chunk is filtered out."""
+        # Filter logic:
+        # 1. Root must be a noun
+        # 2. Not purely stop words
+        # 3. Length > 2 characters
+        clean_text = chunk.text.strip().lower()
+        if len(clean_text) > 2 and not chunk.root.is_stop:
+            return clean_text
+        return ""
+
+    def _extract_mentions(self, doc, token_base: int = 0, char_base: int = 0) -> List[Dict[str, Any]]:
+        """
+        Locate every entity and concept occurrence by token offset.
+        
+        Args:
+            doc: Parsed spaCy doc (one segment of a text)
+            token_base: Number of tokens in the text before this segment
+            char_base: Character offset of this segment in the text
+        
+        Returns:
+            List of {'text': name, 'token': token_index, 'char': char_offset}
+            sorted by token index. Offsets are global to the full text; names
+            match the values returned for entities and concepts.
+        """
+        mentions = []
+        for ent in doc.ents:
+            clean_text = self._entity_text(ent)
+            if clean_text:
+                mentions.append({
+                    "text": clean_text,
+                    "token": token_base + ent.start,
+                    "char": char_base + ent.start_char
+                })
+        for chunk in self._noun_chunks(doc):
+            clean_text = self._concept_text(chunk)
+            if clean_text:
+                mentions.append({
+                    "text": clean_text,
+                    "token": token_base + chunk.start,
+                    "char": char_base + chunk.start_char
+                })
+        
+        mentions.sort(key=lambda m: m["token"])
+        return mentions
@@ -6,8 +6,10 @@ the knowledge graph including concepts, documents, and their relationships.
 """
 
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
 from datetime import datetime
 
 import kuzu
@@ -30,6 +32,9 @@ class KuzuGraphDB:
         conn: Database connection
     """
     
+    # Maximum number of rows sent to KùzuDB in a single UNWIND statement
+    BATCH_SIZE = 1000
+    
     def __init__(self, db_path: str):
         """
         Initialize KùzuDB connection and create schema if needed.
@@ -42,6 +47,8 @@ class KuzuGraphDB:
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Serializes access to the shared connection (and open transactions)
+        self._lock = threading.RLock()
         
         try:
             self.db = kuzu.Database(str(self.db_path))
@@ -59,7 +66,7 @@ class KuzuGraphDB:
         """
         Create database schema if it doesn't exist.
         
-        Creates node tables for User, Document, and Concept,
+        Creates node tables for User, Document, DocumentPath and Concept,
         and relationship tables for RELATED_TO and DISCUSSES.
         """
         try:
@@ -82,9 +89,27 @@ class KuzuGraphDB:
                     source_type STRING,
                     created_at STRING,
                     size_bytes INT64,
+                    cooccurrence STRING,
                     PRIMARY KEY (hash)
                 )
             """)
+            # Databases created before per-document co-occurrence counts were stored
+            self._execute_safe("ALTER TABLE Document ADD IF NOT EXISTS cooccurrence STRING DEFAULT ''")
+            
+            # Every path a document was ingested from (byte-identical files share one Document)
+            self._execute_safe("""
+                CREATE NODE TABLE IF NOT EXISTS DocumentPath(
+                    path STRING,
+                    doc_hash STRING,
+                    PRIMARY KEY (path)
+                )
+            """)
+            # Databases created before paths were tracked: each Document has its source path
+            self._execute_safe("""
+                MATCH (d:Document)
+                MERGE (p:DocumentPath {path: d.source_path})
+                ON CREATE SET p.doc_hash = d.hash
+            """)
             
             # Create Concept node table
             self._execute_safe("""
@@ -155,10 +180,11 @@ class KuzuGraphDB:
             RuntimeError: If query execution fails
         """
         try:
-            if params:
-                result = self.conn.execute(query, params)
-            else:
-                result = self.conn.execute(query)
+            with self._lock:
+                if params:
+                    result = self.conn.execute(query, params)
+                else:
+                    result = self.conn.execute(query)
             
             # Convert to DataFrame
             df = result.get_as_df()
@@ -284,6 +310,484 @@ class KuzuGraphDB:
             logger.error(f"Failed to create edge {concept_a} -> {concept_b}: {e}")
             raise RuntimeError(f"Edge creation failed: {e}") from e
     
+    @contextmanager
+    def transaction(self) -> Iterator["KuzuGraphDB"]:
+        """
+        Run a block of writes inside a single KùzuDB transaction.
+        
+        All statements executed through this instance while the block is
+        active are committed together, or rolled back if the block raises.
+        
+        Yields:
+            This KuzuGraphDB instance
+            
+        Raises:
+            RuntimeError: If the transaction cannot be started or committed
+        """
+        with self._lock:
+            try:
+                self.conn.execute("BEGIN TRANSACTION")
+            except Exception as e:
+                logger.error(f"Failed to begin transaction: {e}")
+                raise RuntimeError(f"Transaction begin failed: {e}") from e
+            
+            try:
+                yield self
+            except Exception:
+                try:
+                    self.conn.execute("ROLLBACK")
+                except Exception as rollback_error:
+                    # KùzuDB may already have aborted the transaction itself
+                    logger.debug(f"Rollback note: {rollback_error}")
+                raise
+            
+            try:
+                self.conn.execute("COMMIT")
+            except Exception as e:
+                logger.error(f"Failed to commit transaction: {e}")
+                raise RuntimeError(f"Transaction commit failed: {e}") from e
+    
+    def _execute_batched(
+        self,
+        query: str,
+        key: str,
+        rows: List[Any],
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Execute an UNWIND query over rows, BATCH_SIZE rows per statement.
+        
+        Args:
+            query: Cypher query that UNWINDs the list parameter named by key
+            key: Name of the list parameter
+            rows: Rows to send
+            params: Extra parameters shared by every batch
+        """
+        for start in range(0, len(rows), self.BATCH_SIZE):
+            batch_params = dict(params or {})
+            batch_params[key] = rows[start:start + self.BATCH_SIZE]
+            self.execute(query, batch_params)
+    
+    def upsert_concepts(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Create many concept nodes in bulk, leaving existing ones untouched.
+        
+        Args:
+            rows: Dicts with keys name, embedding and optional category.
+                  Duplicate names are collapsed (first row wins).
+            
+        Raises:
+            ValueError: If an embedding is not 384-dimensional
+            RuntimeError: If the write fails
+        """
+        unique: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            if len(row["embedding"]) != 384:
+                raise ValueError(
+                    f"Embedding must be 384-dimensional, got {len(row['embedding'])} for '{row['name']}'"
+                )
+            unique.setdefault(row["name"], {
+                "name": row["name"],
+                "category": row.get("category", "general"),
+                "embedding": list(row["embedding"])
+            })
+        
+        if not unique:
+            return
+        
+        query = """
+            UNWIND $rows AS row
+            MERGE (c:Concept {name: row.name})
+            ON CREATE SET
+                c.category = row.category,
+                c.embedding = row.embedding,
+                c.global_frequency = 1,
+                c.is_broad = false,
+                c.first_seen = $timestamp
+        """
+        self._execute_batched(query, "rows", list(unique.values()), {
+            "timestamp": datetime.now().isoformat()
+        })
+        logger.debug(f"Upserted {len(unique)} concepts")
+    
+    def existing_concepts(self, names: Iterable[str]) -> Set[str]:
+        """
+        Return which of the given concept names already exist.
+        
+        Uses one `IN` query per BATCH_SIZE names instead of a lookup per name.
+        
+        Args:
+            names: Concept names to probe
+            
+        Returns:
+            Subset of names that have a Concept node
+        """
+        unique = list(dict.fromkeys(names))
+        found: Set[str] = set()
+        query = "MATCH (c:Concept) WHERE c.name IN $names RETURN c.name AS name"
+        for start in range(0, len(unique), self.BATCH_SIZE):
+            df = self.execute(query, {"names": unique[start:start + self.BATCH_SIZE]})
+            if not df.empty:
+                found.update(df["name"].tolist())
+        return found
+    
+    def get_concept_names(self) -> Set[str]:
+        """
+        Return the names of all concepts in the graph.
+        
+        Returns:
+            Set of concept names
+        """
+        df = self.execute("MATCH (c:Concept) RETURN c.name AS name")
+        return set(df["name"].tolist()) if not df.empty else set()
+    
+    def increment_concept_frequency(self, names: Iterable[str], amount: int = 1) -> None:
+        """
+        Increase global_frequency of many existing concepts in bulk.
+        
+        Args:
+            names: Concept names (unknown names are ignored)
+            amount: Increment per concept
+            
+        Raises:
+            RuntimeError: If the write fails
+        """
+        unique = list(dict.fromkeys(names))
+        if not unique:
+            return
+        
+        query = """
+            UNWIND $names AS name
+            MATCH (c:Concept {name: name})
+            SET c.global_frequency = c.global_frequency + $amount
+        """
+        self._execute_batched(query, "names", unique, {"amount": amount})
+        logger.debug(f"Incremented frequency of {len(unique)} concepts")
+    
+    def link_document(self, doc_hash: str, concepts: Iterable[str], strength: float = 1.0) -> None:
+        """
+        Create DISCUSSES edges from a document to many concepts in bulk.
+        
+        Existing edges are kept as they are; concepts that do not exist are skipped.
+        
+        Args:
+            doc_hash: Hash of the source Document node
+            concepts: Names of the discussed concepts
+            strength: Strength assigned to newly created edges
+        """
+        names = sorted(set(concepts))
+        if not names:
+            return
+        
+        query = """
+            MATCH (d:Document {hash: $doc_hash})
+            UNWIND $names AS name
+            MATCH (c:Concept {name: name})
+            MERGE (d)-[r:DISCUSSES]->(c)
+            ON CREATE SET r.strength = $strength
+        """
+        self._execute_batched(query, "names", names, {
+            "doc_hash": doc_hash,
+            "strength": strength
+        })
+        logger.debug(f"Linked document {doc_hash[:8]} to {len(names)} concepts")
+    
+    def upsert_cooccurrence_edges(self, pair_counts: Mapping[Tuple[str, str], int]) -> None:
+        """
+        Create or strengthen RELATED_TO edges between co-occurring concepts in bulk.
+        
+        Each pair produces one edge directed from the lexicographically
+        smaller name to the larger one. New edges start with base_weight and
+        sample_size equal to the observed count; existing edges have both
+        incremented by it.
+        
+        Args:
+            pair_counts: Mapping of (concept_a, concept_b) to co-occurrence count
+        """
+        merged: Dict[Tuple[str, str], int] = {}
+        for (a, b), count in pair_counts.items():
+            if a == b or count <= 0:
+                continue
+            key = (a, b) if a < b else (b, a)
+            merged[key] = merged.get(key, 0) + int(count)
+        
+        if not merged:
+            return
+        
+        rows = [{"a": a, "b": b, "count": count} for (a, b), count in sorted(merged.items())]
+        query = """
+            UNWIND $pairs AS pair
+            MATCH (a:Concept {name: pair.a}), (b:Concept {name: pair.b})
+            MERGE (a)-[r:RELATED_TO]->(b)
+            ON CREATE SET
+                r.base_weight = pair.count,
+                r.current_weight = 1.0,
+                r.sample_size = pair.count,
+                r.confidence = 0.5,
+                r.observation_variance = 0.0,
+                r.last_accessed = $timestamp,
+                r.decay_rate = 0.01
+            ON MATCH SET
+                r.base_weight = r.base_weight + pair.count,
+                r.sample_size = r.sample_size + pair.count,
+                r.last_accessed = $timestamp
+        """
+        self._execute_batched(query, "pairs", rows, {"timestamp": datetime.now()})
+        logger.debug(f"Upserted {len(rows)} co-occurrence edges")
+    
+    def weaken_cooccurrence_edges(self, pair_counts: Mapping[Tuple[str, str], int]) -> None:
+        """
+        Subtract co-occurrence counts from RELATED_TO edges in bulk.
+        
+        The inverse of upsert_cooccurrence_edges, used when a document version
+        is replaced or deleted. Edges whose sample_size drops to zero are removed.
+        
+        Args:
+            pair_counts: Mapping of (concept_a, concept_b) to the count to remove
+        """
+        merged: Dict[Tuple[str, str], int] = {}
+        for (a, b), count in pair_counts.items():
+            if a == b or count <= 0:
+                continue
+            key = (a, b) if a < b else (b, a)
+            merged[key] = merged.get(key, 0) + int(count)
+        
+        if not merged:
+            return
+        
+        rows = [{"a": a, "b": b, "count": count} for (a, b), count in sorted(merged.items())]
+        self._execute_batched("""
+            UNWIND $pairs AS pair
+            MATCH (a:Concept {name: pair.a})-[r:RELATED_TO]->(b:Concept {name: pair.b})
+            SET r.base_weight = r.base_weight - pair.count,
+                r.sample_size = r.sample_size - pair.count
+        """, "pairs", rows)
+        self._execute_batched("""
+            UNWIND $pairs AS pair
+            MATCH (a:Concept {name: pair.a})-[r:RELATED_TO]->(b:Concept {name: pair.b})
+            WHERE r.sample_size <= 0
+            DELETE r
+        """, "pairs", rows)
+        logger.debug(f"Weakened {len(rows)} co-occurrence edges")
+    
+    def get_documents_by_path(self, source_path: str) -> List[Dict[str, Any]]:
+        """
+        Return the Document nodes recorded for a path.
+        
+        That is the document the path is linked to, plus any whose source
+        path it is (e.g. versions left behind by an interrupted update).
+        
+        Args:
+            source_path: Path the documents were ingested from
+            
+        Returns:
+            Dicts with hash, cooccurrence (stored pair counts, JSON) and
+            source (the document's source path)
+        """
+        columns = "d.hash AS hash, d.cooccurrence AS cooccurrence, d.source_path AS source"
+        params = {"path": source_path}
+        linked = self.execute(
+            f"MATCH (p:DocumentPath {{path: $path}}), (d:Document) WHERE d.hash = p.doc_hash RETURN {columns}",
+            params
+        )
+        sourced = self.execute(f"MATCH (d:Document {{source_path: $path}}) RETURN {columns}", params)
+        
+        documents: Dict[str, Dict[str, Any]] = {}
+        for df in (linked, sourced):
+            if not df.empty:
+                for record in df.to_dict(orient="records"):
+                    documents.setdefault(record["hash"], record)
+        return list(documents.values())
+    
+    def get_document_paths(self, doc_hash: str) -> List[str]:
+        """
+        Return every path linked to a document.
+        
+        Args:
+            doc_hash: Document hash
+        """
+        df = self.execute(
+            "MATCH (p:DocumentPath) WHERE p.doc_hash = $hash RETURN p.path AS path ORDER BY path",
+            {"hash": doc_hash}
+        )
+        return df["path"].tolist() if not df.empty else []
+    
+    def add_document_path(self, doc_hash: str, path: str) -> None:
+        """
+        Link a path to a document, replacing the document it was linked to.
+        
+        Args:
+            doc_hash: Document hash
+            path: File path holding the document's content
+        """
+        self.execute(
+            "MERGE (p:DocumentPath {path: $path}) SET p.doc_hash = $hash",
+            {"path": path, "hash": doc_hash}
+        )
+    
+    def remove_document_path(self, path: str) -> None:
+        """
+        Unlink a path from its document (e.g. the file was deleted).
+        
+        Args:
+            path: File path
+        """
+        self.execute("MATCH (p:DocumentPath {path: $path}) DELETE p", {"path": path})
+    
+    def get_document_concepts(self, doc_hash: str) -> List[str]:
+        """
+        Return the names of the concepts a document DISCUSSES.
+        
+        Args:
+            doc_hash: Document hash
+        """
+        df = self.execute(
+            "MATCH (d:Document {hash: $hash})-[:DISCUSSES]->(c:Concept) RETURN c.name AS name",
+            {"hash": doc_hash}
+        )
+        return df["name"].tolist() if not df.empty else []
+    
+    def find_concepts(self, phrases: Iterable[str]) -> List[str]:
+        """
+        Return the concepts whose names match any of the phrases, ignoring case.
+        
+        Args:
+            phrases: Candidate names (e.g. the words and n-grams of a query)
+            
+        Returns:
+            Matching concept names as stored
+        """
+        lowered = list(dict.fromkeys(phrase.lower() for phrase in phrases if phrase))
+        if not lowered:
+            return []
+        
+        df = self.execute(
+            "MATCH (c:Concept) WHERE lower(c.name) IN $phrases RETURN c.name AS name",
+            {"phrases": lowered}
+        )
+        return df["name"].tolist() if not df.empty else []
+    
+    def get_related_concepts(self, names: Iterable[str], limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Return the top-weighted RELATED_TO neighbors of a set of concepts.
+        
+        A neighbor's weight is its co-occurrence count (RELATED_TO
+        base_weight) summed over its edges to the set; ties are broken by the
+        number of seeds it is related to. Broad concepts and the input
+        concepts themselves are excluded.
+        
+        Args:
+            names: Seed concept names
+            limit: Maximum number of neighbors
+            
+        Returns:
+            Dicts with name and weight, heaviest first
+        """
+        seeds = list(dict.fromkeys(names))
+        if not seeds:
+            return []
+        
+        query = """
+            MATCH (seed:Concept)-[r:RELATED_TO]-(n:Concept)
+            WHERE seed.name IN $names AND NOT n.name IN $names
+              AND coalesce(n.is_broad, false) = false
+            WITH n, sum(r.base_weight) AS weight, count(DISTINCT seed) AS seeds
+            ORDER BY weight DESC, seeds DESC
+            LIMIT $limit
+            RETURN n.name AS name, weight
+        """
+        df = self.execute(query, {"names": seeds, "limit": limit})
+        return df.to_dict(orient="records") if not df.empty else []
+    
+    def get_documents_discussing(self, concept_weights: Mapping[str, float], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank the documents that DISCUSS weighted concepts.
+        
+        A document scores the sum of weight x DISCUSSES strength over the
+        concepts it discusses.
+        
+        Args:
+            concept_weights: Mapping of concept name to weight
+            limit: Maximum number of documents
+            
+        Returns:
+            Dicts with hash, title, source, score and via (matched concept
+            names), best first
+        """
+        concepts = [{"name": name, "weight": float(weight)} for name, weight in concept_weights.items()]
+        if not concepts:
+            return []
+        
+        query = """
+            UNWIND $concepts AS concept
+            MATCH (d:Document)-[s:DISCUSSES]->(c:Concept {name: concept.name})
+            WITH d, sum(concept.weight * s.strength) AS score, collect(c.name) AS via
+            RETURN d.hash AS hash, d.title AS title, d.source_path AS source, score, via
+            ORDER BY score DESC
+            LIMIT $limit
+        """
+        df = self.execute(query, {"concepts": concepts, "limit": limit})
+        return df.to_dict(orient="records") if not df.empty else []
+    
+    def move_document(self, doc_hash: str, source_path: str, title: str) -> None:
+        """
+        Update the source path and title of a Document node (e.g. after a rename).
+    
+        Args:
+            doc_hash: Document hash
+            source_path: New source path
+            title: New title
+        """
+        self.execute(
+            "MATCH (d:Document {hash: $hash}) SET d.source_path = $path, d.title = $title",
+            {"hash": doc_hash, "path": source_path, "title": title}
+        )
+    
+    def delete_document(self, doc_hash: str) -> None:
+        """
+        Delete a Document node, its DISCUSSES edges and its path links.
+        
+        Args:
+            doc_hash: Document hash
+        """
+        self.execute("MATCH (d:Document {hash: $hash}) DETACH DELETE d", {"hash": doc_hash})
+        self.execute("MATCH (p:DocumentPath) WHERE p.doc_hash = $hash DELETE p", {"hash": doc_hash})
+        logger.debug(f"Deleted document {doc_hash[:8]}")
+    
+    def delete_orphan_concepts(self, names: Iterable[str]) -> Set[str]:
+        """
+        Delete concepts that no document discusses any more.
+        
+        Only concepts among `names` whose global_frequency has dropped to
+        zero and that have no DISCUSSES edge are removed, with their edges.
+        
+        Args:
+            names: Candidate concept names
+            
+        Returns:
+            Names of the deleted concepts
+        """
+        unique = list(dict.fromkeys(names))
+        deleted: Set[str] = set()
+        for start in range(0, len(unique), self.BATCH_SIZE):
+            df = self.execute("""
+                MATCH (c:Concept)
+                WHERE c.name IN $names AND c.global_frequency <= 0
+                  AND NOT EXISTS { MATCH (:Document)-[:DISCUSSES]->(c) }
+                RETURN c.name AS name
+            """, {"names": unique[start:start + self.BATCH_SIZE]})
+            if not df.empty:
+                deleted.update(df["name"].tolist())
+        
+        if deleted:
+            self._execute_batched("""
+                UNWIND $names AS name
+                MATCH (c:Concept {name: name})
+                DETACH DELETE c
+            """, "names", sorted(deleted))
+            logger.debug(f"Deleted {len(deleted)} orphaned concepts")
+        return deleted
+    
     def get_node_count(self) -> int:
         """
         Get total count of all nodes in the graph.
@@ -0,0 +1,123 @@
+"""
+Text chunking for vector storage.
+
+Splits documents into overlapping chunks that fit the embedding model's
+input window, so long documents are embedded in full instead of being
+silently truncated by the model.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+_WORD_RE = re.compile(r"\S+")
+_SENTENCE_END = (".", "!", "?", ":", ";")
+
+
+@dataclass
+class TextChunk:
+    """A contiguous slice of a document."""
+    index: int
+    text: str
+    start: int  # Character offset of the first character (inclusive)
+    end: int    # Character offset after the last character (exclusive)
+
+
+class TextChunker:
+    """
+    Token-aware text splitter with overlap.
+
+    Chunks never cut through a word, prefer to end on a sentence or paragraph
+    boundary, and consecutive chunks share roughly `overlap` characters.
+    When a token counter is supplied, every chunk is also kept within
+    `max_tokens` model tokens.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        overlap: int = 200,
+        token_counter: Optional[Callable[[str], int]] = None,
+        max_tokens: Optional[int] = None
+    ):
+        """
+        Initialize the chunker.
+
+        Args:
+            chunk_size: Maximum chunk length in characters
+            overlap: Characters shared between consecutive chunks
+            token_counter: Optional function returning the model token count of a text
+            max_tokens: Maximum model tokens per chunk (requires token_counter;
+                counted the way the model reads them, special tokens included)
+
+        Raises:
+            ValueError: If sizes are inconsistent
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        if not 0 <= overlap < chunk_size:
+            raise ValueError(f"overlap must be in [0, chunk_size), got {overlap}")
+
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.token_counter = token_counter
+        self.max_tokens = max_tokens
+
+    def split(self, text: str) -> List[TextChunk]:
+        """
+        Split text into chunks.
+
+        Args:
+            text: Document text
+
+        Returns:
+            Chunks in document order with character offsets into `text`
+        """
+        words: List[Tuple[int, int]] = [m.span() for m in _WORD_RE.finditer(text)]
+        chunks: List[TextChunk] = []
+
+        i = 0
+        while i < len(words):
+            start = words[i][0]
+
+            # Greedily extend the chunk up to chunk_size characters
+            j = i
+            while j + 1 < len(words) and words[j + 1][1] - start <= self.chunk_size:
+                j += 1
+
+            if j + 1 < len(words):
+                j = self._sentence_boundary(text, words, i, j)
+            j = self._fit_tokens(text, words, i, j)
+
+            end = words[j][1]
+            chunks.append(TextChunk(index=len(chunks), text=text[start:end], start=start, end=end))
+
+            if j + 1 >= len(words):
+                break
+
+            # Start the next chunk early enough to overlap, but always advance
+            next_i = j + 1
+            while next_i - 1 > i and end - words[next_i - 1][0] <= self.overlap:
+                next_i -= 1
+            i = next_i
+
+        return chunks
+
+    def _sentence_boundary(self, text: str, words: List[Tuple[int, int]], i: int, j: int) -> int:
+        """Move the chunk end back to a sentence/paragraph end in its second half, if any."""
+        lower = i + (j - i) // 2
+        for k in range(j, lower, -1):
+            word_end = words[k][1]
+            if text[word_end - 1] in _SENTENCE_END or text.startswith("\n\n", word_end):
+                return k
+        return j
+
+    def _fit_tokens(self, text: str, words: List[Tuple[int, int]], i: int, j: int) -> int:
+        """Shrink the chunk end until it fits in max_tokens model tokens."""
+        if not self.token_counter or not self.max_tokens:
+            return j
+
+        start = words[i][0]
+        while j > i and self.token_counter(text[start:words[j][1]]) > self.max_tokens:
+            j = i + int((j - i) * 0.8)
+        return j
@@ -0,0 +1,48 @@
+"""
+Windowed concept co-occurrence counting.
+
+Two concepts co-occur when they are mentioned within a fixed number of
+tokens of each other, instead of merely appearing in the same document.
+"""
+
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, Tuple
+
+DEFAULT_WINDOW = 100
+
+
+def count_cooccurrences(
+    mentions: Iterable[Dict[str, Any]],
+    window: int = DEFAULT_WINDOW
+) -> Dict[Tuple[str, str], int]:
+    """
+    Count co-occurring concept pairs within a sliding token window.
+    
+    Args:
+        mentions: Dicts with 'text' (concept name) and 'token' (token offset)
+        window: Maximum token distance between two co-occurring mentions
+        
+    Returns:
+        Mapping of (name_a, name_b) with name_a < name_b to the number of
+        mention pairs found within the window.
+    """
+    if window < 1:
+        raise ValueError(f"window must be positive, got {window}")
+    
+    counts: Counter = Counter()
+    active: deque = deque()
+    
+    for mention in sorted(mentions, key=lambda m: m["token"]):
+        name, token = mention["text"], mention["token"]
+        
+        # Drop mentions that fell out of the window
+        while active and token - active[0][1] > window:
+            active.popleft()
+        
+        for other, _ in active:
+            if other != name:
+                counts[(other, name) if other < name else (name, other)] += 1
+        
+        active.append((name, token))
+    
+    return dict(counts)
@@ -1,7 +1,8 @@
-import fitz  # PyMuPDF
 from fastapi import UploadFile
 import logging
-import io
+from pathlib import Path
+
+from mind_q_agent.ingestion.pdf_extractor import get_pdf_extractor
 
 logger = logging.getLogger(__name__)
 
@@ -40,14 +41,36 @@ class FileParser:
             logger.error(f"Failed to parse file {filename}: {e}")
             raise ValueError(f"Could not parse file: {str(e)}")
 
+    @staticmethod
+    def parse_path(file_path: str) -> str:
+        """
+        Extract text from a file on disk.
+        
+        Synchronous and picklable, so it can run in an executor. PDFs go
+        through the shared PdfExtractor (page-parallel, cached by content).
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Extracted text string
+            
+        Raises:
+            ValueError: If the file cannot be parsed
+        """
+        path = Path(file_path)
+        try:
+            if path.suffix.lower() == ".pdf":
+                return get_pdf_extractor().extract(path).text
+            return FileParser._parse_text(path.read_bytes())
+        except Exception as e:
+            logger.error(f"Failed to parse file {path.name}: {e}")
+            raise ValueError(f"Could not parse file: {str(e)}")
+
     @staticmethod
     def _parse_pdf(content: bytes) -> str:
-        """Extract text from PDF bytes using PyMuPDF."""
-        text = ""
-        with fitz.open(stream=content, filetype="pdf") as doc:
-            for page in doc:
-                text += page.get_text() + "\n"
-        return text.strip()
+        """Extract text from PDF bytes using the shared PdfExtractor."""
+        return get_pdf_extractor().extract_bytes(content).text
 
     @staticmethod
     def _parse_text(content: bytes) -> str:
@@ -0,0 +1,113 @@
+"""
+In-memory tracking of background ingestion jobs.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Job states
+QUEUED = "queued"
+PROCESSING = "processing"
+COMPLETED = "completed"
+DUPLICATE = "duplicate"
+FAILED = "failed"
+
+FINISHED_STATES = {COMPLETED, DUPLICATE, FAILED}
+
+# Job kinds
+SINGLE = "single"
+BATCH = "batch"
+
+
+@dataclass
+class IngestionJob:
+    """State of one background ingestion job."""
+    id: str
+    filename: str
+    status: str = QUEUED
+    sha256: Optional[str] = None
+    size_bytes: int = 0
+    error: Optional[str] = None
+    kind: str = SINGLE
+    # Per-file state of a batch job: {"filename", "status", "error"}
+    files: List[Dict[str, Any]] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def done(self) -> int:
+        """Number of files of a batch job that have finished."""
+        return sum(1 for f in self.files if f["status"] in FINISHED_STATES)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        if self.kind == BATCH:
+            data["total"] = len(self.files)
+            data["done"] = self.done
+        return data
+
+
+class JobStore:
+    """
+    Thread-safe registry of ingestion jobs.
+
+    Keeps at most `max_jobs` jobs; when full, the oldest finished jobs are
+    forgotten first.
+    """
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, filename: str, **fields: Any) -> IngestionJob:
+        """Register a new queued job and return it."""
+        job = IngestionJob(id=uuid.uuid4().hex, filename=filename, **fields)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Return a job by id, or None if unknown."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def update(self, job_id: str, **fields: Any) -> Optional[IngestionJob]:
+        """Update fields of a job (e.g. status, error)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = time.time()
+            return job
+
+    def update_file(self, job_id: str, filename: str, **fields: Any) -> Optional[IngestionJob]:
+        """Update the entry of one file of a batch job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            for entry in job.files:
+                if entry["filename"] == filename:
+                    entry.update(fields)
+                    break
+            job.updated_at = time.time()
+            return job
+
+    def _evict(self) -> None:
+        """Drop the oldest jobs, preferring finished ones, until within max_jobs."""
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.status in FINISHED_STATES]:
+            if len(self._jobs) <= self.max_jobs:
+                return
+            del self._jobs[job_id]
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
@@ -0,0 +1,163 @@
+"""
+Persistent manifest of ingested files.
+
+Maps every file path the watcher has handled to its size, modification
+time, the SHA256 of its raw bytes and the hash of the document it produced.
+The watcher consults it before anything is read or parsed: a file whose
+size and mtime are unchanged is skipped from a stat call alone, and a file
+whose bytes match an already ingested file is skipped after hashing, before
+any text extraction.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ManifestEntry:
+    """Last known state of one file."""
+    path: str
+    size: int
+    mtime: float
+    raw_hash: str
+    doc_hash: Optional[str]
+
+
+class FileManifest:
+    """
+    Thread-safe SQLite store of file states.
+
+    Attributes:
+        db_path: SQLite file (":memory:" when not persisted)
+    """
+
+    # Bytes read per step while hashing a file
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the manifest.
+
+        Args:
+            db_path: SQLite file to persist to (default: in-memory)
+
+        Raises:
+            RuntimeError: If the database cannot be opened
+        """
+        self.db_path = db_path or ":memory:"
+        self._lock = threading.Lock()
+
+        try:
+            if db_path:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    raw_hash TEXT NOT NULL,
+                    doc_hash TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS files_raw_hash ON files (raw_hash)")
+            self._conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to open file manifest at {self.db_path}: {e}")
+            raise RuntimeError(f"File manifest initialization failed: {e}") from e
+
+    @classmethod
+    def hash_file(cls, path: Path) -> str:
+        """SHA256 of a file's raw bytes, read in chunks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        """Return the recorded state of a path, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, mtime, raw_hash, doc_hash FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def is_unchanged(self, path: str, size: int, mtime: float) -> bool:
+        """True if the path was recorded with exactly this size and mtime."""
+        entry = self.get(path)
+        return entry is not None and entry.size == size and entry.mtime == mtime
+
+    def find_by_raw_hash(self, raw_hash: str) -> Optional[ManifestEntry]:
+        """Return an ingested file with these exact bytes, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, mtime, raw_hash, doc_hash FROM files "
+                "WHERE raw_hash = ? AND doc_hash IS NOT NULL LIMIT 1",
+                (raw_hash,)
+            ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def record(self, path: str, size: int, mtime: float, raw_hash: str, doc_hash: Optional[str]) -> None:
+        """
+        Record the state of a file.
+
+        Args:
+            path: File path
+            size: Size in bytes at the time it was read
+            mtime: Modification time at the time it was read
+            raw_hash: SHA256 of the raw bytes
+            doc_hash: Hash of the ingested document (None if it had no text)
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime, raw_hash, doc_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, size, mtime, raw_hash, doc_hash, time.time())
+            )
+            self._conn.commit()
+
+    def move(self, src_path: str, dest_path: str) -> None:
+        """Re-key the entry of a renamed file (no-op if the source is unknown)."""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM files WHERE path = ?", (src_path,)).fetchone() is None:
+                return
+            self._conn.execute("DELETE FROM files WHERE path = ?", (dest_path,))
+            self._conn.execute("UPDATE files SET path = ? WHERE path = ?", (dest_path, src_path))
+            self._conn.commit()
+
+    def forget(self, path: str) -> None:
+        """Remove a path from the manifest."""
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            self._conn.commit()
+
+    def forget_document(self, doc_hash: str) -> int:
+        """
+        Remove every path recorded as holding a document (e.g. it was deleted).
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM files WHERE doc_hash = ?", (doc_hash,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
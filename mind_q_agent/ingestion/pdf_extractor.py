@@ -0,0 +1,251 @@
+"""
+Shared PDF text extraction.
+
+Uploads, the watcher's ingestion pool and the CLI all read PDFs through
+PdfExtractor. Long documents are split into page ranges that are extracted
+in parallel across a process pool; the pages are joined once, separated by
+form feeds, so page boundaries survive into the text and can be mapped back
+onto chunks. Results are cached by the SHA256 of the file bytes, so a file
+saved again without changes is never parsed twice.
+"""
+
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.utils.cache import LRUCache
+
+# Optional PyMuPDF import
+try:
+    import fitz
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
+logger = logging.getLogger(__name__)
+
+# Separates pages in extracted text
+PAGE_BREAK = "\f"
+
+
+@dataclass
+class PdfText:
+    """Extracted text of a PDF and where each page starts in it."""
+    text: str
+    page_offsets: List[int]
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_offsets)
+
+    def page_at(self, char: int) -> int:
+        """1-based page number containing character offset `char`."""
+        return page_at(self.page_offsets, char)
+
+
+def page_offsets(text: str) -> List[int]:
+    """Character offsets at which each page of a PAGE_BREAK-joined text starts."""
+    offsets = [0]
+    index = text.find(PAGE_BREAK)
+    while index != -1:
+        offsets.append(index + 1)
+        index = text.find(PAGE_BREAK, index + 1)
+    return offsets
+
+
+def page_at(offsets: List[int], char: int) -> int:
+    """1-based page number containing `char`, given page start offsets."""
+    return max(1, bisect.bisect_right(offsets, char))
+
+
+def extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of pages [start, stop) (runs in a worker process).
+
+    Args:
+        path: PDF file
+        start: First page index
+        stop: Page index after the last page
+
+    Returns:
+        One string per page
+    """
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+
+def _join_pages(pages: List[str]) -> PdfText:
+    """Join pages with PAGE_BREAK, recording where each one starts."""
+    offsets = []
+    position = 0
+    for page in pages:
+        offsets.append(position)
+        position += len(page) + len(PAGE_BREAK)
+    return PdfText(text=PAGE_BREAK.join(pages), page_offsets=offsets)
+
+
+class PdfExtractor:
+    """
+    Page-parallel PDF text extractor with a content-hash cache.
+
+    Documents shorter than two page ranges are extracted in-process; so is
+    everything when the extractor itself runs in a worker process, to avoid
+    nesting process pools.
+
+    Attributes:
+        max_workers: Processes used for page ranges
+        pages_per_task: Minimum pages handed to one worker
+        cache: Extracted text by file SHA256
+    """
+
+    # Bytes read per step while hashing a file
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        pages_per_task: int = 16,
+        cache_size: int = 128,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize the extractor.
+
+        Args:
+            max_workers: Page-range processes (default: CPU count)
+            pages_per_task: Minimum pages per parallel task
+            cache_size: Number of extracted documents kept in memory
+            executor: Executor for page ranges instead of a process pool
+
+        Raises:
+            ValueError: If pages_per_task is not positive
+        """
+        if pages_per_task <= 0:
+            raise ValueError(f"pages_per_task must be positive, got {pages_per_task}")
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.cache: LRUCache[PdfText] = LRUCache(max_size=cache_size)
+        self._executor = executor
+        self._lock = threading.Lock()
+
+    def extract(self, path: Path) -> PdfText:
+        """
+        Extract the text of a PDF file, reusing the cached result for identical bytes.
+
+        Args:
+            path: PDF file
+
+        Returns:
+            PdfText with PAGE_BREAK-separated pages
+
+        Raises:
+            RuntimeError: If PyMuPDF is not installed
+        """
+        self._require_pymupdf()
+        digest = self._hash_file(path)
+        cached = self.cache.get(digest)
+        if cached is not None:
+            logger.debug(f"PDF cache hit for {path.name}")
+            return cached
+
+        with fitz.open(path) as doc:
+            page_count = doc.page_count
+            ranges = self._page_ranges(page_count)
+            if len(ranges) <= 1:
+                pages = [page.get_text() for page in doc]
+
+        if len(ranges) > 1:
+            futures = [
+                self._get_executor().submit(extract_page_range, str(path), start, stop)
+                for start, stop in ranges
+            ]
+            pages = [page for future in futures for page in future.result()]
+            logger.debug(f"Extracted {page_count} pages of {path.name} in {len(ranges)} ranges")
+
+        result = _join_pages(pages)
+        self.cache.put(digest, result)
+        return result
+
+    def extract_bytes(self, content: bytes) -> PdfText:
+        """
+        Extract the text of an in-memory PDF (in-process), with the same cache.
+
+        Args:
+            content: PDF bytes
+
+        Returns:
+            PdfText with PAGE_BREAK-separated pages
+        """
+        self._require_pymupdf()
+        digest = hashlib.sha256(content).hexdigest()
+        cached = self.cache.get(digest)
+        if cached is not None:
+            return cached
+
+        with fitz.open(stream=content, filetype="pdf") as doc:
+            result = _join_pages([page.get_text() for page in doc])
+        self.cache.put(digest, result)
+        return result
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """Split pages into contiguous [start, stop) ranges, one per parallel task."""
+        tasks = min(self.max_workers, page_count // self.pages_per_task)
+        if tasks <= 1 or multiprocessing.parent_process() is not None:
+            return [(0, page_count)]
+        size = -(-page_count // tasks)
+        return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+    def _hash_file(self, path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _get_executor(self) -> Executor:
+        """Process pool for page ranges, created on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    @staticmethod
+    def _require_pymupdf() -> None:
+        if not HAS_PYMUPDF:
+            raise RuntimeError("PyMuPDF is not installed; cannot read PDF files")
+
+    def shutdown(self) -> None:
+        """Stop the page-range processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pdf_extractor: Optional[PdfExtractor] = None
+_pdf_extractor_lock = threading.Lock()
+
+
+def get_pdf_extractor() -> PdfExtractor:
+    """Return the process-wide PdfExtractor, configured from the ingestion settings."""
+    global _pdf_extractor
+    with _pdf_extractor_lock:
+        if _pdf_extractor is None:
+            _pdf_extractor = PdfExtractor(
+                max_workers=int(ConfigManager.get("ingestion", "pdf_workers", 0)) or None,
+                pages_per_task=int(ConfigManager.get("ingestion", "pdf_pages_per_task", 16)),
+                cache_size=int(ConfigManager.get("ingestion", "pdf_cache_size", 128))
+            )
+        return _pdf_extractor
@@ -1,37 +1,100 @@
+import asyncio
 import hashlib
+import json
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
 from mind_q_agent.vector.chroma_vector import ChromaVectorDB
 from mind_q_agent.extraction.entity_extractor import EntityExtractor
 from mind_q_agent.events.bus import event_bus
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.ingestion.cooccurrence import DEFAULT_WINDOW, count_cooccurrences
+from mind_q_agent.ingestion.chunker import TextChunker
+from mind_q_agent.ingestion.jobs import COMPLETED, DUPLICATE, FAILED
+from mind_q_agent.ingestion.manifest import FileManifest
+from mind_q_agent.ingestion.pdf_extractor import PAGE_BREAK, page_at, page_offsets
+from mind_q_agent.search.lexical import LexicalIndex
 
 logger = logging.getLogger(__name__)
 
+# Called with (file_path, status, error) as each document of a batch finishes
+ProgressCallback = Callable[[Path, str, Optional[str]], Awaitable[None]]
+
 class IngestionPipeline:
     """
     Core pipeline for ingesting documents into the Mind-Q knowledge system.
     Orchestrates flow between Raw Text -> Extractor -> Vector DB -> Graph DB.
+    
+    Blocking work never runs on the event loop: entity extraction runs in the
+    loop's default executor, and all storage runs on one dedicated writer
+    thread, so the graph has a single writer no matter how many event loops
+    or threads submit documents.
+    
+    Content is stored once: every path holding the same text is linked to
+    one Document, which is deleted only when its last path goes away.
     """
     
-    def __init__(self, graph_db: KuzuGraphDB, vector_store: ChromaVectorDB):
+    def __init__(
+        self,
+        graph_db: KuzuGraphDB,
+        vector_store: ChromaVectorDB,
+        cooccurrence_window: Optional[int] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        manifest: Optional[FileManifest] = None
+    ):
         self.graph_db = graph_db
         self.vector_store = vector_store
-        self.extractor = EntityExtractor()
+        # BM25 index kept in step with the vector store's chunks
+        self.lexical_index = lexical_index
+        # File manifest whose entries are invalidated when their document is deleted
+        self.manifest = manifest
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="IngestionWriter")
+        # Long documents are parsed in bounded segments to cap spaCy memory
+        self.extractor = EntityExtractor(
+            segment_size=int(ConfigManager.get("ingestion", "nlp_segment_size", 100000))
+        )
+        # Max token distance for two concepts to count as co-occurring
+        self.cooccurrence_window = int(
+            cooccurrence_window
+            or ConfigManager.get("ingestion", "cooccurrence_window", DEFAULT_WINDOW)
+        )
+        # Chunks are sized to fit the embedding model so long documents are not truncated
+        self.chunker = TextChunker(
+            chunk_size=int(ConfigManager.get("ingestion", "chunk_size", 1000)),
+            overlap=int(ConfigManager.get("ingestion", "chunk_overlap", 200)),
+            token_counter=vector_store.count_tokens,
+            max_tokens=vector_store.max_seq_length
+        )
+        # spaCy batching for multi-document ingestion
+        self.nlp_batch_size = int(ConfigManager.get("ingestion", "nlp_batch_size", 32))
+        self.nlp_processes = int(ConfigManager.get("ingestion", "nlp_processes", 1))
+        # Names of concepts known to exist in the graph; lets the pipeline skip
+        # the existence probe and the embedding for recurring concepts.
+        self._known_concepts: Set[str] = self._load_known_concepts()
 
-    async def process_document(self, file_path: Path, text: str) -> bool:
+    async def process_document(
+        self,
+        file_path: Path,
+        text: str,
+        extracted_data: Optional[Dict[str, List[Any]]] = None
+    ) -> bool:
         """
         Process a single document.
         
         Args:
             file_path: Absolute path to the file
             text: Raw text content
+            extracted_data: Pre-computed extractor output (e.g. from extract_many);
+                            extracted here when omitted
             
         Returns:
             True if successfully processed, False otherwise (e.g. duplicate)
         """
+        loop = asyncio.get_running_loop()
         try:
             # 1. Generate file hash (SHA256)
             file_hash = self._calculate_hash(text)
@@ -39,46 +102,23 @@ class IngestionPipeline:
             await event_bus.emit("ingestion_started", {"filename": file_path.name, "hash": file_hash})
             
             # 2. Check Graph for existing Document node (deduplication)
-            if self._document_exists(file_hash):
+            if await loop.run_in_executor(self._writer, self._is_duplicate, file_path, file_hash):
                 logger.info(f"Skipping duplicate document: {file_path.name}")
                 return False
                 
             logger.info(f"Processing new document: {file_path.name}")
             
             # 3. Extract entities/concepts
-            extracted_data = self.extractor.extract_all(text)
+            if extracted_data is None:
+                extracted_data = await loop.run_in_executor(None, self.extractor.extract_all, text)
             
-            # Combine entities and concepts for graph nodes
-            # Entities have label info, concepts are just strings.
-            # For this Phase, we treat them similarly but could use labels for categories.
-            
-            # 4. Store in VectorDB
-            self.vector_store.add_documents(
-                documents=[text],
-                metadatas=[{
-                    "source": str(file_path),
-                    "filename": file_path.name
-                }],
-                ids=[file_hash]
+            # 4-6. Store chunks, concepts and edges on the writer thread
+            stored = await loop.run_in_executor(
+                self._writer, self._store_document, file_path, file_hash, text, extracted_data
             )
-            
-            # 5. Store in GraphDB
-            # Create Document Node
-            self._create_document_node(file_path, file_hash, len(text))
-            
-            # Create Concept Nodes and Edges
-            # Process generic concepts
-            for concept in extracted_data["concepts"]:
-                self._process_concept(file_hash, concept, "General")
-                
-            # Process named entities
-            for entity in extracted_data["entities"]:
-                # entity is dict {'text': '...', 'label': '...'}
-                self._process_concept(file_hash, entity['text'], entity['label'])
-
-            # 6. Create Co-occurrence Edges (Concept <-> Concept)
-            all_concept_names = extracted_data["concepts"] + [e['text'] for e in extracted_data["entities"]]
-            self._create_concept_edges(all_concept_names)
+            if not stored:
+                logger.info(f"Skipping duplicate document: {file_path.name}")
+                return False
 
             logger.info(f"Successfully processed {file_path.name}")
             await event_bus.emit("ingestion_completed", {"filename": file_path.name, "hash": file_hash})
@@ -89,22 +129,534 @@ class IngestionPipeline:
             await event_bus.emit("ingestion_failed", {"filename": file_path.name, "error": str(e)})
             raise e
 
-    def _process_concept(self, doc_hash: str, name: str, category: str):
-        """Helper to create concept node and link to document."""
+    def _store_document(
+        self,
+        file_path: Path,
+        file_hash: str,
+        text: str,
+        extracted_data: Dict[str, List[Any]]
+    ) -> bool:
+        """
+        Write one document to both stores (runs on the writer thread).
+        
+        Documents are versioned by path: when the path already has a Document
+        with different content, unchanged chunks keep their embeddings, and
+        concept frequencies and co-occurrence edges are adjusted by the
+        difference between the versions before the old version is removed.
+        
+        Returns:
+            False if the document was stored concurrently since the first check
+        """
+        # Re-check on the writer thread: it is the only place documents are created
+        if self._is_duplicate(file_path, file_hash):
+            return False
+        
+        previous = self._previous_versions(file_path, file_hash)
+        
+        # 4. Store in VectorDB (one record per chunk, embedded in batches);
+        # chunks identical to the previous version reuse its embeddings
+        reusable: Dict[str, List[float]] = {}
+        for version in previous:
+            reusable.update(self.vector_store.get_document_chunks(version["hash"]))
         try:
-            # Generate embedding for the concept/entity name
-            embedding = self.vector_store.get_embedding(name)
-            
-            self.graph_db.create_concept(
-                name=name,
-                embedding=embedding,
-                category=category
+            self._store_chunks(file_path, file_hash, text, reusable)
+        
+            # 5. Store in GraphDB
+            # Only genuinely new concepts are embedded; existing ones just get
+            # their frequency bumped. Embeddings are computed up front so the
+            # graph transaction only contains database work.
+            categories = self._collect_concepts(extracted_data)
+            existing = self._existing_concepts(categories)
+            new_rows = self._build_concept_rows(
+                {name: category for name, category in categories.items() if name not in existing}
             )
+            all_concept_names = list(categories)
+            pair_counts = count_cooccurrences(extracted_data.get("mentions", []), self.cooccurrence_window)
+        
+            # All graph writes for the document go through one transaction, so a
+            # failure midway never leaves a half-ingested document behind.
+            with self.graph_db.transaction():
+                self._create_document_node(file_path, file_hash, len(text), pair_counts)
+                self.graph_db.upsert_concepts(new_rows)
+                self.graph_db.link_document(file_hash, all_concept_names)
+            
+                # 6. Concept frequencies and co-occurrence edges (Concept <-> Concept),
+                # net of the versions this document replaces (those no other path holds)
+                released, repointed = self._release_versions(file_path, previous)
+                created = {row["name"] for row in new_rows}
+                self._apply_delta(
+                    [name for name in all_concept_names if name not in created], pair_counts, released
+                )
         except Exception:
-            # Ignore if exists
-            pass
+            # The graph rolled back: drop this version's chunks too, so no
+            # passage stays searchable without a Document behind it
+            self._discard_chunks(file_hash)
+            raise
+        
+        # Only remember concepts once the transaction has committed
+        self._known_concepts.update(all_concept_names)
+        self._finish_release(released, repointed)
+        if previous:
+            logger.info(f"Replaced {len(previous)} previous version(s) of {file_path.name}")
+        return True
+
+    async def remove_document(self, file_path: Path) -> bool:
+        """
+        Remove a deleted file's document from both stores.
+        
+        A document other paths still hold (byte-identical copies) is kept
+        and only loses this path.
+        
+        Args:
+            file_path: Path the document was ingested from
+            
+        Returns:
+            True if a document was removed
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            removed = await loop.run_in_executor(self._writer, self._remove_versions, file_path)
+        except Exception as e:
+            logger.error(f"Failed to remove {file_path.name}: {e}")
+            raise
+        if removed:
+            logger.info(f"Removed {file_path.name} from the knowledge base")
+            await event_bus.emit("document_removed", {"filename": file_path.name, "path": str(file_path)})
+        return removed
+
+    async def move_document(self, src_path: Path, dest_path: Path) -> bool:
+        """
+        Re-key a renamed document to its new path in both stores.
+
+        A document previously stored for `dest_path` (the rename replaced it)
+        is removed first.
+
+        Args:
+            src_path: Path the document was ingested from
+            dest_path: Path it was renamed to
+
+        Returns:
+            True if a document was moved
+        """
+        loop = asyncio.get_running_loop()
+        moved = await loop.run_in_executor(self._writer, self._move_versions, src_path, dest_path)
+        if moved:
+            logger.info(f"Moved {src_path.name} to {dest_path}")
+        return moved
+
+    def _move_versions(self, src_path: Path, dest_path: Path) -> bool:
+        """Point the Document versions of `src_path` at `dest_path` (runs on the writer thread)."""
+        versions = self.graph_db.get_documents_by_path(str(src_path))
+        if not versions:
+            return False
+        moving = {version["hash"] for version in versions}
+        replaced = [
+            version for version in self.graph_db.get_documents_by_path(str(dest_path))
+            if version["hash"] not in moving
+        ]
+        with self.graph_db.transaction():
+            self.graph_db.remove_document_path(str(src_path))
+            for doc_hash in moving:
+                self.graph_db.add_document_path(doc_hash, str(dest_path))
+            released, repointed = self._release_versions(dest_path, replaced)
+            if released:
+                self._apply_delta([], {}, released)
+            # Documents shown under another path (a byte-identical copy) keep it
+            renamed = [version["hash"] for version in versions if version.get("source") == str(src_path)]
+            for doc_hash in renamed:
+                self.graph_db.move_document(doc_hash, str(dest_path), dest_path.name)
+        self._finish_release(released, repointed + [(doc_hash, str(dest_path)) for doc_hash in renamed])
+        return True
+
+    def _remove_versions(self, file_path: Path, keep_hash: Optional[str] = None) -> bool:
+        """
+        Unlink a path from its Document versions, except `keep_hash` (runs on the writer thread).
+        
+        Versions no other path holds are deleted.
+        """
+        previous = self._previous_versions(file_path, keep_hash)
+        if not previous:
+            return False
+        with self.graph_db.transaction():
+            if keep_hash is None:
+                self.graph_db.remove_document_path(str(file_path))
+            released, repointed = self._release_versions(file_path, previous)
+            if released:
+                self._apply_delta([], {}, released)
+        self._finish_release(released, repointed)
+        return True
+
+    def _is_duplicate(self, file_path: Path, file_hash: str) -> bool:
+        """
+        Check whether this exact content is already stored.
+        
+        If so, the path is linked to the stored Document (it may be a copy
+        of another file), and any other version still recorded for the path
+        is stale (the file now matches an existing document) and is released.
+        """
+        if not self._document_exists(file_hash):
+            return False
+        self._link_path(file_path, file_hash)
+        return True
+
+    def _link_path(self, file_path: Path, file_hash: str) -> None:
+        """Link a path to a stored document, releasing the path's other versions."""
+        self._remove_versions(file_path, keep_hash=file_hash)
+        if str(file_path) not in self.graph_db.get_document_paths(file_hash):
+            self.graph_db.add_document_path(file_hash, str(file_path))
+
+    async def link_document(self, file_path: Path, doc_hash: str) -> bool:
+        """
+        Record a file as another copy of a stored document, without reading it.
+        
+        Used for files whose raw bytes match an already ingested file.
+        
+        Args:
+            file_path: Path of the copy
+            doc_hash: Hash of the stored document
+            
+        Returns:
+            False if the document is no longer stored (the file must be ingested)
+        """
+        loop = asyncio.get_running_loop()
+        linked = await loop.run_in_executor(self._writer, self._is_duplicate, file_path, doc_hash)
+        if linked:
+            logger.info(f"Linked {file_path.name} to stored document {doc_hash[:8]}")
+        return linked
+
+    def _release_versions(
+        self,
+        file_path: Path,
+        versions: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]:
+        """
+        Split versions leaving a path into those to delete and those other paths still hold.
+        
+        Runs inside the caller's transaction, after the path's link has been
+        removed or replaced. A kept document shown under `file_path` is
+        re-pointed at one of its remaining paths.
+        
+        Returns:
+            (versions no other path holds, (hash, new source path) of re-pointed ones)
+        """
+        released: List[Dict[str, Any]] = []
+        repointed: List[Tuple[str, str]] = []
+        for version in versions:
+            others = [path for path in self.graph_db.get_document_paths(version["hash"]) if path != str(file_path)]
+            if not others:
+                released.append(version)
+            elif version.get("source") == str(file_path):
+                self.graph_db.move_document(version["hash"], others[0], Path(others[0]).name)
+                repointed.append((version["hash"], others[0]))
+        return released, repointed
+
+    def _finish_release(self, released: List[Dict[str, Any]], repointed: List[Tuple[str, str]]) -> None:
+        """Apply a committed release to the chunk stores and the manifest."""
+        self._delete_chunks(released)
+        for doc_hash, source in repointed:
+            self.vector_store.update_document_source(doc_hash, source, Path(source).name)
+            if self.lexical_index is not None:
+                self.lexical_index.update_document_source(doc_hash, source, Path(source).name)
+        if self.manifest is not None:
+            # Files recorded as holding a deleted document must be ingested again
+            for version in released:
+                try:
+                    self.manifest.forget_document(version["hash"])
+                except Exception as e:
+                    logger.warning(f"Failed to update file manifest for {version['hash'][:8]}: {e}")
+
+    def _previous_versions(self, file_path: Path, file_hash: Optional[str]) -> List[Dict[str, Any]]:
+        """Documents stored for this path other than `file_hash`."""
+        return [
+            version for version in self.graph_db.get_documents_by_path(str(file_path))
+            if version["hash"] != file_hash
+        ]
+
+    def _apply_delta(
+        self,
+        concept_names: List[str],
+        pair_counts: Dict[Tuple[str, str], int],
+        previous: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Adjust frequencies and edges for a new version, then drop the old ones.
+        
+        Runs inside the caller's transaction. Concept frequencies move by the
+        difference between the new concept set and the previous versions',
+        and co-occurrence edges by the difference in pair counts, so a small
+        edit only touches what changed.
+        
+        Args:
+            concept_names: Already existing concepts discussed by the new version
+            pair_counts: Co-occurrence counts of the new version
+            previous: Versions being replaced (hash and stored pair counts)
+        """
+        frequency: Counter = Counter(concept_names)
+        pairs: Counter = Counter(pair_counts)
+        for version in previous:
+            frequency.subtract(self.graph_db.get_document_concepts(version["hash"]))
+            pairs.subtract(self._load_pair_counts(version))
+        
+        by_amount: Dict[int, List[str]] = {}
+        for name, amount in frequency.items():
+            if amount:
+                by_amount.setdefault(amount, []).append(name)
+        for amount, names in sorted(by_amount.items()):
+            self.graph_db.increment_concept_frequency(names, amount)
+        
+        added = {pair: n for pair, n in pairs.items() if n > 0}
+        if added:
+            self.graph_db.upsert_cooccurrence_edges(added)
+        removed = {pair: -n for pair, n in pairs.items() if n < 0}
+        if removed:
+            self.graph_db.weaken_cooccurrence_edges(removed)
+        
+        for version in previous:
+            self.graph_db.delete_document(version["hash"])
+        dropped = [name for name, amount in frequency.items() if amount < 0]
+        if dropped:
+            self._known_concepts.difference_update(self.graph_db.delete_orphan_concepts(dropped))
+
+    def _delete_chunks(self, previous: List[Dict[str, Any]]) -> None:
+        """Delete the chunks of replaced versions (after the graph commit)."""
+        for version in previous:
+            self.vector_store.delete_document(version["hash"])
+            if self.lexical_index is not None:
+                self.lexical_index.delete_document(version["hash"])
+
+    def _discard_chunks(self, file_hash: str) -> None:
+        """Best-effort removal of the chunks of a version whose graph write failed."""
+        try:
+            self._delete_chunks([{"hash": file_hash}])
+        except Exception as e:
+            logger.error(f"Could not discard chunks of {file_hash[:8]}: {e}")
+
+    @staticmethod
+    def _load_pair_counts(version: Dict[str, Any]) -> Dict[Tuple[str, str], int]:
+        """
+        Decode the co-occurrence counts stored on a Document.
+        
+        Documents ingested before counts were stored have none; their edges
+        are left as they are.
+        """
+        raw = version.get("cooccurrence")
+        if not raw or not isinstance(raw, str):
+            return {}
+        try:
+            return {(a, b): int(n) for a, b, n in json.loads(raw)}
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring malformed co-occurrence counts on {version['hash'][:8]}: {e}")
+            return {}
+
+    async def process_batch(
+        self,
+        documents: List[Tuple[Path, str]],
+        progress: Optional[ProgressCallback] = None
+    ) -> int:
+        """
+        Process many documents, extracting entities through spaCy's nlp.pipe.
+        
+        Duplicates (already ingested or repeated within the batch) are dropped
+        before extraction; their paths are linked to the stored document. Extraction results stream in windows of
+        `nlp_batch_size` documents; the new concepts of a whole window are
+        embedded in one call before its documents are written one by one.
+        A failing document does not stop the batch.
+        
+        Args:
+            documents: (file_path, text) pairs
+            progress: Awaited with (file_path, status, error) as each document finishes
             
-        self._create_discusses_edge(doc_hash, name)
+        Returns:
+            Number of documents successfully processed
+        """
+        async def report(file_path: Path, status: str, error: Optional[str] = None) -> None:
+            if progress is not None:
+                await progress(file_path, status, error)
+
+        loop = asyncio.get_running_loop()
+        pending: List[Tuple[Path, str]] = []
+        # Later copies of content first stored by this batch
+        copies: List[Tuple[Path, str]] = []
+        seen: Set[str] = set()
+        for file_path, text in documents:
+            if not text or not text.strip():
+                await report(file_path, FAILED, "No text to ingest")
+                continue
+            file_hash = self._calculate_hash(text)
+            if file_hash in seen:
+                copies.append((file_path, text))
+                continue
+            if await loop.run_in_executor(self._writer, self._is_duplicate, file_path, file_hash):
+                logger.info(f"Skipping duplicate document: {file_path.name}")
+                await report(file_path, DUPLICATE)
+                continue
+            seen.add(file_hash)
+            pending.append((file_path, text))
+        
+        extracted = self.extractor.extract_many(
+            (text for _, text in pending),
+            batch_size=self.nlp_batch_size,
+            n_process=self.nlp_processes
+        )
+        
+        processed = 0
+        stored: Set[str] = set()
+        window = max(1, self.nlp_batch_size)
+        for start in range(0, len(pending), window):
+            group = pending[start:start + window]
+            # Pull the next streamed results off the event loop
+            results = [await loop.run_in_executor(None, next, extracted, None) for _ in group]
+            await loop.run_in_executor(
+                self._writer, self._prepare_concepts, [data for data in results if data]
+            )
+            
+            for (file_path, text), extracted_data in zip(group, results):
+                try:
+                    if await self.process_document(file_path, text, extracted_data):
+                        processed += 1
+                        await report(file_path, COMPLETED)
+                    else:
+                        await report(file_path, DUPLICATE)
+                    stored.add(self._calculate_hash(text))
+                except Exception as e:
+                    logger.error(f"Batch ingestion failed for {file_path.name}: {e}")
+                    await report(file_path, FAILED, str(e))
+        
+        # Copies are linked to the document stored above, or fail with it
+        for file_path, text in copies:
+            file_hash = self._calculate_hash(text)
+            if file_hash not in stored:
+                await report(file_path, FAILED, "An identical document in the batch failed to ingest")
+                continue
+            try:
+                await loop.run_in_executor(self._writer, self._link_path, file_path, file_hash)
+                await report(file_path, DUPLICATE)
+            except Exception as e:
+                logger.error(f"Batch ingestion failed for {file_path.name}: {e}")
+                await report(file_path, FAILED, str(e))
+        
+        return processed
+
+    def _prepare_concepts(self, extractions: List[Dict[str, List[Any]]]) -> None:
+        """
+        Embed the new concepts of several documents in one call (runs on the writer thread).
+        
+        The embeddings land in the vector store's embedding cache, so the
+        per-document writes that follow do not encode them again.
+        """
+        try:
+            categories: Dict[str, str] = {}
+            for extracted_data in extractions:
+                categories.update(self._collect_concepts(extracted_data))
+            existing = self._existing_concepts(categories)
+            new_names = [name for name in categories if name not in existing]
+            if new_names:
+                self.vector_store.get_embeddings(new_names)
+        except Exception as e:
+            # Only a warm-up: each document still embeds what it needs
+            logger.warning(f"Could not pre-embed batch concepts: {e}")
+
+    def _store_chunks(
+        self,
+        file_path: Path,
+        file_hash: str,
+        text: str,
+        reusable: Optional[Dict[str, List[float]]] = None
+    ) -> int:
+        """
+        Split the document into chunks and store them in the vector DB
+        (and the lexical index, when there is one).
+        
+        Chunk ids are `<file_hash>:<n>`; metadata carries the parent document
+        hash and character offsets so search can map hits back to documents.
+        Texts with page breaks (PDFs) also get the chunk's first and last page.
+        
+        Args:
+            reusable: Embeddings by chunk text (e.g. from the previous version);
+                      only chunks not found here are embedded
+        
+        Returns:
+            Number of chunks stored
+        """
+        chunks = self.chunker.split(text)
+        pages = page_offsets(text) if PAGE_BREAK in text else None
+        metadatas = []
+        for chunk in chunks:
+            metadata = {
+                "source": str(file_path),
+                "filename": file_path.name,
+                "doc_hash": file_hash,
+                "chunk_index": chunk.index,
+                "start_char": chunk.start,
+                "end_char": chunk.end
+            }
+            if pages is not None:
+                metadata["page_start"] = page_at(pages, chunk.start)
+                metadata["page_end"] = page_at(pages, max(chunk.start, chunk.end - 1))
+            metadatas.append(metadata)
+        
+        ids = [f"{file_hash}:{chunk.index}" for chunk in chunks]
+        kwargs: Dict[str, Any] = {}
+        if reusable:
+            kwargs["embeddings"] = [reusable.get(chunk.text) for chunk in chunks]
+        self.vector_store.add_documents(
+            documents=[chunk.text for chunk in chunks],
+            metadatas=metadatas,
+            ids=ids,
+            **kwargs
+        )
+        if self.lexical_index is not None:
+            self.lexical_index.add(ids, [chunk.text for chunk in chunks], metadatas)
+        logger.debug(f"Stored {len(chunks)} chunks for {file_path.name}")
+        return len(chunks)
+
+    def _collect_concepts(self, extracted_data: Dict[str, List[Any]]) -> Dict[str, str]:
+        """
+        Map every unique concept name to its category.
+        
+        Generic concepts are categorised as "General"; named entities keep their label.
+        """
+        categories: Dict[str, str] = {}
+        for concept in extracted_data["concepts"]:
+            categories.setdefault(concept, "General")
+        for entity in extracted_data["entities"]:
+            # entity is dict {'text': '...', 'label': '...'}
+            categories.setdefault(entity['text'], entity['label'])
+        return categories
+
+    def _existing_concepts(self, names: Dict[str, str]) -> Set[str]:
+        """
+        Return the names that already exist in the graph.
+        
+        Names in the known-concept set are trusted; the rest are checked with
+        a single bulk probe.
+        """
+        existing = {name for name in names if name in self._known_concepts}
+        unknown = [name for name in names if name not in existing]
+        if unknown:
+            found = self.graph_db.existing_concepts(unknown)
+            self._known_concepts.update(found)
+            existing.update(found)
+        return existing
+
+    def _build_concept_rows(self, categories: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Build one concept row (name, category, embedding) per concept, embedded in one batch."""
+        names = list(categories)
+        embeddings = self.vector_store.get_embeddings(names) if names else []
+        return [
+            {"name": name, "category": categories[name], "embedding": embedding}
+            for name, embedding in zip(names, embeddings)
+        ]
+
+    def _load_known_concepts(self) -> Set[str]:
+        """Warm the known-concept set from the graph."""
+        try:
+            names = set(self.graph_db.get_concept_names())
+            logger.debug(f"Loaded {len(names)} known concepts")
+            return names
+        except Exception as e:
+            logger.warning(f"Could not warm known-concept set: {e}")
+            return set()
 
     def _calculate_hash(self, text: str) -> str:
         return hashlib.sha256(text.encode('utf-8')).hexdigest()
@@ -115,8 +667,19 @@ class IngestionPipeline:
         df = self.graph_db.execute(query, {'hash': file_hash})
         return not df.empty
 
-    def _create_document_node(self, path: Path, file_hash: str, size: int):
-        """Create the Document node in KuzuDB."""
+    def _create_document_node(
+        self,
+        path: Path,
+        file_hash: str,
+        size: int,
+        pair_counts: Optional[Dict[Tuple[str, str], int]] = None
+    ):
+        """
+        Create the Document node in KuzuDB.
+        
+        The document's co-occurrence counts are stored with it (JSON) so they
+        can be subtracted again when the document is replaced or deleted.
+        """
         from datetime import datetime
         query = """
             CREATE (d:Document {
@@ -125,7 +688,8 @@ class IngestionPipeline:
                 source_path: $path,
                 source_type: $ext,
                 created_at: $created_at,
-                size_bytes: $size
+                size_bytes: $size,
+                cooccurrence: $cooccurrence
             })
         """
         params = {
@@ -134,59 +698,8 @@ class IngestionPipeline:
             'path': str(path),
             'ext': path.suffix,
             'created_at': datetime.now().isoformat(),
-            'size': size
+            'size': size,
+            'cooccurrence': json.dumps([[a, b, n] for (a, b), n in sorted((pair_counts or {}).items())])
         }
         self.graph_db.execute(query, params)
-
-    def _create_discusses_edge(self, doc_hash: str, concept_name: str):
-        """Create DISCUSSES edge between Document and Concept."""
-        query = """
-            MATCH (d:Document {hash: $doc_hash}), (c:Concept {name: $concept})
-            CREATE (d)-[:DISCUSSES {strength: 1.0}]->(c)
-        """
-        self.graph_db.execute(query, {'doc_hash': doc_hash, 'concept': concept_name})
-    def _create_concept_edges(self, concepts: List[str]):
-        """
-        Create RELATED_TO edges between all co-occurring concepts.
-        This forms the semantic network foundation.
-        """
-        if len(concepts) < 2:
-            return
-
-        import itertools
-        
-        # Deduplicate and sort for consistent edge creation
-        unique_concepts = sorted(list(set(concepts)))
-        
-        for c1, c2 in itertools.combinations(unique_concepts, 2):
-            # Create undirected edge (conceptually). 
-            # In GraphDB we often create one directed edge or two if strictly directed.
-            # Kuzu's RELATED_TO is likely directed in schema, but semantically symmetric here.
-            # We'll create one direction for minimal redundancy, or based on lexicographical order.
-            
-            from datetime import datetime
-            query = """
-                MATCH (a:Concept {name: $c1}), (b:Concept {name: $c2})
-                OPTIONAL MATCH (a)-[r:RELATED_TO]->(b)
-                WITH a, b, r
-                WHERE r IS NULL
-                CREATE (a)-[:RELATED_TO {
-                    base_weight: 1.0, 
-                    current_weight: 1.0,
-                    sample_size: 1,
-                    confidence: 0.5,
-                    observation_variance: 0.0,
-                    last_accessed: $now_ts,
-                    decay_rate: 0.01
-                }]->(b)
-            """
-            
-            # Use 'create if not exists' logic logic via MERGE if Kuzu fully supports it,
-            # but here explicit check via OPTIONAL MATCH is safer for Kuzu versions.
-            # Or just blindly CREATE if we accept potential dupes (cleaner is better).
-            # Let's use the query above.
-            
-            try:
-                self.graph_db.execute(query, {'c1': c1, 'c2': c2, 'now_ts': datetime.now().isoformat()})
-            except Exception as e:
-                logger.warning(f"Failed to link concepts {c1}-{c2}: {e}")
+        self.graph_db.add_document_path(file_hash, str(path))
@@ -0,0 +1,383 @@
+"""
+Parallel ingestion pool.
+
+File events flow through three stages:
+
+    bounded event queue -> N extraction processes -> single graph writer
+
+Extraction processes read the file and run entity extraction; the writer
+thread embeds and stores documents one batch at a time, because KùzuDB
+supports a single writer. Every queue between stages is bounded, so a burst
+of new files slows the producer down instead of filling memory.
+
+With a FileManifest, every file the writer finishes is recorded (stat data,
+raw-bytes hash, document hash), so the watcher can skip it next time.
+Deleted and renamed files, and copies of already ingested files, skip
+extraction and go straight to the writer, after the extractions queued
+before them.
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from queue import Empty, Full, Queue
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.extraction.entity_extractor import EntityExtractor
+from mind_q_agent.ingestion.manifest import FileManifest
+from mind_q_agent.ingestion.pipeline import IngestionPipeline
+from mind_q_agent.ingestion.runner import LINKED, PATH_EVENTS, IngestionRunner
+from mind_q_agent.ingestion.text_reader import read_text
+
+logger = logging.getLogger(__name__)
+
+# Per-process extractor, created lazily inside each extraction worker
+_extractor: Optional[EntityExtractor] = None
+
+
+@dataclass
+class ExtractedDocument:
+    """Output of the extraction stage, ready for the writer."""
+    path: Path
+    text: str
+    file_hash: str
+    extracted_data: Dict[str, List[Any]]
+    # Watcher event the document came from (stat data, raw hash)
+    event: Dict[str, Any] = field(default_factory=dict)
+
+
+def extract_document(filepath: str, segment_size: int = 100000) -> Optional[ExtractedDocument]:
+    """
+    Read a file and extract its entities (runs in an extraction process).
+
+    Args:
+        filepath: File to read
+        segment_size: Maximum characters spaCy parses at once
+
+    Returns:
+        ExtractedDocument, or None if the file has no text
+    """
+    global _extractor
+    path = Path(filepath)
+    text = read_text(path)
+    if not text or not text.strip():
+        return None
+
+    if _extractor is None:
+        _extractor = EntityExtractor(segment_size=segment_size)
+
+    return ExtractedDocument(
+        path=path,
+        text=text,
+        file_hash=hashlib.sha256(text.encode('utf-8')).hexdigest(),
+        extracted_data=_extractor.extract_all(text)
+    )
+
+
+@dataclass
+class IngestionStats:
+    """Thread-safe per-stage counters."""
+    queued: int = 0
+    extracted: int = 0
+    empty: int = 0
+    written: int = 0
+    skipped: int = 0
+    changed: int = 0
+    failed: int = 0
+    extract_seconds: float = 0.0
+    write_seconds: float = 0.0
+    started_at: float = field(default_factory=time.time)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **amounts: float) -> None:
+        """Increment one or more counters."""
+        with self._lock:
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return counters plus per-stage throughput (documents/second)."""
+        with self._lock:
+            elapsed = max(time.time() - self.started_at, 1e-9)
+            return {
+                "queued": self.queued,
+                "extracted": self.extracted,
+                "empty": self.empty,
+                "written": self.written,
+                "skipped": self.skipped,
+                "changed": self.changed,
+                "failed": self.failed,
+                "extract_seconds": self.extract_seconds,
+                "write_seconds": self.write_seconds,
+                "extract_rate": self.extracted / elapsed,
+                "write_rate": self.written / elapsed,
+            }
+
+
+class IngestionPool:
+    """
+    Extraction process pool feeding a single graph-writer thread.
+
+    Attributes:
+        queue: Bounded queue of file events (give this to the FileWatcher)
+        stats: Per-stage throughput counters
+    """
+
+    def __init__(
+        self,
+        pipeline: IngestionPipeline,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        write_batch_size: int = 32,
+        executor: Optional[Executor] = None,
+        runner: Optional[IngestionRunner] = None,
+        manifest: Optional[FileManifest] = None
+    ):
+        """
+        Initialize the pool (nothing runs until start()).
+
+        Args:
+            pipeline: Pipeline used by the writer thread
+            workers: Number of extraction processes (default: config, 0 = all CPUs)
+            queue_size: Capacity of the event and write queues (default: config)
+            write_batch_size: Maximum documents the writer takes per batch
+            executor: Executor to use instead of a process pool (e.g. for tests)
+            runner: Shared runner used by the writer (a new one wrapping `pipeline` by default)
+            manifest: File manifest updated as documents are written
+        """
+        workers = workers if workers is not None else int(ConfigManager.get("ingestion", "workers", 0))
+        queue_size = queue_size or int(ConfigManager.get("ingestion", "queue_size", 256))
+
+        self.pipeline = pipeline
+        self.runner = runner or IngestionRunner(pipeline)
+        self.manifest = manifest
+        if manifest is not None and getattr(pipeline, "manifest", None) is None:
+            # Entries of documents the pipeline deletes must be invalidated
+            pipeline.manifest = manifest
+        self.workers = workers or os.cpu_count() or 1
+        self.write_batch_size = write_batch_size
+        self.segment_size = int(ConfigManager.get("ingestion", "nlp_segment_size", 100000))
+        self.queue: Queue = Queue(maxsize=queue_size)
+        self.stats = IngestionStats()
+
+        self._executor = executor
+        self._write_queue: Queue = Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the extraction processes, dispatcher and writer threads."""
+        if self._executor is None:
+            # Spawn, not fork: the parent already holds model and DB threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._dispatch_loop, name="IngestionDispatcher", daemon=True),
+            threading.Thread(target=self._write_loop, name="IngestionWriter", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Ingestion pool started with {self.workers} extraction workers")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Finish queued work and shut down.
+
+        Args:
+            timeout: Seconds to wait for each stage to drain
+        """
+        self.queue.put("STOP")
+        for thread in self._threads:
+            thread.join(timeout)
+        self._stop_event.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        logger.info(f"Ingestion pool stopped: {self.stats.snapshot()}")
+
+    def _dispatch_loop(self) -> None:
+        """Submit queued events to the extraction workers, in order."""
+        in_flight: Deque[Tuple[Dict[str, Any], Future]] = deque()
+        max_in_flight = self.workers * 2
+
+        while True:
+            try:
+                item = self.queue.get(timeout=0.5 if not in_flight else 0.05)
+            except Empty:
+                # Nothing new: hand over the oldest finished result, if any
+                if in_flight and in_flight[0][1].done():
+                    self._forward(*in_flight.popleft())
+                continue
+
+            try:
+                if item == "STOP":
+                    while in_flight:
+                        self._forward(*in_flight.popleft())
+                    self._put_write(("STOP", None))
+                    return
+
+                if not isinstance(item, dict) or not item.get("filepath"):
+                    logger.warning(f"Invalid item in queue: {item}")
+                    continue
+
+                if item.get("event_type") in PATH_EVENTS:
+                    # Keep order with the file's earlier events
+                    while in_flight:
+                        self._forward(*in_flight.popleft())
+                    self._put_write(("PATH", item))
+                    continue
+
+                self.stats.add(queued=1)
+                in_flight.append((item, self._executor.submit(
+                    _timed_extract, item["filepath"], self.segment_size
+                )))
+                # Bound in-flight work; waiting here is what slows the watcher down
+                while len(in_flight) >= max_in_flight or (in_flight and in_flight[0][1].done()):
+                    self._forward(*in_flight.popleft())
+            except Exception as e:
+                # Critical catch-all to prevent thread death
+                logger.error(f"Dispatcher error: {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+
+    def _forward(self, event: Dict[str, Any], future: Future) -> None:
+        """Pass a finished extraction to the writer."""
+        try:
+            document, seconds = future.result()
+        except Exception as e:
+            logger.error(f"Extraction failed: {e}")
+            self.stats.add(failed=1)
+            return
+
+        self.stats.add(extract_seconds=seconds)
+        if document is None:
+            self.stats.add(empty=1)
+            self._record(event, None)
+            return
+        self.stats.add(extracted=1)
+        document.event = event
+        self._put_write(("DOC", document))
+
+    def _put_write(self, item: Any) -> None:
+        """Blocking put onto the write queue."""
+        while True:
+            try:
+                self._write_queue.put(item, timeout=0.5)
+                return
+            except Full:
+                if self._stop_event.is_set():
+                    return
+
+    def _write_loop(self) -> None:
+        """Single writer: store extracted documents in small batches on one event loop."""
+        loop = asyncio.new_event_loop()
+        try:
+            self._write_batches(loop)
+        finally:
+            loop.close()
+
+    def _write_batches(self, loop: asyncio.AbstractEventLoop) -> None:
+        while True:
+            item = self._write_queue.get()
+            if item[0] == "STOP":
+                return
+
+            batch = [item]
+            stop_requested = False
+            while len(batch) < self.write_batch_size:
+                try:
+                    item = self._write_queue.get_nowait()
+                except Empty:
+                    break
+                if item[0] == "STOP":
+                    stop_requested = True
+                    break
+                batch.append(item)
+
+            started = time.perf_counter()
+            try:
+                loop.run_until_complete(self._write_batch(batch))
+            except Exception as e:
+                logger.error(f"Writer error: {e}", exc_info=True)
+            self.stats.add(write_seconds=time.perf_counter() - started)
+
+            if stop_requested:
+                return
+
+    async def _write_batch(self, batch: List[Tuple[str, Any]]) -> None:
+        """Write a batch of documents and path changes, isolating per-item failures."""
+        for kind, document in batch:
+            if kind == "PATH":
+                await self._apply_change(document)
+                continue
+            try:
+                if await self.runner.ingest(
+                    document.path, document.text, document.extracted_data
+                ):
+                    self.stats.add(written=1)
+                else:
+                    self.stats.add(skipped=1)
+                self._record(document.event, document.file_hash)
+            except Exception as e:
+                logger.error(f"Failed to write {document.path.name}: {e}")
+                self.stats.add(failed=1)
+
+    async def _apply_change(self, event: Dict[str, Any]) -> None:
+        """Propagate a deleted, renamed or copied file to the stores."""
+        try:
+            if event["event_type"] == LINKED:
+                await self._link(event)
+            elif await self.runner.apply_change(event):
+                self.stats.add(changed=1)
+        except Exception as e:
+            logger.error(f"Failed to apply {event['event_type']} event for {event['filepath']}: {e}")
+            self.stats.add(failed=1)
+
+    async def _link(self, event: Dict[str, Any]) -> None:
+        """Link a byte-identical file to its stored document, or ingest it if that is gone."""
+        path = Path(event["filepath"])
+        if await self.runner.link(path, event["doc_hash"]):
+            self.stats.add(skipped=1)
+            self._record(event, event["doc_hash"])
+            return
+
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(None, read_text, path)
+        if not text or not text.strip():
+            self.stats.add(empty=1)
+            self._record(event, None)
+            return
+        if await self.runner.ingest(path, text):
+            self.stats.add(written=1)
+        else:
+            self.stats.add(skipped=1)
+        self._record(event, hashlib.sha256(text.encode('utf-8')).hexdigest())
+
+    def _record(self, event: Dict[str, Any], doc_hash: Optional[str]) -> None:
+        """Record a handled file in the manifest (failures are left out so they are retried)."""
+        if self.manifest is None or "raw_hash" not in event:
+            return
+        try:
+            self.manifest.record(
+                event["filepath"], event["size_bytes"], event["modified_at"], event["raw_hash"], doc_hash
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update file manifest for {event['filepath']}: {e}")
+
+
+def _timed_extract(filepath: str, segment_size: int):
+    """Run extract_document and report how long it took."""
+    started = time.perf_counter()
+    document = extract_document(filepath, segment_size)
+    return document, time.perf_counter() - started
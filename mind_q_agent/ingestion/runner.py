@@ -0,0 +1,226 @@
+"""
+Asyncio ingestion runner.
+
+The single entry point for ingesting documents from async code. The CLI,
+the watcher worker and the upload endpoint all go through it so the
+pipeline coroutines are always awaited and concurrency is bounded the same
+way everywhere.
+"""
+
+import asyncio
+import logging
+import weakref
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.ingestion.jobs import FAILED
+from mind_q_agent.ingestion.pipeline import IngestionPipeline, ProgressCallback
+from mind_q_agent.ingestion.text_reader import read_text
+
+logger = logging.getLogger(__name__)
+
+# Watcher events that change a path instead of carrying new content
+DELETED = "deleted"
+RENAMED = "renamed"
+# A file byte-identical to an ingested one (carries the stored doc_hash)
+LINKED = "linked"
+PATH_EVENTS = (DELETED, RENAMED, LINKED)
+
+
+class IngestionRunner:
+    """
+    Bounded-concurrency async front end to an IngestionPipeline.
+
+    Each event loop using the runner gets its own semaphore, so a runner can
+    be shared by threads that each run their own loop. File reads run in an
+    executor; extraction and storage are offloaded by the pipeline itself.
+
+    Attributes:
+        pipeline: Pipeline documents are handed to
+        concurrency: Maximum documents in flight per event loop
+    """
+
+    def __init__(
+        self,
+        pipeline: IngestionPipeline,
+        concurrency: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            pipeline: Pipeline to run
+            concurrency: Maximum documents in flight per event loop (default: config)
+            executor: Executor for file reads (default: the loop's executor)
+        """
+        self.pipeline = pipeline
+        self.concurrency = concurrency or int(ConfigManager.get("ingestion", "concurrency", 4))
+        self.executor = executor
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _read(self, path: Path) -> Optional[str]:
+        """Read a file without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, read_text, path)
+
+    async def ingest(
+        self,
+        path: Path,
+        text: Optional[str] = None,
+        extracted_data: Optional[Dict[str, List[Any]]] = None
+    ) -> bool:
+        """
+        Ingest one document.
+
+        Args:
+            path: Document path
+            text: Document text (read from `path` when omitted)
+            extracted_data: Pre-computed extractor output
+
+        Returns:
+            True if the document was ingested, False if empty or a duplicate
+
+        Raises:
+            Exception: Whatever the pipeline raised for this document
+        """
+        async with self._semaphore():
+            if text is None:
+                text = await self._read(path)
+            if not text or not text.strip():
+                logger.warning(f"No text to ingest from {path.name}")
+                return False
+            return await self.pipeline.process_document(path, text, extracted_data)
+
+    async def remove(self, path: Path) -> bool:
+        """
+        Remove a deleted file's document from the knowledge base.
+
+        Args:
+            path: Path the document was ingested from
+
+        Returns:
+            True if a document was removed
+        """
+        async with self._semaphore():
+            return await self.pipeline.remove_document(path)
+
+    async def move(self, src_path: Path, dest_path: Path) -> bool:
+        """
+        Follow a renamed file to its new path.
+
+        Args:
+            src_path: Old path
+            dest_path: New path
+
+        Returns:
+            True if a document was moved
+        """
+        async with self._semaphore():
+            return await self.pipeline.move_document(src_path, dest_path)
+
+    async def link(self, path: Path, doc_hash: str) -> bool:
+        """
+        Record a file as a copy of a stored document, without reading it.
+
+        Args:
+            path: Path of the copy
+            doc_hash: Hash of the stored document
+
+        Returns:
+            False if the document is no longer stored
+        """
+        async with self._semaphore():
+            return await self.pipeline.link_document(path, doc_hash)
+
+    async def apply_change(self, event: Dict[str, Any]) -> bool:
+        """
+        Apply a watcher "deleted", "renamed" or "linked" event.
+
+        A linked file whose document is no longer stored is ingested itself.
+
+        Args:
+            event: Event dict with filepath (src_path for renames, doc_hash for links)
+
+        Returns:
+            True if the knowledge base changed
+        """
+        event_type = event.get("event_type")
+        if event_type == DELETED:
+            return await self.remove(Path(event["filepath"]))
+        if event_type == LINKED:
+            path = Path(event["filepath"])
+            return await self.link(path, event["doc_hash"]) or await self.ingest(path)
+        return await self.move(Path(event["src_path"]), Path(event["filepath"]))
+
+    async def ingest_many(self, documents: Iterable[Tuple[Path, Optional[str]]]) -> int:
+        """
+        Ingest documents concurrently; per-document failures are logged.
+
+        Args:
+            documents: (path, text or None) pairs
+
+        Returns:
+            Number of documents ingested
+        """
+        async def _ingest_one(path: Path, text: Optional[str]) -> bool:
+            try:
+                return await self.ingest(path, text)
+            except Exception as e:
+                logger.error(f"Failed to ingest {path.name}: {e}")
+                return False
+
+        results = await asyncio.gather(*(_ingest_one(path, text) for path, text in documents))
+        return sum(1 for ok in results if ok)
+
+    async def ingest_batch(
+        self,
+        documents: Iterable[Tuple[Path, Optional[str]]],
+        progress: Optional[ProgressCallback] = None
+    ) -> int:
+        """
+        Ingest documents as one batch, with batched (nlp.pipe) extraction.
+        
+        Missing texts are read concurrently first; the batch is then handed to
+        IngestionPipeline.process_batch.
+        
+        Args:
+            documents: (path, text or None) pairs
+            progress: Awaited with (path, status, error) as each document finishes
+            
+        Returns:
+            Number of documents ingested
+        """
+        async def _load(path: Path, text: Optional[str]) -> Tuple[Path, Optional[str]]:
+            if text is not None:
+                return path, text
+            async with self._semaphore():
+                try:
+                    return path, await self._read(path)
+                except Exception as e:
+                    logger.error(f"Failed to read {path.name}: {e}")
+                    return path, None
+
+        loaded = await asyncio.gather(*(_load(path, text) for path, text in documents))
+        batch = []
+        for path, text in loaded:
+            if text and text.strip():
+                batch.append((path, text))
+            elif progress is not None:
+                await progress(path, FAILED, "No text could be read")
+        if not batch:
+            return 0
+        return await self.pipeline.process_batch(batch, progress=progress)
@@ -0,0 +1,47 @@
+"""
+Text extraction from files on disk.
+
+Shared by the ingestion pool, the CLI and the file watcher so every entry
+point reads documents the same way.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+from mind_q_agent.ingestion.pdf_extractor import HAS_PYMUPDF, get_pdf_extractor
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = {'.txt', '.md', '.pdf'}
+
+
+def read_text(path: Path) -> Optional[str]:
+    """
+    Extract text content based on file type.
+
+    Args:
+        path: File to read
+
+    Returns:
+        Extracted text, or None if the file is unsupported or unreadable
+    """
+    ext = path.suffix.lower()
+
+    try:
+        if ext in {'.txt', '.md'}:
+            return path.read_text(encoding='utf-8')
+
+        elif ext == '.pdf':
+            if not HAS_PYMUPDF:
+                logger.warning("PyMuPDF not installed, skipping PDF")
+                return None
+
+            return get_pdf_extractor().extract(path).text
+
+    except UnicodeDecodeError:
+        logger.warning(f"Encoding error reading {path.name}")
+    except Exception as e:
+        logger.error(f"Extraction failed for {path.name}: {e}")
+
+    return None
@@ -0,0 +1,398 @@
+"""
+Background ingestion of uploaded files.
+
+Uploads are copied to disk in fixed-size chunks while being hashed, so a
+large file is never held in memory. Parsing and ingestion then run as a
+background job: files are parsed off the event loop (PDFs through the
+shared page-parallel PdfExtractor), and the caller polls the job for its
+status.
+
+Batch uploads (many files, or zip/tar archives) become one job with a
+per-file status. Their files are ingested in groups through
+IngestionRunner.ingest_batch, so NLP and embedding run batched across
+files, and every finished file is reported on the event bus. The archives
+of a batch may unpack to at most a configured number of files and bytes
+(counted as written, not as declared), so a zip or tar bomb fails the job
+instead of filling the disk.
+"""
+
+import asyncio
+import hashlib
+import logging
+import shutil
+import tarfile
+import uuid
+import zipfile
+import zlib
+from functools import partial
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from fastapi import UploadFile
+
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.events.bus import event_bus
+from mind_q_agent.ingestion.file_parser import FileParser
+from mind_q_agent.ingestion.jobs import (
+    BATCH, COMPLETED, DUPLICATE, FAILED, PROCESSING, QUEUED, IngestionJob, JobStore
+)
+from mind_q_agent.ingestion.runner import IngestionRunner
+from mind_q_agent.ingestion.text_reader import SUPPORTED_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+# Errors raised while reading a damaged or truncated archive
+_CORRUPT_ARCHIVE_ERRORS = (zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error)
+
+
+class ArchiveLimitError(ValueError):
+    """The archives of a batch unpack to more files or bytes than allowed."""
+
+
+class UploadIngestor:
+    """
+    Accepts uploads and ingests them as background jobs.
+
+    Attributes:
+        runner: Runner documents are ingested through
+        jobs: Store tracking job status
+        upload_dir: Directory uploaded files are saved to
+        max_archive_bytes: Bytes the archives of one batch may unpack to
+        max_archive_members: Files the archives of one batch may contain
+    """
+
+    # Bytes copied per read while saving an upload
+    CHUNK_SIZE = 1024 * 1024
+    # Files parsed and ingested together by a batch job
+    BATCH_GROUP_SIZE = 64
+    ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+    def __init__(
+        self,
+        runner: IngestionRunner,
+        jobs: JobStore,
+        upload_dir: str = "data/uploads",
+        max_archive_bytes: Optional[int] = None,
+        max_archive_members: Optional[int] = None
+    ):
+        """
+        Initialize the ingestor.
+
+        Args:
+            runner: Runner used for ingestion
+            jobs: Job store
+            upload_dir: Directory for saved uploads
+            max_archive_bytes: Unpacked bytes per batch (default: config ingestion.archive_max_bytes)
+            max_archive_members: Archive files per batch (default: config ingestion.archive_max_members)
+        """
+        self.runner = runner
+        self.jobs = jobs
+        self.upload_dir = Path(upload_dir)
+        if max_archive_bytes is None:
+            max_archive_bytes = int(ConfigManager.get("ingestion", "archive_max_bytes", 1024 ** 3))
+        if max_archive_members is None:
+            max_archive_members = int(ConfigManager.get("ingestion", "archive_max_members", 10000))
+        self.max_archive_bytes = max_archive_bytes
+        self.max_archive_members = max_archive_members
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def accept(self, file: UploadFile) -> IngestionJob:
+        """
+        Save an upload and schedule its ingestion.
+
+        Args:
+            file: Uploaded file
+
+        Returns:
+            The queued job
+        """
+        job = self.jobs.create(filename=Path(file.filename or "untitled").name or "untitled")
+        # Each upload gets its own directory, like batches: concurrent uploads
+        # with the same name never overwrite each other, and a later upload
+        # is a new document rather than a new version of an earlier one
+        try:
+            path, digest, size = await self.save(file, directory=self.upload_dir / f"upload-{job.id}")
+        except Exception as e:
+            self.jobs.update(job.id, status=FAILED, error=str(e))
+            raise
+        self.jobs.update(job.id, filename=path.name, sha256=digest, size_bytes=size)
+
+        task = asyncio.create_task(self._process(job.id, path))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        logger.info(f"Accepted upload {path.name} ({size} bytes) as job {job.id}")
+        return job
+
+    async def accept_batch(self, files: List[UploadFile]) -> IngestionJob:
+        """
+        Save a batch of uploads and schedule their ingestion as one job.
+
+        Archives (zip/tar) are unpacked; only supported document types inside
+        them are kept. An archive that cannot be read is recorded as a failed
+        file of the job.
+
+        Args:
+            files: Uploaded files and/or archives
+
+        Returns:
+            The queued batch job, with one entry per document
+
+        Raises:
+            ArchiveLimitError: If the archives exceed the unpacked size or
+                file count limits (the job is marked FAILED)
+        """
+        loop = asyncio.get_running_loop()
+        job = self.jobs.create(filename=f"batch of {len(files)} uploads", kind=BATCH)
+        # Each batch gets its own directory so equal names in different batches never collide
+        batch_dir = self.upload_dir / f"batch-{job.id}"
+
+        paths: List[Path] = []
+        unreadable: List[Dict[str, Any]] = []
+        size = 0
+        # Unpacked bytes and archive members, counted across the whole batch
+        unpacked = [0, 0]
+        try:
+            for file in files:
+                path, _, file_size = await self.save(file, directory=batch_dir, unique=True)
+                size += file_size
+                if not self._is_archive(path):
+                    paths.append(path)
+                    continue
+                try:
+                    paths.extend(await loop.run_in_executor(None, self._unpack, path, batch_dir, unpacked))
+                except _CORRUPT_ARCHIVE_ERRORS as e:
+                    logger.error(f"Could not unpack {path.name}: {e}")
+                    unreadable.append(
+                        {"filename": path.name, "status": FAILED, "error": f"Could not unpack archive: {e}"}
+                    )
+        except Exception as e:
+            # Nothing of a batch that could not be saved is ingested
+            self.jobs.update(job.id, status=FAILED, error=str(e))
+            shutil.rmtree(batch_dir, ignore_errors=True)
+            raise
+
+        self.jobs.update(
+            job.id,
+            size_bytes=size,
+            files=[{"filename": path.name, "status": QUEUED, "error": None} for path in paths] + unreadable
+        )
+
+        task = asyncio.create_task(self._process_batch(job.id, paths))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        logger.info(f"Accepted batch of {len(paths)} documents ({size} bytes) as job {job.id}")
+        return job
+
+    async def save(
+        self,
+        file: UploadFile,
+        directory: Optional[Path] = None,
+        unique: bool = False
+    ) -> Tuple[Path, str, int]:
+        """
+        Copy an upload to disk chunk by chunk, hashing it on the way.
+
+        Args:
+            file: Uploaded file
+            directory: Target directory (default: upload_dir)
+            unique: Add a numeric suffix instead of replacing an existing file
+
+        Returns:
+            (saved path, sha256 of the raw bytes, size in bytes)
+        """
+        loop = asyncio.get_running_loop()
+        directory = directory or self.upload_dir
+        directory.mkdir(parents=True, exist_ok=True)
+
+        # Never trust client-supplied directories
+        filename = Path(file.filename or "untitled").name or "untitled"
+        final_path = self._unique_path(directory, filename) if unique else directory / filename
+        part_path = directory / f".{uuid.uuid4().hex}.part"
+
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(part_path, "wb") as out:
+                while True:
+                    chunk = await file.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    await loop.run_in_executor(None, out.write, chunk)
+            part_path.replace(final_path)
+        except Exception:
+            part_path.unlink(missing_ok=True)
+            raise
+
+        return final_path, digest.hexdigest(), size
+
+    async def _process(self, job_id: str, path: Path) -> None:
+        """Parse and ingest a saved upload, recording the outcome on the job."""
+        loop = asyncio.get_running_loop()
+        self.jobs.update(job_id, status=PROCESSING)
+        try:
+            text = await loop.run_in_executor(None, FileParser.parse_path, str(path))
+            if not text.strip():
+                self.jobs.update(job_id, status=FAILED, error="File is empty or could not be parsed")
+                return
+
+            if await self.runner.ingest(path.absolute(), text):
+                self.jobs.update(job_id, status=COMPLETED)
+            else:
+                self.jobs.update(job_id, status=DUPLICATE)
+        except Exception as e:
+            logger.error(f"Upload job {job_id} failed: {e}")
+            self.jobs.update(job_id, status=FAILED, error=str(e))
+
+    async def _process_batch(self, job_id: str, paths: List[Path]) -> None:
+        """Parse and ingest the documents of a batch job group by group."""
+        self.jobs.update(job_id, status=PROCESSING)
+        await event_bus.emit("batch_started", {"job_id": job_id, "total": len(paths)})
+        report = partial(self._report_file, job_id)
+        try:
+            for start in range(0, len(paths), self.BATCH_GROUP_SIZE):
+                group = paths[start:start + self.BATCH_GROUP_SIZE]
+                texts = await asyncio.gather(*(self._parse(path) for path in group))
+
+                documents = []
+                for path, text in zip(group, texts):
+                    if text:
+                        documents.append((path.absolute(), text))
+                    else:
+                        await report(path, FAILED, "File is empty or could not be parsed")
+                if documents:
+                    await self.runner.ingest_batch(documents, progress=report)
+
+            self.jobs.update(job_id, status=COMPLETED)
+        except Exception as e:
+            logger.error(f"Batch job {job_id} failed: {e}")
+            self.jobs.update(job_id, status=FAILED, error=str(e))
+
+        job = self.jobs.get(job_id)
+        await event_bus.emit("batch_completed", {
+            "job_id": job_id,
+            "status": job.status if job else FAILED,
+            "total": len(paths),
+            "done": job.done if job else 0
+        })
+
+    async def _parse(self, path: Path) -> Optional[str]:
+        """Parse one saved document; None if it is empty or unreadable."""
+        loop = asyncio.get_running_loop()
+        try:
+            text = await loop.run_in_executor(None, FileParser.parse_path, str(path))
+        except Exception as e:
+            logger.warning(f"Could not parse {path.name}: {e}")
+            return None
+        return text if text.strip() else None
+
+    async def _report_file(self, job_id: str, path: Path, status: str, error: Optional[str] = None) -> None:
+        """Record the outcome of one file of a batch job and publish it."""
+        job = self.jobs.update_file(job_id, path.name, status=status, error=error)
+        await event_bus.emit("batch_file_progress", {
+            "job_id": job_id,
+            "filename": path.name,
+            "status": status,
+            "error": error,
+            "done": job.done if job else 0,
+            "total": len(job.files) if job else 0
+        })
+
+    @classmethod
+    def _is_archive(cls, path: Path) -> bool:
+        return path.name.lower().endswith(cls.ARCHIVE_SUFFIXES)
+
+    @staticmethod
+    def _unique_path(directory: Path, filename: str) -> Path:
+        """Path for `filename` in `directory` that does not exist yet."""
+        path = directory / filename
+        stem, suffix = path.stem, path.suffix
+        n = 1
+        while path.exists():
+            path = directory / f"{stem}-{n}{suffix}"
+            n += 1
+        return path
+
+    def _unpack(self, archive: Path, directory: Path, unpacked: List[int]) -> List[Path]:
+        """
+        Extract the supported documents of an archive into `directory`.
+
+        Member directories are dropped and only regular files are read, so
+        entries cannot escape `directory` through `..`, absolute paths or
+        links. The archive is removed afterwards; on error, so are the
+        documents extracted from it.
+
+        Args:
+            archive: Saved archive
+            directory: Target directory
+            unpacked: [bytes, members] unpacked so far by the batch, updated in place
+
+        Returns:
+            Paths of the extracted documents
+
+        Raises:
+            ArchiveLimitError: If the batch limits are exceeded
+            zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error: If the
+                archive is damaged
+        """
+        paths = []
+        try:
+            for name, stream in self._archive_members(archive):
+                unpacked[1] += 1
+                if unpacked[1] > self.max_archive_members:
+                    raise ArchiveLimitError(
+                        f"{archive.name}: archives may hold at most {self.max_archive_members} files per batch"
+                    )
+                filename = Path(name).name
+                if filename.startswith(".") or Path(filename).suffix.lower() not in SUPPORTED_EXTENSIONS:
+                    stream.close()
+                    continue
+                path = self._unique_path(directory, filename)
+                paths.append(path)
+                with stream, open(path, "wb") as out:
+                    self._copy_limited(archive, stream, out, unpacked)
+        except Exception:
+            for path in paths:
+                path.unlink(missing_ok=True)
+            raise
+        finally:
+            archive.unlink(missing_ok=True)
+
+        logger.info(f"Unpacked {len(paths)} documents from {archive.name}")
+        return paths
+
+    def _copy_limited(self, archive: Path, stream: IO[bytes], out: IO[bytes], unpacked: List[int]) -> None:
+        """Copy a member stream, counting the bytes actually written against the batch limit."""
+        while True:
+            chunk = stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                return
+            unpacked[0] += len(chunk)
+            if unpacked[0] > self.max_archive_bytes:
+                raise ArchiveLimitError(
+                    f"{archive.name}: archives may unpack to at most {self.max_archive_bytes} bytes per batch"
+                )
+            out.write(chunk)
+
+    @staticmethod
+    def _archive_members(archive: Path) -> Iterator[Tuple[str, IO[bytes]]]:
+        """Yield (member name, readable stream) for every regular file of an archive."""
+        if archive.name.lower().endswith(".zip"):
+            with zipfile.ZipFile(archive) as zf:
+                for info in zf.infolist():
+                    if not info.is_dir():
+                        yield info.filename, zf.open(info)
+        else:
+            with tarfile.open(archive, "r:*") as tf:
+                for member in tf:
+                    if member.isfile():
+                        yield member.name, tf.extractfile(member)
+
+    async def wait(self) -> None:
+        """Wait for all running jobs to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
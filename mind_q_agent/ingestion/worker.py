@@ -1,10 +1,12 @@
+import asyncio
 import logging
 import threading
-from queue import Queue
+from queue import Empty, Queue
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 
 from mind_q_agent.ingestion.pipeline import IngestionPipeline
+from mind_q_agent.ingestion.runner import PATH_EVENTS, IngestionRunner
 
 logger = logging.getLogger(__name__)
 
@@ -12,20 +14,36 @@ class IngestionWorker(threading.Thread):
     """
     Background worker thread that consumes file events from the queue
     and processes them using the IngestionPipeline.
+    
+    Events already waiting in the queue are drained into micro-batches of up
+    to `batch_size` documents so entity extraction runs through nlp.pipe.
+    Batches run on the worker's own event loop through an IngestionRunner.
+    Deleted and renamed files end the current batch and are applied after it.
     """
     
-    def __init__(self, event_queue: Queue, pipeline: IngestionPipeline):
+    def __init__(
+        self,
+        event_queue: Queue,
+        pipeline: IngestionPipeline,
+        batch_size: int = 32,
+        runner: Optional[IngestionRunner] = None
+    ):
         """
         Initialize the worker.
         
         Args:
             event_queue: Queue containing file events (dicts)
             pipeline: Initialized IngestionPipeline instance
+            batch_size: Maximum number of documents processed per batch
+            runner: Shared runner (a new one wrapping `pipeline` by default)
         """
         super().__init__(name="IngestionWorker", daemon=True)
         self.event_queue = event_queue
         self.pipeline = pipeline
+        self.runner = runner or IngestionRunner(pipeline)
+        self.batch_size = batch_size
         self._stop_event = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     def run(self):
         """
@@ -33,7 +51,18 @@ class IngestionWorker(threading.Thread):
         Consumes items until "STOP" sentinel or stop event is set.
         """
         logger.info("IngestionWorker started.")
+        self._loop = asyncio.new_event_loop()
         
+        try:
+            self._consume()
+        finally:
+            self._loop.close()
+            self._loop = None
+
+        logger.info("IngestionWorker stopped.")
+
+    def _consume(self):
+        """Consume queue items on this worker's event loop."""
         while not self._stop_event.is_set():
             try:
                 # Get item with timeout to allow checking stop_event periodically
@@ -43,46 +72,94 @@ class IngestionWorker(threading.Thread):
                     # Queue empty, verify stop condition
                     continue
 
-                if item == "STOP":
+                batch, taken, stop_requested, change = self._collect_batch(item)
+                try:
+                    if batch:
+                        self._process_batch(batch)
+                    if change:
+                        self._apply_change(change)
+                finally:
+                    # Mark every dequeued item done, valid or not
+                    for _ in range(taken):
+                        self.event_queue.task_done()
+                
+                if stop_requested:
                     logger.info("Received STOP signal. Shutting down worker.")
-                    self.event_queue.task_done()
                     break
                 
-                # Should be a dict from FileWatcher
-                if not isinstance(item, dict):
-                    logger.warning(f"Invalid item in queue: {item}")
-                    self.event_queue.task_done()
-                    continue
-
-                self._process_item(item)
-                
-                # Mark task done
-                self.event_queue.task_done()
-                
             except Exception as e:
                 # Critical catch-all to prevent thread death
                 logger.error(f"Critical worker error: {e}", exc_info=True)
 
-        logger.info("IngestionWorker stopped.")
-
-    def _process_item(self, item: Dict[str, Any]):
-        """Helper to process a single queue item."""
-        try:
-            filepath_str = item.get("filepath")
-            text = item.get("text")
+    def _collect_batch(
+        self, first: Any
+    ) -> Tuple[List[Tuple[Path, Optional[str]]], int, bool, Optional[Dict[str, Any]]]:
+        """
+        Drain already-queued events into one batch.
+        
+        A deleted or renamed event ends the batch, so it is applied after
+        the events queued before it.
+        
+        Returns:
+            (documents, number of items dequeued, whether STOP was received,
+             path event to apply after the batch)
+        """
+        batch: List[Tuple[Path, Optional[str]]] = []
+        taken = 0
+        item = first
+        while True:
+            taken += 1
+            if item == "STOP":
+                return batch, taken, True, None
             
-            if not filepath_str or not text:
-                logger.warning(f"Incomplete event data: {item.keys()}")
-                return
-
-            path = Path(filepath_str)
-            logger.debug(f"Worker picking up: {path.name}")
+            if isinstance(item, dict) and item.get("event_type") in PATH_EVENTS and item.get("filepath"):
+                return batch, taken, False, item
             
-            # Delegate to pipeline
-            self.pipeline.process_document(path, text)
+            document = self._to_document(item)
+            if document:
+                batch.append(document)
             
+            if len(batch) >= self.batch_size:
+                return batch, taken, False, None
+            try:
+                item = self.event_queue.get_nowait()
+            except Empty:
+                return batch, taken, False, None
+
+    def _to_document(self, item: Any) -> Optional[Tuple[Path, Optional[str]]]:
+        """
+        Validate a queue item and convert it to a (path, text) pair.
+        
+        Path-only events (from FileWatcher) get text None; the runner reads them.
+        """
+        # Should be a dict from FileWatcher
+        if not isinstance(item, dict):
+            logger.warning(f"Invalid item in queue: {item}")
+            return None
+        
+        filepath_str = item.get("filepath")
+        text = item.get("text")
+        if not filepath_str or text == "":
+            logger.warning(f"Incomplete event data: {item.keys()}")
+            return None
+        
+        return Path(filepath_str), text
+
+    def _process_batch(self, batch: List[Tuple[Path, Optional[str]]]):
+        """Helper to process a batch of documents."""
+        try:
+            logger.debug(f"Worker picking up {len(batch)} documents")
+            # Delegate to the runner on this worker's loop
+            self._loop.run_until_complete(self.runner.ingest_batch(batch))
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(batch)} documents: {e}")
+
+    def _apply_change(self, event: Dict[str, Any]):
+        """Helper to propagate a deleted or renamed file."""
+        try:
+            self._loop.run_until_complete(self.runner.apply_change(event))
         except Exception as e:
-            logger.error(f"Error processing item {item.get('filename')}: {e}")
+            logger.error(f"Error applying {event['event_type']} event for {event['filepath']}: {e}")
 
     def stop(self):
         """Signal the worker to stop."""
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from mind_q_agent.rag.context import ContextBuilder
 from mind_q_agent.tools import YouTubeSearchTool, ArxivSearchTool
 from mind_q_agent.llm.provider import LLMProvider
@@ -11,8 +11,12 @@ class QAService:
     Question Answering System (Task 86).
     Combines Internal RAG with External Search (Web/YouTube/ArXiv).
     """
-    def __init__(self):
-        self.context = ContextBuilder()
+    def __init__(self, context_builder: Optional[ContextBuilder] = None):
+        """
+        Args:
+            context_builder: Retriever for the internal knowledge base.
+        """
+        self.context = context_builder
         self.youtube = YouTubeSearchTool()
         self.arxiv = ArxivSearchTool()
         # In a real app, we'd inject the LLM provider
@@ -1,7 +1,8 @@
 import logging
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from mind_q_agent.learning.qa import QAService
+from mind_q_agent.search.engine import SearchEngine
 from mind_q_agent.tools import YouTubeSearchTool, ArxivSearchTool
 
 logger = logging.getLogger(__name__)
@@ -10,11 +11,49 @@ class ResearchAssistant:
     """
     Research Assistant Mode (Task 87).
     Perform deep dive analysis and generate reports.
+    
+    The internal knowledge base is searched for all sub-questions at once
+    (one batched embedding pass and vector query).
     """
-    def __init__(self):
-        self.qa = QAService()
+
+    # Knowledge base hits listed per report section
+    KNOWLEDGE_RESULTS = 3
+
+    def __init__(self, search_engine: SearchEngine, qa: Optional[QAService] = None):
+        """
+        Args:
+            search_engine: Search engine for the knowledge base.
+            qa: Question answering service (default: one without internal context).
+        """
+        self.qa = qa or QAService()
         self.youtube = YouTubeSearchTool()
         self.arxiv = ArxivSearchTool()
+        self.search_engine = search_engine
+
+    async def _search_knowledge_base(self, questions: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Search the knowledge base for every question in one batch (empty if unavailable)."""
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(
+                None, self.search_engine.search_many, questions, self.KNOWLEDGE_RESULTS
+            )
+        except Exception as e:
+            logger.warning(f"Knowledge base search unavailable for research: {e}")
+            return {}
+        return dict(zip(questions, results))
+
+    @staticmethod
+    def _format_knowledge(hits: List[Dict[str, Any]], sources: List[Dict[str, Any]]) -> str:
+        """Render knowledge base hits as a report subsection, collecting them as sources."""
+        if not hits:
+            return ""
+        content = "### From Your Knowledge Base\n"
+        for hit in hits:
+            metadata = hit.get('metadata') or {}
+            title = metadata.get('filename') or metadata.get('source') or hit.get('id')
+            content += f"- **{title}**: {(hit.get('text') or '')[:200]}...\n"
+            sources.append({"type": "document", "title": title, "url": metadata.get('source', hit.get('id'))})
+        return content
 
     async def generate_report(self, topic: str, depth: str = "brief") -> Dict[str, Any]:
         """
@@ -36,13 +75,16 @@ class ResearchAssistant:
                 f"Tools and frameworks for {topic}"
             ])
             
-        # 2. Key Insights Collection (Parallel)
-        # In a real app, we'd fire off concurrent QA/Search tasks
+        # 2. Key Insights Collection
+        # Internal knowledge for every sub-question comes from one batched search
         report_sections = []
         all_sources = []
+        knowledge = await self._search_knowledge_base(sub_questions)
         
         introduction = await self.qa.answer_question(f"Overview of {topic}")
-        report_sections.append(f"# Research Report: {topic}\n\n## Executive Summary\n{introduction['answer']}\n")
+        summary = f"# Research Report: {topic}\n\n## Executive Summary\n{introduction['answer']}\n"
+        summary += self._format_knowledge(knowledge.get(sub_questions[0], []), all_sources)
+        report_sections.append(summary)
         all_sources.extend(introduction.get('sources', []))
 
         # 3. Deep Dive Sections
@@ -75,6 +117,7 @@ class ResearchAssistant:
             except Exception as e:
                 section_content += f"*(Could not fetch data for this section: {e})*\n"
             
+            section_content += self._format_knowledge(knowledge.get(q, []), all_sources)
             report_sections.append(section_content)
 
         # 4. Compilation
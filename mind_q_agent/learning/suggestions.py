@@ -1,6 +1,8 @@
+import asyncio
 import logging
 import random
 from typing import List, Dict, Any
+from mind_q_agent.search.engine import SearchEngine
 from mind_q_agent.tools import YouTubeSearchTool, ArxivSearchTool
 
 logger = logging.getLogger(__name__)
@@ -8,12 +10,42 @@ logger = logging.getLogger(__name__)
 class SuggestionService:
     """
     Proactive Suggestions Engine (Task 82).
-    Analyzes active concepts and suggests external content or automations.
+    Analyzes active concepts and suggests external content or automations,
+    plus documents from the knowledge base (all concepts searched in one batch).
     """
-    def __init__(self):
+    def __init__(self, search_engine: SearchEngine):
+        """
+        Args:
+            search_engine: Search engine for the knowledge base.
+        """
         # We would inject dependencies here in a real app
         self.youtube = YouTubeSearchTool()
         self.arxiv = ArxivSearchTool()
+        self.search_engine = search_engine
+
+    async def _related_documents(self, concepts: List[str]) -> List[Dict[str, Any]]:
+        """Best knowledge base document per concept, from one batched search."""
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(None, self.search_engine.search_many, concepts, 1)
+        except Exception as e:
+            logger.warning(f"Knowledge base search unavailable for suggestions: {e}")
+            return []
+        
+        suggestions = []
+        for concept, hits in zip(concepts, results):
+            if not hits:
+                continue
+            metadata = hits[0].get('metadata') or {}
+            title = metadata.get('filename') or metadata.get('source') or hits[0].get('id')
+            suggestions.append({
+                "type": "document",
+                "title": f"Revisit: {title}",
+                "description": f"From your knowledge base, related to {concept}",
+                "link": metadata.get('source'),
+                "metadata": metadata
+            })
+        return suggestions
 
     async def get_suggestions(self, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Get proactive suggestions for the user"""
@@ -30,7 +62,9 @@ class SuggestionService:
                 active_concepts = ["Artificial Intelligence", "Python Automation"]
 
             # 2. Generate suggestions based on these concepts
-            for concept in active_concepts[:3]: # Top 3 concepts
+            top_concepts = active_concepts[:3] # Top 3 concepts
+            suggestions.extend(await self._related_documents(top_concepts))
+            for concept in top_concepts:
                 # 50% chance to suggest video, 30% paper, 20% automation
                 choice = random.random()
                 
@@ -1,3 +1,4 @@
+import copy
 from abc import ABC, abstractmethod
 from typing import AsyncGenerator, Optional, Dict, Any, List
 
@@ -27,3 +28,12 @@ class LLMProvider(ABC):
         Return the unique name of the provider (e.g. 'ollama', 'openai').
         """
         pass
+
+    def with_config(self, config: Any) -> "LLMProvider":
+        """
+        Return a copy using different generation settings (temperature,
+        max_tokens) that shares this provider's clients and connections.
+        """
+        clone = copy.copy(self)
+        clone.config = config
+        return clone
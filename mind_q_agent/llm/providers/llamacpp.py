@@ -1,7 +1,8 @@
+import asyncio
 from typing import AsyncGenerator, Optional, Dict, Any
 from mind_q_agent.llm.provider import LLMProvider
 from mind_q_agent.llm.config import ModelConfig
-from mind_q_agent.api.settings import settings
+from mind_q_agent.llm.registry import LlamaModelHost
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,80 +10,76 @@ logger = logging.getLogger(__name__)
 class LlamaCppProvider(LLMProvider):
     """
     Local LLM provider using llama-cpp-python for GGUF models.
+
+    The model itself lives in a LlamaModelHost: loaded on first use, kept
+    resident between requests and unloaded when idle. Generations run off
+    the event loop, one at a time.
     """
-    def __init__(self, config: ModelConfig):
+    def __init__(self, config: ModelConfig, host: Optional[LlamaModelHost] = None):
+        """
+        Args:
+            config: Model configuration
+            host: Resident model to share; a private one is created when omitted
+        """
         self.config = config
-        self.model_path = settings.LLAMACPP_MODEL_PATH
-        self.n_ctx = settings.LLAMACPP_N_CTX
-        self.n_gpu_layers = settings.LLAMACPP_N_GPU_LAYERS
-        self.llm = None
-        self._initialize_model()
-
-    def _initialize_model(self):
-        try:
-            from llama_cpp import Llama
-            logger.info(f"Initializing LlamaCpp model from: {self.model_path}")
-            self.llm = Llama(
-                model_path=self.model_path,
-                n_ctx=self.n_ctx,
-                n_gpu_layers=self.n_gpu_layers,
-                verbose=False
-            )
-            logger.info("LlamaCpp model initialized successfully.")
-        except ImportError:
-            logger.error("llama-cpp-python is not installed. Please install it with `pip install llama-cpp-python`.")
-            raise
-        except Exception as e:
-            logger.error(f"Failed to initialize LlamaCpp model: {e}")
-            self.llm = None
+        self.host = host or LlamaModelHost()
+        self.model_path = self.host.model_path
+        self.n_ctx = self.host.n_ctx
+        self.n_gpu_layers = self.host.n_gpu_layers
 
     def get_provider_name(self) -> str:
         return "llamacpp"
 
-    async def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        if not self.llm:
-            raise RuntimeError("LlamaCpp model is not initialized.")
-
+    def _messages(self, prompt: str, system_prompt: Optional[str]) -> list:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
-        
+
         messages.append({"role": "user", "content": prompt})
+        return messages
+
+    async def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        messages = self._messages(prompt, system_prompt)
+        loop = asyncio.get_running_loop()
 
         try:
-            response = self.llm.create_chat_completion(
-                messages=messages,
-                stream=False,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
-            )
+            async with self.host.session() as llm:
+                response = await loop.run_in_executor(None, lambda: llm.create_chat_completion(
+                    messages=messages,
+                    stream=False,
+                    temperature=self.config.temperature,
+                    max_tokens=self.config.max_tokens
+                ))
             return response["choices"][0]["message"]["content"]
         except Exception as e:
             logger.error(f"LlamaCpp generation failed: {e}")
             raise
 
     async def stream(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncGenerator[str, None]:
-        if not self.llm:
-            raise RuntimeError("LlamaCpp model is not initialized.")
-
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        messages.append({"role": "user", "content": prompt})
+        messages = self._messages(prompt, system_prompt)
+        loop = asyncio.get_running_loop()
 
         try:
-            stream_response = self.llm.create_chat_completion(
-                messages=messages,
-                stream=True,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
-            )
-            
-            for chunk in stream_response:
-                if "content" in chunk["choices"][0]["delta"]:
-                    yield chunk["choices"][0]["delta"]["content"]
-                    
+            # The session (and the model) is held until the stream is consumed
+            async with self.host.session() as llm:
+                stream_response = await loop.run_in_executor(None, lambda: llm.create_chat_completion(
+                    messages=messages,
+                    stream=True,
+                    temperature=self.config.temperature,
+                    max_tokens=self.config.max_tokens
+                ))
+
+                while True:
+                    chunk: Optional[Dict[str, Any]] = await loop.run_in_executor(None, next, stream_response, None)
+                    if chunk is None:
+                        break
+                    if "content" in chunk["choices"][0]["delta"]:
+                        yield chunk["choices"][0]["delta"]["content"]
+
         except Exception as e:
             logger.error(f"LlamaCpp streaming failed: {e}")
             raise
+
+    async def close(self):
+        # The model stays resident in its host; idle unloading releases it
+        pass
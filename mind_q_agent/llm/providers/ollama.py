@@ -11,11 +11,19 @@ class OllamaProvider(LLMProvider):
     Provider for local Ollama instances.
     Default URL: http://localhost:11434
     """
+    DEFAULT_BASE_URL = "http://localhost:11434"
     
-    def __init__(self, config: ModelConfig):
+    def __init__(self, config: ModelConfig, client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            config: Model configuration
+            client: Shared HTTP client (connection pool) to use; when omitted
+                the provider opens its own and closes it in close()
+        """
         self.config = config
-        self.base_url = config.api_base or "http://localhost:11434"
-        self.client = httpx.AsyncClient(timeout=60.0) # Increased timeout for LLM gen
+        self.base_url = config.api_base or self.DEFAULT_BASE_URL
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=60.0) # Increased timeout for LLM gen
 
     def get_provider_name(self) -> str:
         return "ollama"
@@ -95,4 +103,6 @@ class OllamaProvider(LLMProvider):
             raise
 
     async def close(self):
-        await self.client.aclose()
+        # A shared client belongs to whoever passed it in
+        if self._owns_client:
+            await self.client.aclose()
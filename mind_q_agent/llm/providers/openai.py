@@ -1,6 +1,7 @@
 import logging
 import os
 from typing import AsyncGenerator, Optional
+import httpx
 import openai
 from mind_q_agent.llm import LLMProvider, ModelConfig
 
@@ -11,15 +12,23 @@ class OpenAIProvider(LLMProvider):
     Provider for OpenAI API (and compatible APIs like Groq, DeepSeek).
     """
 
-    def __init__(self, config: ModelConfig):
+    def __init__(self, config: ModelConfig, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            config: Model configuration
+            http_client: Shared HTTP client (connection pool) to use; when
+                omitted the SDK opens its own, closed in close()
+        """
         self.config = config
         api_key = config.api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OpenAI API Key is missing. Set OPENAI_API_KEY env or pass in config.")
         
+        self._owns_client = http_client is None
         self.client = openai.AsyncOpenAI(
             api_key=api_key,
-            base_url=config.api_base # Optional support for custom base URL
+            base_url=config.api_base, # Optional support for custom base URL
+            http_client=http_client
         )
 
     def get_provider_name(self) -> str:
@@ -69,4 +78,6 @@ class OpenAIProvider(LLMProvider):
             raise
 
     async def close(self):
-        await self.client.close()
+        # Closing the SDK client would close a shared connection pool too
+        if self._owns_client:
+            await self.client.close()
@@ -0,0 +1,272 @@
+"""
+Long-lived LLM provider instances and the resources they share.
+
+Creating a provider per request throws away HTTP keep-alive and TLS sessions
+and, for llama.cpp, reloads a multi-GB GGUF model from disk. The registry
+keeps one provider per (provider, model, base_url), at most
+LLM_MAX_PROVIDERS of them (least recently used evicted), backed by one tuned
+HTTP connection pool per base URL and a single resident llama.cpp model that
+is unloaded after a period of inactivity. All llama.cpp requests share one
+provider, whatever model name they carry. Per-request generation settings
+(temperature, max_tokens) are applied to a lightweight copy sharing those
+connections.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+from mind_q_agent.api.settings import settings
+from mind_q_agent.llm.config import ModelConfig
+from mind_q_agent.llm.provider import LLMProvider
+from mind_q_agent.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class LlamaModelHost:
+    """
+    A single resident llama.cpp model, loaded on first use and unloaded
+    after `idle_unload_seconds` without use.
+
+    Sessions are serialized: a llama.cpp context cannot run two generations
+    at once, and a streamed generation holds the model until it finishes.
+
+    Attributes:
+        model_path: GGUF file
+        n_ctx: Context window in tokens
+        n_gpu_layers: Layers offloaded to the GPU (-1 = all)
+        idle_unload_seconds: Idle time before unloading (0 = keep loaded)
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        n_ctx: Optional[int] = None,
+        n_gpu_layers: Optional[int] = None,
+        idle_unload_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            model_path: GGUF file (default: LLAMACPP_MODEL_PATH)
+            n_ctx: Context window (default: LLAMACPP_N_CTX)
+            n_gpu_layers: GPU layers (default: LLAMACPP_N_GPU_LAYERS)
+            idle_unload_seconds: Idle time before unloading (default: LLAMACPP_IDLE_UNLOAD_SECONDS)
+        """
+        self.model_path = model_path or settings.LLAMACPP_MODEL_PATH
+        self.n_ctx = n_ctx or settings.LLAMACPP_N_CTX
+        self.n_gpu_layers = settings.LLAMACPP_N_GPU_LAYERS if n_gpu_layers is None else n_gpu_layers
+        self.idle_unload_seconds = (
+            settings.LLAMACPP_IDLE_UNLOAD_SECONDS if idle_unload_seconds is None else idle_unload_seconds
+        )
+        self._llm: Optional[Any] = None
+        self._busy = False
+        self._last_used = 0.0
+        self._timer: Optional[threading.Timer] = None
+        # Guards load/unload state across the event loop and the unload timer
+        self._state_lock = threading.Lock()
+        self._session_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def loaded(self) -> bool:
+        with self._state_lock:
+            return self._llm is not None
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Any]:
+        """
+        Exclusive use of the model, loading it (off the event loop) if needed.
+
+        Raises:
+            RuntimeError: If the model cannot be loaded
+        """
+        if self._session_lock is None:
+            self._session_lock = asyncio.Lock()
+        async with self._session_lock:
+            with self._state_lock:
+                self._busy = True
+            try:
+                llm = await asyncio.get_running_loop().run_in_executor(None, self._load)
+                yield llm
+            finally:
+                with self._state_lock:
+                    self._busy = False
+                    self._last_used = time.monotonic()
+                self._schedule_unload()
+
+    def _load(self) -> Any:
+        with self._state_lock:
+            if self._llm is not None:
+                return self._llm
+            try:
+                from llama_cpp import Llama
+            except ImportError:
+                logger.error("llama-cpp-python is not installed. Please install it with `pip install llama-cpp-python`.")
+                raise
+            try:
+                logger.info(f"Initializing LlamaCpp model from: {self.model_path}")
+                self._llm = Llama(
+                    model_path=self.model_path,
+                    n_ctx=self.n_ctx,
+                    n_gpu_layers=self.n_gpu_layers,
+                    verbose=False
+                )
+                logger.info("LlamaCpp model initialized successfully.")
+            except Exception as e:
+                logger.error(f"Failed to initialize LlamaCpp model: {e}")
+                raise RuntimeError("LlamaCpp model is not initialized.") from e
+            return self._llm
+
+    def _schedule_unload(self) -> None:
+        if not self.idle_unload_seconds:
+            return
+        with self._state_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.idle_unload_seconds, self._unload_if_idle)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _unload_if_idle(self) -> None:
+        with self._state_lock:
+            idle_for = time.monotonic() - self._last_used
+            if self._busy or self._llm is None or idle_for < self.idle_unload_seconds:
+                return
+            self._release()
+        logger.info(f"Unloaded idle LlamaCpp model after {idle_for:.0f}s")
+
+    def unload(self) -> None:
+        """Release the model now (e.g. at shutdown)."""
+        with self._state_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._release()
+
+    def _release(self) -> None:
+        # Caller holds _state_lock
+        if self._llm is not None:
+            close = getattr(self._llm, "close", None)
+            if close is not None:
+                close()
+            self._llm = None
+
+
+class ProviderRegistry:
+    """
+    LRU cache of provider instances keyed by (provider, model, base_url).
+
+    Model names come from requests unvalidated, so the cache is bounded;
+    an evicted provider owns nothing (its connections belong to the
+    registry) and is simply recreated on next use. Providers returned by
+    get() share pooled connections owned by the registry: callers must not
+    close them. aclose() releases everything (e.g. at application shutdown).
+    """
+
+    def __init__(self, max_providers: Optional[int] = None):
+        """
+        Args:
+            max_providers: Cached providers (default: LLM_MAX_PROVIDERS)
+        """
+        self._providers: LRUCache[LLMProvider] = LRUCache(
+            max_size=max(1, max_providers or settings.LLM_MAX_PROVIDERS)
+        )
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._llama_host: Optional[LlamaModelHost] = None
+        self._lock = threading.Lock()
+
+    def get(self, config: ModelConfig) -> LLMProvider:
+        """
+        Return the long-lived provider for a model, with this config's
+        generation settings.
+
+        Raises:
+            ValueError: If the provider is not supported (or lacks credentials)
+        """
+        key = self._key(config)
+        with self._lock:
+            provider = self._providers.get(key)
+            if provider is None:
+                provider = self._create(config)
+                self._providers.put(key, provider)
+                logger.info(f"Created {config.provider} provider for {config.model_name}")
+        return provider.with_config(config)
+
+    @staticmethod
+    def _key(config: ModelConfig) -> Tuple[str, Optional[str], Optional[str]]:
+        """Cache key of a config's provider."""
+        if config.provider == "llamacpp":
+            # Every llama.cpp provider wraps the one resident model
+            return (config.provider, None, None)
+        return (config.provider, config.model_name, config.api_base)
+
+    def _create(self, config: ModelConfig) -> LLMProvider:
+        # Imported here: the llamacpp provider imports this module for LlamaModelHost
+        if config.provider == "ollama":
+            from mind_q_agent.llm.providers.ollama import OllamaProvider
+            return OllamaProvider(config, client=self._http_client(config.api_base or OllamaProvider.DEFAULT_BASE_URL))
+        elif config.provider == "openai":
+            from mind_q_agent.llm.providers.openai import OpenAIProvider
+            return OpenAIProvider(config, http_client=self._http_client(config.api_base or "openai"))
+        elif config.provider == "gemini":
+            from mind_q_agent.llm.providers.gemini import GeminiProvider
+            return GeminiProvider(config)
+        elif config.provider == "llamacpp":
+            from mind_q_agent.llm.providers.llamacpp import LlamaCppProvider
+            return LlamaCppProvider(config, host=self.llama_host)
+        else:
+            raise ValueError(f"Provider {config.provider} not supported")
+
+    def _http_client(self, base_url: str) -> httpx.AsyncClient:
+        """Shared connection pool for one base URL (caller holds the lock)."""
+        client = self._http_clients.get(base_url)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY
+                )
+            )
+            self._http_clients[base_url] = client
+        return client
+
+    @property
+    def llama_host(self) -> LlamaModelHost:
+        if self._llama_host is None:
+            self._llama_host = LlamaModelHost()
+        return self._llama_host
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cached providers, connection pools and llama.cpp residency."""
+        with self._lock:
+            return {
+                "providers": [
+                    f"{provider}:{model}" if model is not None else provider
+                    for (provider, model, _base_url), _cached in self._providers.items()
+                ],
+                "connection_pools": len(self._http_clients),
+                "llamacpp_loaded": self._llama_host is not None and self._llama_host.loaded
+            }
+
+    async def aclose(self) -> None:
+        """Close every pooled connection and unload the llama.cpp model."""
+        with self._lock:
+            clients = list(self._http_clients.values())
+            self._http_clients.clear()
+            self._providers.clear()
+            host, self._llama_host = self._llama_host, None
+        for client in clients:
+            await client.aclose()
+        if host is not None:
+            host.unload()
+
+
+# Global instance
+provider_registry = ProviderRegistry()
@@ -0,0 +1,227 @@
+"""
+Semantic cache of chat answers.
+
+Answers are looked up by query embedding: a new question reuses a cached
+answer when its cosine similarity to the cached question reaches a
+threshold, within the same (provider, model) scope. Entries remember the
+knowledge-base generation they were answered at and the documents their
+context came from; an entry is stale once any of those documents has been
+changed, moved or removed since, or once a document added since is at
+least as close to the question (by vector distance) as the weakest
+document of its context, so that it could now outrank that context.
+Answers given without context go stale once anything is added.
+"""
+
+import itertools
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.utils.cache import LRUCache
+from mind_q_agent.vector.chroma_vector import ChromaVectorDB
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """
+    One cached answer.
+
+    Attributes:
+        scope: (provider, model) the answer was generated by
+        query: Question as asked
+        response: Raw answer text (citations included)
+        doc_hashes: Documents the answer's context came from
+        generation: Vector store generation the context was retrieved at
+        embedding: Normalized query embedding
+        cutoff: Vector distance of the context document farthest from the
+            query (None without context)
+    """
+    scope: Tuple[str, str]
+    query: str
+    response: str
+    doc_hashes: List[str]
+    generation: int
+    embedding: np.ndarray = field(repr=False)
+    cutoff: Optional[float] = None
+
+
+class SemanticResponseCache:
+    """
+    Thread-safe embedding-similarity answer cache with LRU and TTL eviction.
+    """
+
+    # Chunks fetched per context document when measuring an entry's cutoff
+    CUTOFF_CHUNKS_PER_DOCUMENT = 8
+
+    # New documents beyond this many expire entries without a vector query
+    MAX_NEW_DOCUMENTS_CHECKED = 256
+
+    def __init__(
+        self,
+        vector_store: ChromaVectorDB,
+        threshold: Optional[float] = None,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            vector_store: Embeds queries and reports document write generations
+            threshold: Minimum cosine similarity for a hit (default: config chat.cache_threshold)
+            max_size: Maximum cached answers (default: config chat.cache_size)
+            ttl: Seconds an answer stays valid, 0 = no expiry (default: config chat.cache_ttl)
+        """
+        self.vector_store = vector_store
+        self.threshold = float(threshold if threshold is not None else ConfigManager.get("chat", "cache_threshold", 0.95))
+        if max_size is None:
+            max_size = int(ConfigManager.get("chat", "cache_size", 512))
+        if ttl is None:
+            ttl = float(ConfigManager.get("chat", "cache_ttl", 3600))
+        self._entries: LRUCache[CachedResponse] = LRUCache(max_size=max(1, max_size), ttl=ttl or None)
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def embed(self, query: str) -> np.ndarray:
+        """Normalized embedding of a query."""
+        vector = np.asarray(self.vector_store.encode_query(" ".join(query.split())), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(
+        self,
+        scope: Tuple[str, str],
+        query: str,
+        embedding: Optional[np.ndarray] = None
+    ) -> Optional[CachedResponse]:
+        """
+        Find a valid cached answer to a similar question.
+
+        Args:
+            scope: (provider, model)
+            query: Question
+            embedding: Precomputed embed(query), to share it with store()
+
+        Returns:
+            The most similar valid entry at or above the threshold, or None
+        """
+        embedding = self.embed(query) if embedding is None else embedding
+        candidates = [(key, entry) for key, entry in self._entries.items() if entry.scope == scope]
+        while candidates:
+            similarities = np.stack([entry.embedding for _, entry in candidates]) @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                break
+            key, entry = candidates.pop(best)
+            if self._is_stale(entry):
+                self._entries.pop(key)
+                with self._lock:
+                    self.stale += 1
+                continue
+            # Refresh the entry's recency
+            self._entries.get(key)
+            with self._lock:
+                self.hits += 1
+            logger.debug(f"Answer cache hit ({similarities[best]:.3f}) for '{query}'")
+            return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(
+        self,
+        scope: Tuple[str, str],
+        query: str,
+        response: str,
+        doc_hashes: List[str],
+        generation: int,
+        embedding: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Cache an answer.
+
+        Args:
+            scope: (provider, model)
+            query: Question
+            response: Raw answer text
+            doc_hashes: Documents the context was built from
+            generation: Vector store generation read before retrieval
+            embedding: Precomputed embed(query)
+        """
+        if not response or not response.strip():
+            return
+        embedding = self.embed(query) if embedding is None else embedding
+        doc_hashes = list(dict.fromkeys(doc_hashes))
+        entry = CachedResponse(
+            scope=scope,
+            query=query,
+            response=response,
+            doc_hashes=doc_hashes,
+            generation=generation,
+            embedding=embedding,
+            cutoff=self._cutoff(embedding, doc_hashes)
+        )
+        self._entries.put(next(self._ids), entry)
+
+    def _cutoff(self, embedding: np.ndarray, doc_hashes: List[str]) -> Optional[float]:
+        """Distance of the context document farthest from the query (by its closest chunk)."""
+        if not doc_hashes:
+            return None
+        hits = self.vector_store.query_by_embedding(
+            embedding.tolist(),
+            n_results=len(doc_hashes) * self.CUTOFF_CHUNKS_PER_DOCUMENT,
+            where={"doc_hash": {"$in": doc_hashes}}
+        )
+        closest: Dict[str, float] = {}
+        for hit in hits:
+            doc_hash = (hit.get("metadata") or {}).get("doc_hash", hit["id"])
+            closest[doc_hash] = min(closest.get(doc_hash, hit["distance"]), hit["distance"])
+        return max(closest.values()) if closest else None
+
+    def _is_stale(self, entry: CachedResponse) -> bool:
+        """Whether the knowledge base changed under, or could now outrank, the entry's context."""
+        try:
+            if any(
+                self.vector_store.document_generation(doc_hash) > entry.generation
+                for doc_hash in entry.doc_hashes
+            ):
+                return True
+            added = self.vector_store.documents_added_since(entry.generation)
+            if not added:
+                return False
+            if entry.cutoff is None or len(added) > self.MAX_NEW_DOCUMENTS_CHECKED:
+                return True
+            closest = self.vector_store.query_by_embedding(
+                entry.embedding.tolist(), n_results=1, where={"doc_hash": {"$in": added}}
+            )
+            return bool(closest) and closest[0]["distance"] <= entry.cutoff
+        except Exception as e:
+            logger.warning(f"Answer cache staleness check failed, treating entry as stale: {e}")
+            return True
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup counters and the number of cached answers."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -1,3 +1,4 @@
-from .context import ContextBuilder
+from .context import ContextBuilder, RetrievedContext
+from .packer import ContextPacker, TokenCounter
 
-__all__ = ["ContextBuilder"]
+__all__ = ["ContextBuilder", "RetrievedContext", "ContextPacker", "TokenCounter"]
@@ -1,58 +1,276 @@
 import logging
-from typing import List, Dict, Any, Optional
-from mind_q_agent.search.engine import SearchEngine
-from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
 from mind_q_agent.api.settings import settings
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.search.engine import SEMANTIC, SearchEngine, reciprocal_rank_fusion
+from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
+from mind_q_agent.rag.packer import ContextPacker, TokenCounter, load_tokenizer
 
 logger = logging.getLogger(__name__)
 
-from mind_q_agent.vector.chroma_vector import ChromaVectorDB
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class RetrievedContext:
+    """
+    Context retrieved for one query.
+
+    Attributes:
+        documents: Merged, deduplicated results in rank order (search() format;
+            graph-sourced ones carry 'graph_concepts', trimmed ones 'trimmed')
+        text: Formatted context for the system prompt
+        tokens: Tokens of text (target model's tokenizer)
+        timings: Milliseconds spent per stage
+    """
+    documents: List[Dict[str, Any]] = field(default_factory=list)
+    text: str = ""
+    tokens: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
 
 class ContextBuilder:
     """
     Builds context for LLM generation by retrieving relevant information
     from Vector Store (Chroma) and Knowledge Graph (Kuzu).
+
+    Stages: vector search; graph expansion (query terms linked to Concept
+    nodes, their top-weighted RELATED_TO neighbors, and the documents that
+    DISCUSS them); a reciprocal rank fusion merge that deduplicates by
+    document; and packing of the merged ranking into a token budget.
+
+    The budget and tokenizer follow the target model (config rag.models,
+    keyed by "provider/model" or "provider"): its context window minus
+    LLAMACPP_ANSWER_RESERVE, counted with its tokenizer. Models without an
+    entry or tokenizer are estimated within LLAMACPP_N_CTX. prepare also
+    subtracts the prompt template and the query.
     """
 
-    def __init__(self):
-        # Initialize engines
-        # Note: In a real app, these might be injected or singletons
-        try:
-            self.vector_db = ChromaVectorDB(db_path=settings.CHROMA_DB_PATH)
-            self.search_engine = SearchEngine(vector_store=self.vector_db)
-            
-            # For now, we rely only on Vector Search for RAG context
-            # GraphDB connection can be added later for structured context
-        except Exception as e:
-            logger.error(f"Failed to init ContextBuilder dependencies: {e}")
-            raise
+    # Longest query n-gram tried against concept names
+    MAX_PHRASE_WORDS = 3
+
+    # Tokens kept free for the chat template's role markers
+    PROMPT_MARGIN = 32
+
+    def __init__(
+        self,
+        search_engine: SearchEngine,
+        graph_db: Optional[KuzuGraphDB] = None,
+        graph_expansion: Optional[bool] = None,
+        max_context_tokens: Optional[int] = None,
+        token_counter: Optional[TokenCounter] = None
+    ):
+        """
+        Args:
+            search_engine: Search engine to use.
+            graph_db: Graph database for expansion (None disables expansion).
+            graph_expansion: Whether to add graph-linked documents (default: config).
+            max_context_tokens: Token budget of context plus prompt for every
+                model (default: config, else each model's context window
+                minus the answer reserve).
+            token_counter: Counter used for every model. Defaults to one per
+                model's configured tokenizer, loaded on first use.
+        """
+        self.search_engine = search_engine
+        self.graph_db = graph_db
+        if graph_expansion is None:
+            graph_expansion = bool(ConfigManager.get("rag", "graph_expansion", True))
+        self.graph_expansion = graph_expansion and graph_db is not None
+        self.graph_neighbors = int(ConfigManager.get("rag", "graph_neighbors", 10))
+        self.graph_documents = int(ConfigManager.get("rag", "graph_documents", 3))
+        self.max_context_tokens = max_context_tokens or int(ConfigManager.get("rag", "max_context_tokens", 0))
+        self.models: Dict[str, Dict[str, Any]] = ConfigManager.get("rag", "models", None) or {}
+        self._token_counter = token_counter
+        # Packers by tokenizer spec, shared by the models using it
+        self._packers: Dict[str, ContextPacker] = {}
+        self._packers_lock = threading.Lock()
+
+    def model_settings(self, provider: Optional[str] = None, model: Optional[str] = None) -> Dict[str, Any]:
+        """Config entry of the target model: "provider/model", else "provider", else empty."""
+        if not provider:
+            return {}
+        return self.models.get(f"{provider}/{model}") or self.models.get(provider) or {}
+
+    def budget_for(self, provider: Optional[str] = None, model: Optional[str] = None) -> int:
+        """Tokens of prompt plus context for the target model."""
+        if self.max_context_tokens:
+            return self.max_context_tokens
+        n_ctx = int(self.model_settings(provider, model).get("n_ctx") or 0) or settings.LLAMACPP_N_CTX
+        return max(0, n_ctx - settings.LLAMACPP_ANSWER_RESERVE)
+
+    def packer_for(self, provider: Optional[str] = None, model: Optional[str] = None) -> ContextPacker:
+        """Packer counting with the target model's tokenizer (each loaded once)."""
+        spec = self.model_settings(provider, model).get("tokenizer") or ""
+        with self._packers_lock:
+            packer = self._packers.get(spec)
+            if packer is None:
+                counter = self._token_counter or TokenCounter(load_tokenizer(spec))
+                packer = self._packers[spec] = ContextPacker(counter)
+            return packer
+
+    def retrieve(
+        self,
+        query: str,
+        max_docs: int = 5,
+        budget: Optional[int] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> RetrievedContext:
+        """
+        Retrieve, merge and pack the context for a query.
+
+        Graph failures are logged and leave the vector results in place.
+
+        Args:
+            query: User query
+            max_docs: Vector search results to consider
+            budget: Tokens available for the context (default: the model's budget)
+            provider: Provider of the target model (None = estimate)
+            model: Target model name
+
+        Returns:
+            RetrievedContext with the packed documents and per-stage timings
+        """
+        context = RetrievedContext()
+
+        start = time.perf_counter()
+        vector_hits = self.search_engine.search(query, limit=max_docs)
+        context.timings["vector"] = self._elapsed_ms(start)
+
+        graph_hits: List[Dict[str, Any]] = []
+        if self.graph_expansion:
+            try:
+                graph_hits = self._expand_graph(query, vector_hits, context.timings)
+            except Exception as e:
+                logger.warning(f"Graph expansion skipped: {e}")
+
+        start = time.perf_counter()
+        ranked = reciprocal_rank_fusion([vector_hits, graph_hits], score_key="score")
+        context.timings["merge"] = self._elapsed_ms(start)
+
+        start = time.perf_counter()
+        context.documents, context.text, context.tokens = self.packer_for(provider, model).pack(
+            ranked, self.budget_for(provider, model) if budget is None else budget
+        )
+        context.timings["pack"] = self._elapsed_ms(start)
+
+        logger.debug(
+            f"Context for '{query}': {len(context.documents)} docs "
+            f"({len(graph_hits)} from graph), {context.tokens} tokens, "
+            + ", ".join(f"{stage}={ms:.1f}ms" for stage, ms in context.timings.items())
+        )
+        return context
+
+    def _expand_graph(
+        self,
+        query: str,
+        vector_hits: List[Dict[str, Any]],
+        timings: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        """
+        Documents reached through the concept graph, best first, in search() format.
+        """
+        start = time.perf_counter()
+        seeds = self.graph_db.find_concepts(self.query_phrases(query))
+        timings["graph_link"] = self._elapsed_ms(start)
+        if not seeds:
+            return []
+
+        start = time.perf_counter()
+        neighbors = self.graph_db.get_related_concepts(seeds, limit=self.graph_neighbors)
+        # The query's own concepts weigh as much as its strongest neighbor
+        top_weight = max((n["weight"] for n in neighbors), default=1.0)
+        weights = {name: top_weight for name in seeds}
+        weights.update({n["name"]: n["weight"] for n in neighbors})
+        documents = self.graph_db.get_documents_discussing(weights, limit=self.graph_documents)
+        timings["graph_expand"] = self._elapsed_ms(start)
+        if not documents:
+            return []
+
+        # Vector hits already carry their best passage; fetch it for the rest
+        start = time.perf_counter()
+        found = {hit["id"]: hit for hit in vector_hits}
+        missing = [doc["hash"] for doc in documents if doc["hash"] not in found]
+        if missing:
+            passages = self.search_engine.search(
+                query, limit=len(missing), where={"doc_hash": {"$in": missing}}, mode=SEMANTIC
+            )
+            found.update({hit["id"]: hit for hit in passages})
+        timings["graph_passages"] = self._elapsed_ms(start)
+
+        return [
+            {**found[doc["hash"]], "graph_concepts": doc["via"]}
+            for doc in documents if doc["hash"] in found
+        ]
 
-    def build_system_prompt(self, query: str, max_docs: int = 5) -> str:
+    @classmethod
+    def query_phrases(cls, query: str) -> List[str]:
+        """Words and word n-grams of a query, the candidates for concept names."""
+        words = _WORD_PATTERN.findall(query)
+        return [
+            " ".join(words[i:i + n])
+            for n in range(1, cls.MAX_PHRASE_WORDS + 1)
+            for i in range(len(words) - n + 1)
+        ]
+
+    @staticmethod
+    def _elapsed_ms(start: float) -> float:
+        return (time.perf_counter() - start) * 1000
+
+    def build_system_prompt(
+        self,
+        query: str,
+        max_docs: int = 5,
+        provider: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> str:
         """
         Construct a system prompt with retrieved context.
         """
+        return self.prepare(query, max_docs=max_docs, provider=provider, model=model)[0]
+
+    def prepare(
+        self,
+        query: str,
+        max_docs: int = 5,
+        provider: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> Tuple[str, Optional[RetrievedContext]]:
+        """
+        Construct a system prompt and return the context it was built from.
+
+        Args:
+            query: User query
+            max_docs: Vector search results to consider
+            provider: Provider of the target model (sizes and counts the budget)
+            model: Target model name
+
+        Returns:
+            (system prompt, retrieved context, or None if retrieval failed)
+        """
         try:
-            # 1. Vector Search
-            results = self.search_engine.search(query, limit=max_docs)
-            
-            # 2. Format Context
-            context_str = ""
-            if results:
-                for i, doc in enumerate(results):
-                    content = doc.get('content', 'No content')[:500] + "..." # Truncate for token limit safety
-                    source = doc.get('metadata', {}).get('source', 'Unknown')
-                    context_str += f"[Source: {source}]\n{content}\n\n"
-            else:
-                context_str = "No specific documents found."
-            
-            # 3. Get Prompt from Manager
             from mind_q_agent.llm.prompts.manager import prompt_manager
+
+            # The template and the user's message share the model context
+            counter = self.packer_for(provider, model).counter
+            overhead = (
+                counter.count(prompt_manager.get_system_prompt(context=" "))
+                + counter.count(query)
+                + self.PROMPT_MARGIN
+            )
+            budget = max(0, self.budget_for(provider, model) - overhead)
+            context = self.retrieve(query, max_docs=max_docs, budget=budget, provider=provider, model=model)
+            context_str = context.text or "No specific documents found."
+
             system_prompt = prompt_manager.get_system_prompt(context=context_str)
-            
-            return system_prompt
-            
+
+            return system_prompt, context
+
         except Exception as e:
             logger.error(f"Error building context: {e}")
             from mind_q_agent.llm.prompts.manager import prompt_manager
-            return prompt_manager.get_system_prompt(context="Error retrieving context.")
-
+            return prompt_manager.get_system_prompt(context="Error retrieving context."), None
@@ -0,0 +1,189 @@
+"""
+Token-budgeted packing of retrieved documents into LLM context.
+
+Counts use the target model's tokenizer: a vocab-only llama.cpp load of the
+configured GGUF model, a tiktoken encoding, or a Hugging Face tokenizer by
+name. Counts are
+cached per text, and the byte length of a text (an upper bound on its token
+count for byte-level BPE and SentencePiece vocabularies) lets packing skip
+tokenization entirely when every candidate fits.
+"""
+
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mind_q_agent.api.settings import settings
+from mind_q_agent.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends: terminal punctuation followed by whitespace, or a blank line
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+# Tokenizer spec naming the llama.cpp model at LLAMACPP_MODEL_PATH
+LLAMACPP = "llamacpp"
+
+# Prefix of tokenizer specs naming a tiktoken encoding (OpenAI models)
+TIKTOKEN_PREFIX = "tiktoken:"
+
+
+def load_tokenizer(spec: Optional[str]) -> Optional[Callable[[str], List[int]]]:
+    """
+    Load a tokenize function for a tokenizer spec.
+
+    Args:
+        spec: "llamacpp" (vocabulary of LLAMACPP_MODEL_PATH),
+            "tiktoken:<encoding>", a Hugging Face tokenizer name, or empty
+            for none
+
+    Returns:
+        Function mapping text to token ids, or None if unavailable
+    """
+    if not spec:
+        return None
+    try:
+        if spec == LLAMACPP:
+            from llama_cpp import Llama
+            # Only the vocabulary is loaded: no weights, no context
+            llm = Llama(model_path=settings.LLAMACPP_MODEL_PATH, vocab_only=True, verbose=False)
+            return lambda text: llm.tokenize(text.encode("utf-8"), add_bos=False, special=False)
+
+        if spec.startswith(TIKTOKEN_PREFIX):
+            import tiktoken
+            encoding = tiktoken.get_encoding(spec[len(TIKTOKEN_PREFIX):])
+            return lambda text: encoding.encode(text, disallowed_special=())
+
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(spec, use_fast=True)
+        return lambda text: tokenizer.encode(text, add_special_tokens=False)
+    except Exception as e:
+        logger.warning(f"Tokenizer '{spec}' unavailable, estimating token counts: {e}")
+        return None
+
+
+class TokenCounter:
+    """
+    Cached token counting with the target model's tokenizer.
+
+    Without a tokenizer, counts are estimated at about four characters per
+    token.
+
+    Attributes:
+        exact: Whether counts come from a real tokenizer
+    """
+
+    def __init__(self, tokenize: Optional[Callable[[str], List[int]]] = None, cache_size: int = 4096):
+        """
+        Initialize the counter.
+
+        Args:
+            tokenize: Function mapping text to token ids (None = estimate)
+            cache_size: Cached text counts
+        """
+        self._tokenize = tokenize
+        self.exact = tokenize is not None
+        self._cache: LRUCache[int] = LRUCache(max_size=cache_size)
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in text."""
+        if not text:
+            return 0
+        if not self.exact:
+            return len(text) // 4 + 1
+        cached = self._cache.get(text)
+        if cached is None:
+            cached = len(self._tokenize(text))
+            self._cache.put(text, cached)
+        return cached
+
+    def upper_bound(self, text: str) -> int:
+        """Cheap bound no count exceeds: the UTF-8 byte length (or the estimate)."""
+        if not self.exact:
+            return self.count(text)
+        return len(text.encode("utf-8"))
+
+
+class ContextPacker:
+    """
+    Greedy packer of ranked documents into a token budget.
+
+    Documents are taken best first. One that does not fit whole is trimmed
+    to the sentences that do, if at least min_tokens of budget remain;
+    otherwise it is skipped and smaller, lower-ranked documents may still
+    fill the space.
+    """
+
+    def __init__(self, counter: TokenCounter, min_tokens: int = 32):
+        """
+        Args:
+            counter: Token counter of the target model
+            min_tokens: Smallest remaining budget worth trimming a document into
+        """
+        self.counter = counter
+        self.min_tokens = min_tokens
+
+    def pack(self, documents: List[Dict[str, Any]], budget: int) -> Tuple[List[Dict[str, Any]], str, int]:
+        """
+        Pack documents (search() format, best first) into a token budget.
+
+        Args:
+            documents: Ranked documents with 'text' and metadata 'source'
+            budget: Tokens available for the context
+
+        Returns:
+            (packed documents, context text, tokens used). Tokens used is an
+            upper bound when the fast path skipped tokenization. Trimmed
+            documents carry the kept text and 'trimmed': True.
+        """
+        blocks = [self.format_document(doc.get("metadata"), doc.get("text") or "") for doc in documents]
+        # Fast path: everything fits even by the upper bound, so nothing is tokenized
+        bound = sum(self.counter.upper_bound(block) for block in blocks)
+        if bound <= budget:
+            return list(documents), "".join(blocks), bound
+
+        packed: List[Dict[str, Any]] = []
+        parts: List[str] = []
+        used = 0
+        for doc, block in zip(documents, blocks):
+            remaining = budget - used
+            if remaining <= 0:
+                break
+            tokens = self.counter.count(block)
+            if tokens <= remaining:
+                packed.append(doc)
+                parts.append(block)
+                used += tokens
+                continue
+            if remaining < self.min_tokens:
+                continue
+            trimmed = self._trim(doc, remaining)
+            if trimmed is not None:
+                kept_text, block, tokens = trimmed
+                packed.append({**doc, "text": kept_text, "trimmed": True})
+                parts.append(block)
+                used += tokens
+        return packed, "".join(parts), used
+
+    def _trim(self, doc: Dict[str, Any], budget: int) -> Optional[Tuple[str, str, int]]:
+        """Longest sentence prefix of a document whose block fits, as (text, block, tokens)."""
+        sentences = [s for s in _SENTENCE_BOUNDARY.split(doc.get("text") or "") if s.strip()]
+        best = None
+        low, high = 1, len(sentences)
+        while low <= high:
+            middle = (low + high) // 2
+            text = " ".join(sentences[:middle])
+            block = self.format_document(doc.get("metadata"), text)
+            tokens = self.counter.count(block)
+            if tokens <= budget:
+                best = (text, block, tokens)
+                low = middle + 1
+            else:
+                high = middle - 1
+        return best
+
+    @staticmethod
+    def format_document(metadata: Optional[Dict[str, Any]], text: str) -> str:
+        """Context block of one document."""
+        source = (metadata or {}).get("source", "Unknown")
+        return f"[Source: {source}]\n{text}\n\n"
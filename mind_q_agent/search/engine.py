@@ -1,61 +1,342 @@
+import json
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Hashable, Optional
 
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.search.lexical import LexicalIndex
+from mind_q_agent.search.reranker import CrossEncoderReranker
+from mind_q_agent.utils.cache import LRUCache
 from mind_q_agent.vector.chroma_vector import ChromaVectorDB
 
 logger = logging.getLogger(__name__)
 
+# Retrieval modes
+SEMANTIC = "semantic"
+HYBRID = "hybrid"
+LEXICAL = "lexical"
+SEARCH_MODES = (SEMANTIC, HYBRID, LEXICAL)
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Dict[str, Any]]],
+    k: int = 60,
+    score_key: str = "distance"
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked hit lists with reciprocal rank fusion.
+    
+    Each hit scores sum(1 / (k + rank)) over the lists it appears in (by id);
+    a hit's fields are taken from the first list it appears in.
+    
+    Args:
+        rankings: Hit lists (query_similar or search() format), best first
+        k: Rank offset; larger values flatten the contribution of top ranks
+        score_key: Field that receives the fused score
+        
+    Returns:
+        Hits ordered by fused score, with score_key set to the negated
+        score so lower is still better
+    """
+    scores: Dict[str, float] = {}
+    hits: Dict[str, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            scores[hit["id"]] = scores.get(hit["id"], 0.0) + 1.0 / (k + rank)
+            hits.setdefault(hit["id"], hit)
+    fused = sorted(scores, key=lambda hit_id: scores[hit_id], reverse=True)
+    return [{**hits[hit_id], score_key: -scores[hit_id]} for hit_id in fused]
+
+
 class SearchEngine:
     """
     Search Engine component for Semantic Search.
     Wraps the Vector Store interaction and formats results.
+    
+    Documents are stored as chunks; hits are collapsed back to one result
+    per document, keeping the best-matching chunk as the snippet.
+    
+    With a lexical index, three retrieval modes are available: "semantic"
+    (vector only), "lexical" (BM25 only, no embedding is computed) and
+    "hybrid" (both rankings fused with reciprocal rank fusion). Scores are
+    lower-is-better in every mode: vector distance, BM25 score, or the
+    negated fused score.
+    
+    With a reranker, rerank_factor x limit chunk candidates are fetched and
+    reordered by a cross-encoder (within its latency budget) before being
+    collapsed to documents.
+    
+    Results are cached (TTL + LRU) by normalized query, limit, filter and
+    mode. Keys include the vector store's write generation, so anything
+    ingested or deleted makes older entries unreachable; they age out of
+    the LRU.
     """
 
-    def __init__(self, vector_store: ChromaVectorDB):
+    # Chunks fetched per requested result, so collapsing still fills the limit
+    CHUNK_OVERFETCH = 4
+
+    def __init__(
+        self,
+        vector_store: ChromaVectorDB,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        default_mode: Optional[str] = None,
+        reranker: Optional[CrossEncoderReranker] = None
+    ):
         """
         Initialize Search Engine.
         
         Args:
             vector_store: Initialized ChromaVectorDB instance.
+            cache_size: Cached result lists (default: config, 0 disables the cache).
+            cache_ttl: Seconds a cached result stays valid (default: config, 0 = no expiry).
+            lexical_index: BM25 chunk index enabling the hybrid and lexical modes.
+            default_mode: Mode used when a search names none (default: config).
+            reranker: Cross-encoder second stage applied to every search.
+            
+        Raises:
+            ValueError: If default_mode is not a known mode
         """
         self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self.default_mode = default_mode or ConfigManager.get("search", "mode", SEMANTIC)
+        if self.default_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {self.default_mode}")
+        self.rrf_k = int(ConfigManager.get("search", "rrf_k", 60))
+        self.reranker = reranker
+        self.rerank_factor = int(ConfigManager.get("search", "rerank_candidates", 5))
+        if cache_size is None:
+            cache_size = int(ConfigManager.get("search", "cache_size", 1024))
+        if cache_ttl is None:
+            cache_ttl = float(ConfigManager.get("search", "cache_ttl", 300))
+        self.cache: Optional[LRUCache[List[Dict[str, Any]]]] = (
+            LRUCache(max_size=cache_size, ttl=cache_ttl or None) if cache_size > 0 else None
+        )
 
-    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Perform semantic search for a query.
+        Perform a search for a query.
         
         Args:
             query: The search query string.
             limit: Maximum number of results to return (default 5).
+            where: Optional chunk metadata filter.
+            mode: "semantic", "hybrid" or "lexical" (default: the engine's default mode).
             
         Returns:
             List of result dictionaries containing:
             - id: Document ID (Hash)
-            - text: Document/Chunk text
-            - score: Similarity score (distance)
+            - text: Best-matching chunk text of the document
+            - score: Mode-specific score (lower is better)
             - metadata: File metadata
+            
+        Raises:
+            ValueError: If mode is not a known mode
         """
+        mode = self._resolve_mode(mode)
         if not query or not query.strip():
             return []
 
+        key = self._cache_key(query, limit, where, mode)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
         try:
-            results = self.vector_store.query_similar(query, n_results=limit)
-            
-            # ChromaDB query_similar already formats result as:
-            # [{'id': id, 'document': text, 'metadata': dict, 'distance': float}, ...]
-            # We can perform additional formatting or filtering here if needed.
-            
-            formatted_results = []
-            for res in results:
-                formatted_results.append({
-                    "id": res.get("id"),
-                    "text": res.get("document"),
-                    "score": res.get("distance"), # Lower is better in Chroma usually (L2)
-                    "metadata": res.get("metadata", {})
-                })
-            
-            return formatted_results
+            n_results = self._candidate_count(limit)
+            semantic = None
+            if mode != LEXICAL:
+                semantic = self.vector_store.query_similar(query, n_results=n_results, where=where)
+            hits = self._rerank(query, self._combine(mode, semantic, query, n_results, where))
+            formatted = self._collapse_chunks(hits, limit)
+            self._cache_put(key, formatted)
+            return formatted
 
         except Exception as e:
             logger.error(f"Search failed for query '{query}': {e}")
             return []
+
+    def search_many(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Perform several searches with one batched vector store call.
+        
+        Cached queries are answered from the cache; only the rest (each
+        distinct query once) are searched.
+        
+        Args:
+            queries: The search query strings.
+            limit: Maximum number of results per query (default 5).
+            where: Optional chunk metadata filter applied to every query.
+            mode: "semantic", "hybrid" or "lexical" (default: the engine's default mode).
+            
+        Returns:
+            One result list per query, in query order, in the search() format.
+            Blank queries get an empty list without being searched.
+            
+        Raises:
+            ValueError: If mode is not a known mode
+        """
+        mode = self._resolve_mode(mode)
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        misses: Dict[Hashable, List[int]] = {}
+        for i, query in enumerate(queries):
+            if not query or not query.strip():
+                continue
+            key = self._cache_key(query, limit, where, mode)
+            if key in misses:
+                misses[key].append(i)
+                continue
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses[key] = [i]
+        if not misses:
+            return results
+
+        batch = [queries[positions[0]] for positions in misses.values()]
+        n_results = self._candidate_count(limit)
+        try:
+            semantic: List[Optional[List[Dict[str, Any]]]] = [None] * len(batch)
+            if mode != LEXICAL:
+                semantic = self.vector_store.query_many(batch, n_results=n_results, where=where)
+            hits = [
+                self._rerank(query, self._combine(mode, query_hits, query, n_results, where))
+                for query, query_hits in zip(batch, semantic)
+            ]
+        except Exception as e:
+            logger.error(f"Batch search failed for {len(batch)} queries: {e}")
+            return results
+
+        for (key, positions), query_hits in zip(misses.items(), hits):
+            formatted = self._collapse_chunks(query_hits, limit)
+            self._cache_put(key, formatted)
+            for i in positions:
+                results[i] = [dict(result) for result in formatted]
+        return results
+
+    def _candidate_count(self, limit: int) -> int:
+        """Chunks to retrieve for a result limit (more when they will be reranked)."""
+        factor = self.CHUNK_OVERFETCH
+        if self.reranker is not None:
+            factor = max(factor, self.rerank_factor)
+        return limit * factor
+
+    def _rerank(self, query: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply the reranker, keeping the retrieval order if it fails."""
+        if self.reranker is None or not hits:
+            return hits
+        try:
+            return self.reranker.rerank(query, hits)
+        except Exception as e:
+            logger.warning(f"Rerank skipped for '{query}': {e}")
+            return hits
+
+    def _resolve_mode(self, mode: Optional[str]) -> str:
+        """Validate a requested mode; without a lexical index every search is semantic."""
+        mode = mode or self.default_mode
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        if self.lexical_index is None:
+            return SEMANTIC
+        return mode
+
+    def _combine(
+        self,
+        mode: str,
+        semantic: Optional[List[Dict[str, Any]]],
+        query: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Chunk hits of one query for the mode, adding (and fusing) lexical hits."""
+        if mode == SEMANTIC:
+            return semantic or []
+        if mode == LEXICAL:
+            return self.lexical_index.search(query, n_results=n_results, where=where)
+        try:
+            lexical = self.lexical_index.search(query, n_results=n_results, where=where)
+        except Exception as e:
+            # e.g. an operator filter the lexical index cannot apply
+            logger.warning(f"Lexical search skipped for '{query}': {e}")
+            return semantic or []
+        return reciprocal_rank_fusion([semantic or [], lexical], k=self.rrf_k)[:n_results]
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return result (and rerank score) cache counters and the current store generation."""
+        if self.cache is None:
+            stats: Dict[str, Any] = {"enabled": False}
+        else:
+            stats = {
+                "enabled": True,
+                "ttl": self.cache.ttl,
+                "generation": self.vector_store.generation,
+                **self.cache.stats()
+            }
+        if self.reranker is not None:
+            stats["rerank"] = self.reranker.stats()
+        return stats
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Cache form of a query: trimmed, whitespace collapsed, case-folded."""
+        return " ".join(query.split()).casefold()
+
+    def _cache_key(self, query: str, limit: int, where: Optional[Dict[str, Any]], mode: str) -> Hashable:
+        where_key = json.dumps(where, sort_keys=True, default=str) if where else None
+        # Results from before the reranker model loaded were not reranked
+        reranked = self.reranker is not None and self.reranker.loaded
+        return (self.vector_store.generation, mode, self.normalize_query(query), limit, where_key, reranked)
+
+    def _cache_get(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        """Cached results (copied, so callers may modify them) or None."""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(key)
+        return [dict(result) for result in cached] if cached is not None else None
+
+    def _cache_put(self, key: Hashable, results: List[Dict[str, Any]]) -> None:
+        # Empty results are not cached: they are cheap and may stem from a failed query
+        if self.cache is not None and results:
+            self.cache.put(key, [dict(result) for result in results])
+
+    def _collapse_chunks(self, results: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        """
+        Collapse chunk hits into one result per document.
+        
+        ChromaDB query_similar returns hits ordered by distance as:
+        [{'id': id, 'document': text, 'metadata': dict, 'distance': float}, ...]
+        The first (closest) chunk of each document is kept as its snippet.
+        Records stored without a parent doc_hash are treated as whole documents.
+        """
+        formatted_results = []
+        seen = set()
+        for res in results:
+            metadata = res.get("metadata") or {}
+            doc_id = metadata.get("doc_hash") or res.get("id")
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            
+            formatted_results.append({
+                "id": doc_id,
+                "text": res.get("document"),
+                "score": res.get("distance"), # Lower is better in every mode
+                "metadata": metadata
+            })
+            if len(formatted_results) >= limit:
+                break
+        
+        return formatted_results
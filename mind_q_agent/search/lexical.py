@@ -0,0 +1,225 @@
+"""
+BM25 lexical index over document chunks.
+
+A SQLite FTS5 index over the same chunks as the vector store (same ids,
+same metadata). Chunks live in a plain table keyed by id and document hash;
+the FTS5 table indexes their text as external content, kept current by
+triggers. The ingestion pipeline keeps it in sync incrementally, so exact
+identifiers, error codes and names can be matched by term, and a lexical
+search never needs an embedding.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Query terms: the same characters the index tokenizer keeps together
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+def fts_query(query: str) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression: any of the query's terms, each quoted.
+
+    Returns:
+        The expression, or None if the query has no searchable terms
+    """
+    terms = list(dict.fromkeys(term.lower() for term in _TERM_PATTERN.findall(query)))
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class LexicalIndex:
+    """
+    Thread-safe FTS5 chunk index with BM25 ranking.
+
+    Attributes:
+        db_path: SQLite file (":memory:" when not persisted)
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the index.
+
+        Args:
+            db_path: SQLite file to persist to (default: in-memory)
+
+        Raises:
+            RuntimeError: If the database cannot be opened or FTS5 is unavailable
+        """
+        self.db_path = db_path or ":memory:"
+        self._lock = threading.Lock()
+
+        try:
+            if db_path:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS chunk_rows (
+                    rowid INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    doc_hash TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS chunk_rows_doc_hash ON chunk_rows (doc_hash);
+
+                -- Underscores are kept inside tokens so identifiers match whole
+                CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+                    text,
+                    content = 'chunk_rows',
+                    content_rowid = 'rowid',
+                    tokenize = "unicode61 tokenchars '_'"
+                );
+
+                CREATE TRIGGER IF NOT EXISTS chunk_rows_ai AFTER INSERT ON chunk_rows BEGIN
+                    INSERT INTO chunks (rowid, text) VALUES (new.rowid, new.text);
+                END;
+                CREATE TRIGGER IF NOT EXISTS chunk_rows_ad AFTER DELETE ON chunk_rows BEGIN
+                    INSERT INTO chunks (chunks, rowid, text) VALUES ('delete', old.rowid, old.text);
+                END;
+            """)
+            self._conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to open lexical index at {self.db_path}: {e}")
+            raise RuntimeError(f"Lexical index initialization failed: {e}") from e
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Index chunks (replacing any with the same ids).
+
+        Args:
+            ids: Chunk ids (as in the vector store)
+            texts: Chunk texts
+            metadatas: Chunk metadata (doc_hash is indexed for deletes)
+
+        Raises:
+            ValueError: If input lists have different lengths
+        """
+        if not (len(ids) == len(texts) == len(metadatas)):
+            raise ValueError("ids, texts, and metadatas must have the same length")
+        if not ids:
+            return
+
+        rows = [
+            (chunk_id, metadata.get("doc_hash", chunk_id), text, json.dumps(metadata))
+            for chunk_id, text, metadata in zip(ids, texts, metadatas)
+        ]
+        with self._lock:
+            self._conn.executemany("DELETE FROM chunk_rows WHERE id = ?", [(chunk_id,) for chunk_id in ids])
+            self._conn.executemany(
+                "INSERT INTO chunk_rows (id, doc_hash, text, metadata) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+        logger.debug(f"Indexed {len(rows)} chunks")
+
+    def delete_document(self, doc_hash: str) -> None:
+        """Remove every chunk of a document."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunk_rows WHERE doc_hash = ?", (doc_hash,))
+            self._conn.commit()
+
+    def update_document_source(self, doc_hash: str, source: str, filename: str) -> None:
+        """Point every chunk of a document at a new source path (e.g. after a rename)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, metadata FROM chunk_rows WHERE doc_hash = ?", (doc_hash,)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE chunk_rows SET metadata = ? WHERE rowid = ?",
+                [
+                    (json.dumps({**json.loads(metadata), "source": source, "filename": filename}), rowid)
+                    for rowid, metadata in rows
+                ]
+            )
+            self._conn.commit()
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank chunks by BM25 against the query's terms.
+
+        Args:
+            query: Query text (any term may match)
+            n_results: Number of results to return
+            where: Optional metadata filter; only {key: value} equality is supported
+
+        Returns:
+            Results in the vector store's query_similar format, best first;
+            'distance' is the BM25 score (lower is better)
+
+        Raises:
+            ValueError: If `where` uses operators
+        """
+        expression = fts_query(query)
+        if expression is None:
+            return []
+
+        sql = (
+            "SELECT r.id, r.text, r.metadata, bm25(chunks) AS score "
+            "FROM chunks JOIN chunk_rows r ON r.rowid = chunks.rowid WHERE chunks MATCH ?"
+        )
+        params: List[Any] = [expression]
+        for key, value in (where or {}).items():
+            if key.startswith("$") or isinstance(value, (dict, list)):
+                raise ValueError(f"Lexical search supports only equality filters, got {key}")
+            sql += " AND json_extract(r.metadata, ?) = ?"
+            params.extend([f"$.{key}", value])
+        sql += " ORDER BY score LIMIT ?"
+        params.append(n_results)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"id": chunk_id, "document": text, "metadata": json.loads(metadata), "distance": score}
+            for chunk_id, text, metadata, score in rows
+        ]
+
+    def backfill(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Index existing chunks (e.g. from the vector store) in one pass.
+
+        Args:
+            records: Dicts with id, document and metadata
+
+        Returns:
+            Number of chunks indexed
+        """
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= 1000:
+                count += self._add_records(batch)
+                batch = []
+        if batch:
+            count += self._add_records(batch)
+        return count
+
+    def _add_records(self, records: List[Dict[str, Any]]) -> int:
+        self.add(
+            [record["id"] for record in records],
+            [record["document"] or "" for record in records],
+            [record["metadata"] or {} for record in records]
+        )
+        return len(records)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunk_rows").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
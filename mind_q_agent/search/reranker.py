@@ -0,0 +1,194 @@
+"""
+Cross-encoder reranking of search candidates.
+
+A cross-encoder scores each (query, passage) pair jointly, which ranks far
+more precisely than vector distance but costs one model pass per pair. The
+reranker therefore scores an over-fetched candidate list in batches sized
+to the time left in its latency budget (from the measured cost per pair),
+stops once the budget is spent, and caches scores per (query, chunk) pair so
+repeated queries only pay for new candidates. Until the model has loaded,
+candidates pass through unscored rather than waiting for the load.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sentence_transformers import CrossEncoder
+
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Budgeted cross-encoder reranker.
+
+    Attributes:
+        model_name: CrossEncoder model (see load())
+        batch_size: Most pairs scored per model pass
+        budget_ms: Time after which no further batch is started (0 = unbounded)
+        score_cache: Scores keyed by (normalized query, chunk id)
+        pair_ms: Smoothed model time per scored pair (None until measured)
+    """
+
+    DEFAULT_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+    # Weight of the newest batch in the per-pair time average
+    TIMING_SMOOTHING = 0.3
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        model: Optional[CrossEncoder] = None
+    ):
+        """
+        Initialize the reranker.
+
+        Args:
+            model_name: CrossEncoder model name (default: config search.rerank_model)
+            batch_size: Pairs per model pass (default: config search.rerank_batch_size)
+            budget_ms: Latency budget in milliseconds (default: config search.rerank_budget_ms)
+            cache_size: Cached pair scores (default: config search.rerank_cache_size)
+            model: Already loaded CrossEncoder to use instead of loading one
+        """
+        self.model_name = model_name or ConfigManager.get("search", "rerank_model", self.DEFAULT_MODEL)
+        self.batch_size = max(1, int(batch_size or ConfigManager.get("search", "rerank_batch_size", 16)))
+        if budget_ms is None:
+            budget_ms = float(ConfigManager.get("search", "rerank_budget_ms", 150))
+        self.budget_ms = budget_ms
+        if cache_size is None:
+            cache_size = int(ConfigManager.get("search", "rerank_cache_size", 10000))
+        self.score_cache: LRUCache[float] = LRUCache(max_size=max(1, cache_size))
+        self.truncated = 0
+        self.skipped = 0
+        self.pair_ms: Optional[float] = None
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the model is ready to score."""
+        return self._model is not None
+
+    def load(self) -> CrossEncoder:
+        """
+        Load the model (if needed) and time a warm-up batch, so the first
+        real batch is already sized to the budget.
+
+        Returns:
+            The loaded CrossEncoder
+        """
+        with self._model_lock:
+            if self._model is None:
+                logger.info(f"Loading reranker model: {self.model_name}")
+                model = CrossEncoder(self.model_name)
+                pairs = [("warm up", "warm up")] * self.batch_size
+                start = time.perf_counter()
+                model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+                self._record_timing(start, len(pairs))
+                self._model = model
+            return self._model
+
+    def load_in_background(self) -> None:
+        """Start loading the model on a daemon thread, unless already started."""
+        with self._model_lock:
+            if self._model is not None or self._loader is not None:
+                return
+            self._loader = threading.Thread(target=self._load_quietly, name="reranker-load", daemon=True)
+            self._loader.start()
+
+    def _load_quietly(self) -> None:
+        try:
+            self.load()
+        except Exception as e:
+            logger.error(f"Reranker model '{self.model_name}' failed to load, reranking disabled: {e}")
+
+    def _record_timing(self, start: float, pairs: int) -> None:
+        """Fold a model pass started at start (perf_counter) into pair_ms."""
+        measured = (time.perf_counter() - start) * 1000 / pairs
+        if self.pair_ms is None:
+            self.pair_ms = measured
+        else:
+            self.pair_ms += self.TIMING_SMOOTHING * (measured - self.pair_ms)
+
+    def rerank(self, query: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Reorder hits by cross-encoder relevance to the query.
+
+        Args:
+            query: Search query
+            hits: Candidates in the query_similar format, in retrieval order
+
+        Returns:
+            Scored hits, most relevant first, with 'distance' set to the negated
+            cross-encoder score (lower is better) and the score kept as
+            'rerank_score'; hits left unscored when the budget ran out follow
+            in retrieval order, unchanged. While the model is not loaded (its
+            load is started in the background), hits are returned unchanged.
+        """
+        if not hits:
+            return []
+        if not self.loaded:
+            self.load_in_background()
+            self.skipped += 1
+            return list(hits)
+
+        key_query = " ".join(query.split()).casefold()
+        scores: Dict[int, float] = {}
+        pending: List[int] = []
+        for i, hit in enumerate(hits):
+            cached = self.score_cache.get((key_query, hit["id"]))
+            if cached is not None:
+                scores[i] = cached
+            else:
+                pending.append(i)
+
+        deadline = time.monotonic() + self.budget_ms / 1000 if self.budget_ms else None
+        start = 0
+        while start < len(pending):
+            size = self.batch_size
+            if deadline is not None:
+                remaining_ms = (deadline - time.monotonic()) * 1000
+                # Only as many pairs as the remaining budget can pay for
+                if self.pair_ms:
+                    size = min(size, int(remaining_ms / self.pair_ms))
+                if remaining_ms <= 0 or size < 1:
+                    self.truncated += 1
+                    logger.debug(f"Rerank budget spent: {len(pending) - start} of {len(hits)} candidates unscored")
+                    break
+            batch = pending[start:start + size]
+            start += len(batch)
+            started = time.perf_counter()
+            batch_scores = self._model.predict(
+                [(query, hits[i].get("document") or "") for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False
+            )
+            self._record_timing(started, len(batch))
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+                self.score_cache.put((key_query, hits[i]["id"]), scores[i])
+
+        ranked = sorted(scores, key=lambda i: scores[i], reverse=True)
+        reranked = [{**hits[i], "distance": -scores[i], "rerank_score": scores[i]} for i in ranked]
+        return reranked + [hit for i, hit in enumerate(hits) if i not in scores]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return score cache counters and how often the budget cut a rerank short or the model was not ready."""
+        return {
+            "model": self.model_name,
+            "loaded": self.loaded,
+            "budget_ms": self.budget_ms,
+            "pair_ms": self.pair_ms,
+            "truncated": self.truncated,
+            "skipped": self.skipped,
+            **self.score_cache.stats()
+        }
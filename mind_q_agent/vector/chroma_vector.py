@@ -7,13 +7,16 @@ document embeddings and semantic search functionality.
 
 import logging
 import shutil
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 
+from mind_q_agent.vector.embedding_cache import EmbeddingCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,13 +32,21 @@ class ChromaVectorDB:
         client: ChromaDB client instance
         collection: ChromaDB collection for documents
         model: SentenceTransformer model for embedding generation
+        embedding_cache: Cache of previously computed embeddings
+        generation: Write counter, bumped whenever the collection changes
     """
     
+    # Number of texts encoded per model forward pass
+    ENCODE_BATCH_SIZE = 64
+    
     def __init__(
         self, 
         db_path: str, 
         collection_name: str = "mind_q_docs",
-        model_name: str = "all-MiniLM-L6-v2"
+        model_name: str = "all-MiniLM-L6-v2",
+        model: Optional[SentenceTransformer] = None,
+        client: Optional[Any] = None,
+        embedding_cache: Optional[EmbeddingCache] = None
     ):
         """
         Initialize ChromaDB connection and embedding model.
@@ -44,20 +55,35 @@ class ChromaVectorDB:
             db_path: Path to the database directory
             collection_name: Name of the collection to use
             model_name: Name of the SentenceTransformer model
+            model: Already loaded embedding model to share instead of loading one
+            client: Already open ChromaDB client to share instead of opening one
+            embedding_cache: Embedding cache to use (defaults to an in-memory LRU)
             
         Raises:
             RuntimeError: If initialization fails
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.embedding_cache = embedding_cache or EmbeddingCache(model_name)
+        # Lets query-result caches detect that the collection has changed
+        self._generation = 0
+        # Generation of the last write touching each document, and of the last reset
+        self._doc_generations: Dict[str, int] = {}
+        # Generation at which each document's chunks were last added
+        self._doc_added: Dict[str, int] = {}
+        self._cleared_generation = 0
+        self._generation_lock = threading.Lock()
         
         try:
             # Initialize ChromaDB client
-            self.client = chromadb.PersistentClient(path=str(self.db_path))
+            self.client = client or chromadb.PersistentClient(path=str(self.db_path))
             
             # Initialize embedding model
-            logger.info(f"Loading embedding model: {model_name}")
-            self.model = SentenceTransformer(model_name)
+            if model is None:
+                logger.info(f"Loading embedding model: {model_name}")
+                model = SentenceTransformer(model_name)
+            self.model = model
             
             # Get or create collection
             self.collection = self.client.get_or_create_collection(
@@ -75,7 +101,8 @@ class ChromaVectorDB:
         self, 
         documents: List[str], 
         metadatas: List[Dict[str, Any]], 
-        ids: List[str]
+        ids: List[str],
+        embeddings: Optional[List[Optional[List[float]]]] = None
     ) -> None:
         """
         Add documents to the vector database.
@@ -86,6 +113,8 @@ class ChromaVectorDB:
             documents: List of text content
             metadatas: List of metadata dictionaries
             ids: List of unique document IDs
+            embeddings: Known embeddings to reuse; only documents whose entry
+                        is None (or all, when omitted) are encoded
             
         Raises:
             ValueError: If input lists have different lengths
@@ -93,23 +122,40 @@ class ChromaVectorDB:
         """
         if not (len(documents) == len(metadatas) == len(ids)):
             raise ValueError("documents, metadatas, and ids must have the same length")
+        if embeddings is not None and len(embeddings) != len(documents):
+            raise ValueError("embeddings must have the same length as documents")
         
         if not documents:
             return
 
         try:
-            # Generate embeddings
-            embeddings = self.model.encode(documents).tolist()
-            
-            # Add to collection
-            self.collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
-            )
+            # Generate missing embeddings in batched forward passes
+            embeddings = list(embeddings) if embeddings is not None else [None] * len(documents)
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                encoded = self.model.encode(
+                    [documents[i] for i in missing],
+                    batch_size=self.ENCODE_BATCH_SIZE
+                ).tolist()
+                for i, embedding in zip(missing, encoded):
+                    embeddings[i] = embedding
+            
+            # Add to collection, respecting Chroma's maximum batch size
+            max_batch = self._max_batch_size()
+            for start in range(0, len(documents), max_batch):
+                end = start + max_batch
+                self.collection.add(
+                    documents=documents[start:end],
+                    embeddings=embeddings[start:end],
+                    metadatas=metadatas[start:end],
+                    ids=ids[start:end]
+                )
             
-            logger.info(f"Added {len(documents)} documents to ChromaDB")
+            self._bump_generation(
+                (metadata.get("doc_hash", record_id) for metadata, record_id in zip(metadatas, ids)),
+                added=True
+            )
+            logger.info(f"Added {len(documents)} documents to ChromaDB ({len(missing)} embedded)")
             
         except Exception as e:
             logger.error(f"Failed to add documents: {e}")
@@ -133,35 +179,272 @@ class ChromaVectorDB:
             List of results with metadata, distance, and document content.
             Format: [{'id': id, 'document': text, 'metadata': dict, 'distance': float}, ...]
         """
+        results = self.query_many([query], n_results=n_results, where=where)
+        return results[0] if results else []
+
+    def query_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several semantic searches at once.
+        
+        All queries are encoded in one batched forward pass and sent to
+        ChromaDB in a single query call.
+        
+        Args:
+            queries: Query texts
+            n_results: Number of results per query
+            where: Optional metadata filter applied to every query
+            
+        Returns:
+            One result list per query, in query order, each in the
+            query_similar format (empty lists if the search fails)
+        """
+        if not queries:
+            return []
+        
         try:
-            # Generate query embedding
-            query_embedding = self.model.encode([query]).tolist()
-            
-            # Execute query
-            results = self.collection.query(
-                query_embeddings=query_embedding,
-                n_results=n_results,
-                where=where
-            )
+            # Generate all query embeddings in one forward pass
+            query_embeddings = self.model.encode(
+                list(queries),
+                batch_size=self.ENCODE_BATCH_SIZE
+            ).tolist()
             
-            # Parse results into a friendly format
-            parsed_results = []
-            if results['ids']:
-                # ChromaDB returns lists of lists (one list per query)
-                count = len(results['ids'][0])
-                for i in range(count):
-                    parsed_results.append({
-                        'id': results['ids'][0][i],
-                        'document': results['documents'][0][i] if results['documents'] else "",
-                        'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
-                        'distance': results['distances'][0][i] if results['distances'] else 0.0
-                    })
-            
-            return parsed_results
+            # Execute all queries in one call
+            return self._query_embeddings(query_embeddings, n_results, where)
             
         except Exception as e:
             logger.error(f"Query failed: {e}")
-            return []
+            return [[] for _ in queries]
+
+    def query_by_embedding(
+        self,
+        embedding: List[float],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search with an already computed query embedding.
+        
+        Args:
+            embedding: Query embedding
+            n_results: Number of results to return
+            where: Optional metadata filter
+            
+        Returns:
+            Results in the query_similar format
+            
+        Raises:
+            RuntimeError: If the query fails
+        """
+        try:
+            return self._query_embeddings([list(embedding)], n_results, where)[0]
+        except Exception as e:
+            logger.error(f"Query failed: {e}")
+            raise RuntimeError(f"Query failed: {e}") from e
+
+    def _query_embeddings(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        where: Optional[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Run one ChromaDB query call and parse its results, one list per embedding."""
+        results = self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where
+        )
+        
+        # Parse results into a friendly format
+        # ChromaDB returns lists of lists (one list per query)
+        ids = results.get('ids') or []
+        documents = results.get('documents')
+        metadatas = results.get('metadatas')
+        distances = results.get('distances')
+        parsed_results = []
+        for q in range(len(query_embeddings)):
+            hits = []
+            for i, hit_id in enumerate(ids[q] if q < len(ids) else []):
+                hits.append({
+                    'id': hit_id,
+                    'document': documents[q][i] if documents else "",
+                    'metadata': metadatas[q][i] if metadatas else {},
+                    'distance': distances[q][i] if distances else 0.0
+                })
+            parsed_results.append(hits)
+        
+        return parsed_results
+
+    def get_document_chunks(self, doc_hash: str) -> Dict[str, List[float]]:
+        """
+        Return the stored chunks of a document as a text -> embedding mapping.
+        
+        Args:
+            doc_hash: Hash of the parent document (chunk metadata doc_hash)
+            
+        Returns:
+            Mapping of chunk text to its embedding (empty if unknown)
+        """
+        try:
+            results = self.collection.get(
+                where={"doc_hash": doc_hash},
+                include=["documents", "embeddings"]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load chunks of {doc_hash[:8]}: {e}")
+            return {}
+        
+        documents = results.get("documents")
+        embeddings = results.get("embeddings")
+        if documents is None or embeddings is None:
+            return {}
+        return {
+            text: [float(x) for x in embedding]
+            for text, embedding in zip(documents, embeddings)
+        }
+
+    def delete_document(self, doc_hash: str) -> None:
+        """
+        Delete every chunk of a document.
+        
+        Args:
+            doc_hash: Hash of the parent document
+            
+        Raises:
+            RuntimeError: If the delete fails
+        """
+        try:
+            self.collection.delete(where={"doc_hash": doc_hash})
+            self._bump_generation([doc_hash])
+            logger.info(f"Deleted chunks of document {doc_hash[:8]}")
+        except Exception as e:
+            logger.error(f"Failed to delete chunks of {doc_hash[:8]}: {e}")
+            raise RuntimeError(f"Failed to delete document chunks: {e}") from e
+
+    def iter_chunks(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every stored record (without embeddings), page by page.
+        
+        Args:
+            batch_size: Records fetched per request
+            
+        Yields:
+            Dicts with id, document and metadata
+        """
+        offset = 0
+        while True:
+            results = self.collection.get(
+                limit=batch_size, offset=offset, include=["documents", "metadatas"]
+            )
+            ids = results["ids"]
+            if not ids:
+                return
+            for i, record_id in enumerate(ids):
+                yield {
+                    "id": record_id,
+                    "document": results["documents"][i] if results["documents"] else "",
+                    "metadata": results["metadatas"][i] if results["metadatas"] else {}
+                }
+            offset += len(ids)
+
+    def update_document_source(self, doc_hash: str, source: str, filename: str) -> None:
+        """
+        Point every chunk of a document at a new source path (e.g. after a rename).
+
+        Args:
+            doc_hash: Hash of the parent document
+            source: New source path
+            filename: New file name
+
+        Raises:
+            RuntimeError: If the update fails
+        """
+        try:
+            results = self.collection.get(where={"doc_hash": doc_hash}, include=["metadatas"])
+            if not results["ids"]:
+                return
+            metadatas = [
+                {**metadata, "source": source, "filename": filename}
+                for metadata in results["metadatas"]
+            ]
+            self.collection.update(ids=results["ids"], metadatas=metadatas)
+            self._bump_generation([doc_hash])
+        except Exception as e:
+            logger.error(f"Failed to update chunks of {doc_hash[:8]}: {e}")
+            raise RuntimeError(f"Failed to update document chunks: {e}") from e
+
+    @property
+    def generation(self) -> int:
+        """Number of writes to the collection made through this instance."""
+        with self._generation_lock:
+            return self._generation
+
+    def document_generation(self, doc_hash: str) -> int:
+        """
+        Generation of the last write that touched a document (its chunks
+        added, deleted or re-pointed), or of the last collection reset.
+        
+        Returns:
+            0 if neither happened through this instance
+        """
+        with self._generation_lock:
+            return max(self._doc_generations.get(doc_hash, 0), self._cleared_generation)
+
+    def documents_added_since(self, generation: int) -> List[str]:
+        """
+        Documents whose chunks were added after a generation.
+        
+        Returns:
+            Document hashes (unordered)
+        """
+        with self._generation_lock:
+            return [doc_hash for doc_hash, added in self._doc_added.items() if added > generation]
+
+    def _bump_generation(self, doc_hashes: Iterable[str] = (), cleared: bool = False, added: bool = False) -> None:
+        with self._generation_lock:
+            self._generation += 1
+            for doc_hash in doc_hashes:
+                self._doc_generations[doc_hash] = self._generation
+                if added:
+                    self._doc_added[doc_hash] = self._generation
+            if cleared:
+                self._doc_generations.clear()
+                self._doc_added.clear()
+                self._cleared_generation = self._generation
+
+    def _max_batch_size(self) -> int:
+        """Largest number of records Chroma accepts in a single add call."""
+        try:
+            return int(self.client.get_max_batch_size())
+        except Exception:
+            return 5000
+
+    @property
+    def max_seq_length(self) -> int:
+        """Maximum number of tokens the embedding model reads per text."""
+        return int(getattr(self.model, "max_seq_length", 256) or 256)
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count model tokens in a text using the embedding model's tokenizer.
+        
+        Special tokens ([CLS], [SEP], ...) are included, so the count is
+        comparable with max_seq_length: the model truncates beyond it.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Number of tokens the model reads, special tokens included
+        """
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return len(text.split())
+        return len(tokenizer(text, add_special_tokens=True, truncation=False)["input_ids"])
 
     def count(self) -> int:
         """
@@ -176,15 +459,62 @@ class ChromaVectorDB:
         """
         Generate embedding for a single text string.
         
+        Cached embeddings are returned without running the model.
+        
         Args:
             text: Input text
             
         Returns:
             Embedding vector as list of floats
         """
+        return self.get_embeddings([text])[0]
+
+    def encode_query(self, text: str) -> List[float]:
+        """
+        Embed a query with the model, bypassing the embedding cache.
+        
+        Queries are one-off texts: persisting them would only fill the
+        document embedding cache.
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector as list of floats
+        """
+        return self.model.encode([text], batch_size=self.ENCODE_BATCH_SIZE)[0].tolist()
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many texts, encoding only cache misses.
+        
+        Misses are encoded together in batched forward passes and stored
+        in the embedding cache.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            Embedding vectors in the same order as `texts`
+            
+        Raises:
+            RuntimeError: If embedding generation fails
+        """
+        if not texts:
+            return []
+
         try:
-            embedding = self.model.encode([text])[0].tolist()
-            return embedding
+            cached = self.embedding_cache.get_many(texts)
+            misses = list(dict.fromkeys(t for t in texts if t not in cached))
+            
+            if misses:
+                encoded = self.model.encode(misses, batch_size=self.ENCODE_BATCH_SIZE).tolist()
+                computed = dict(zip(misses, encoded))
+                self.embedding_cache.put_many(computed)
+                cached.update(computed)
+                logger.debug(f"Embedded {len(misses)} texts ({len(texts) - len(misses)} cached)")
+            
+            return [cached[t] for t in texts]
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise RuntimeError(f"Embedding generation failed: {e}") from e
@@ -198,6 +528,7 @@ class ChromaVectorDB:
         try:
             collection_name = self.collection.name
             self.client.delete_collection(collection_name)
+            self._bump_generation(cleared=True)
             logger.info(f"Deleted collection: {collection_name}")
         except Exception as e:
             logger.error(f"Failed to delete collection: {e}")
@@ -0,0 +1,142 @@
+"""
+Embedding cache for Mind-Q Agent.
+
+Keeps recently used embeddings in an in-memory LRU and, optionally, in a
+persistent SQLite store so recurring texts (concept names in particular)
+are encoded once per model instead of once per document.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from mind_q_agent.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache keyed by model name + text hash.
+
+    Attributes:
+        model_name: Embedding model the cached vectors belong to
+        db_path: Optional SQLite file backing the in-memory LRU
+    """
+
+    def __init__(self, model_name: str, max_size: int = 10000, db_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            model_name: Embedding model name (part of every key)
+            max_size: Maximum number of embeddings kept in memory
+            db_path: Optional path of a persistent SQLite store
+
+        Raises:
+            RuntimeError: If the persistent store cannot be opened
+        """
+        self.model_name = model_name
+        self.db_path = db_path
+        self._memory: LRUCache[List[float]] = LRUCache(max_size=max_size)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        if db_path:
+            try:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(db_path, check_same_thread=False)
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS embeddings (
+                        key TEXT PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        vector BLOB NOT NULL
+                    )
+                """)
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"Failed to open embedding cache at {db_path}: {e}")
+                raise RuntimeError(f"Embedding cache initialization failed: {e}") from e
+
+    def key(self, text: str) -> str:
+        """Cache key of a text for this cache's model."""
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            Mapping of text -> embedding for every text found in the cache
+        """
+        found: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+
+        for text in texts:
+            key = self.key(text)
+            vector = self._memory.get(key)
+            if vector is not None:
+                found[text] = vector
+            else:
+                missing[key] = text
+
+        if missing and self._conn is not None:
+            keys = list(missing)
+            with self._lock:
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = array("f", blob).tolist()
+                        self._memory.put(key, vector)
+                        found[missing[key]] = vector
+
+        return found
+
+    def put_many(self, embeddings: Dict[str, List[float]]) -> None:
+        """
+        Store embeddings in memory and, if configured, on disk.
+
+        Args:
+            embeddings: Mapping of text -> embedding
+        """
+        rows = []
+        for text, vector in embeddings.items():
+            key = self.key(text)
+            self._memory.put(key, vector)
+            rows.append((key, self.model_name, array("f", vector).tobytes()))
+
+        if rows and self._conn is not None:
+            with self._lock:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+                        rows
+                    )
+                    self._conn.commit()
+                except Exception as e:
+                    # The cache is an optimisation; never fail the caller over it
+                    logger.warning(f"Failed to persist embeddings: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return in-memory hit/miss statistics."""
+        return self._memory.stats()
+
+    def close(self) -> None:
+        """Close the persistent store."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
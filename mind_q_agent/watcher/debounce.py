@@ -0,0 +1,164 @@
+"""
+Trailing-edge coalescing of file system events.
+
+Editors and file copies produce bursts of created/modified events for one
+path. EventCoalescer keeps a single pending entry per path and fires it only
+once the path has been quiet for `quiet_period` seconds and its size and
+mtime have stopped changing, so a file is handed on once, after it has been
+completely written.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# When events for one path are merged, the higher-priority type is kept
+EVENT_PRIORITY = {"modified": 0, "detected": 0, "moved": 1, "created": 2}
+
+
+@dataclass
+class PendingEvent:
+    """Coalesced state of one path waiting for its quiet period."""
+    event_type: str
+    due: float
+    first_seen: float
+    stat: Optional[Tuple[int, float]]
+
+
+def merge_event_types(current: str, new: str) -> str:
+    """Merged type of two events for the same path (e.g. created + modified = created)."""
+    return current if EVENT_PRIORITY.get(current, 0) >= EVENT_PRIORITY.get(new, 0) else new
+
+
+def _stat(path: str) -> Optional[Tuple[int, float]]:
+    """(size, mtime) of a path, or None if it no longer exists."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime
+
+
+class EventCoalescer:
+    """
+    Per-path trailing-edge debouncer running on its own thread.
+
+    Entries are removed as soon as they fire or are discarded, so memory is
+    bounded by the number of paths with events in flight.
+
+    Attributes:
+        callback: Called with (path, event_type) once a path has settled
+        quiet_period: Seconds without events (and without size/mtime changes) before firing
+        max_wait: Seconds after the first event after which a still-changing path fires anyway
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[str, str], None],
+        quiet_period: float = 1.0,
+        max_wait: float = 60.0
+    ):
+        """
+        Initialize the coalescer (nothing fires until start()).
+
+        Args:
+            callback: Receives (path, event_type); runs on the coalescer thread
+            quiet_period: Quiet seconds required per path
+            max_wait: Upper bound on how long a busy path is held back
+        """
+        self.callback = callback
+        self.quiet_period = quiet_period
+        self.max_wait = max_wait
+        self._pending: Dict[str, PendingEvent] = {}
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, path: str, event_type: str) -> None:
+        """Register an event, pushing the path's deadline back by the quiet period."""
+        now = time.monotonic()
+        snapshot = _stat(path)
+        with self._cond:
+            entry = self._pending.get(path)
+            if entry is None:
+                self._pending[path] = PendingEvent(event_type, now + self.quiet_period, now, snapshot)
+            else:
+                entry.event_type = merge_event_types(entry.event_type, event_type)
+                entry.due = now + self.quiet_period
+                entry.stat = snapshot
+            self._cond.notify()
+
+    def discard(self, path: str) -> bool:
+        """Drop the pending event of a path; True if there was one."""
+        with self._cond:
+            return self._pending.pop(path, None) is not None
+
+    def pending(self) -> int:
+        """Number of paths waiting for their quiet period."""
+        with self._cond:
+            return len(self._pending)
+
+    def start(self) -> None:
+        """Start the coalescer thread."""
+        with self._cond:
+            self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="FileEventCoalescer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the thread; events still waiting are dropped."""
+        with self._cond:
+            self._stopping = True
+            dropped = len(self._pending)
+            self._pending.clear()
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if dropped:
+            logger.info(f"Dropped {dropped} unsettled file events on stop")
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    now = time.monotonic()
+                    ready = self._pop_ready(now)
+                    if ready:
+                        break
+                    if self._pending:
+                        self._cond.wait(max(min(e.due for e in self._pending.values()) - now, 0.0))
+                    else:
+                        self._cond.wait()
+
+            for path, event_type in ready:
+                try:
+                    self.callback(path, event_type)
+                except Exception as e:
+                    logger.error(f"Error handling {event_type} event for {path}: {e}", exc_info=True)
+
+    def _pop_ready(self, now: float) -> List[Tuple[str, str]]:
+        """Remove and return settled paths; busy ones are pushed back (caller holds the lock)."""
+        ready = []
+        for path in [p for p, e in self._pending.items() if e.due <= now]:
+            entry = self._pending[path]
+            current = _stat(path)
+            if current is None:
+                # Gone before it settled (temporary file, deleted)
+                del self._pending[path]
+                continue
+            if current != entry.stat and now - entry.first_seen < self.max_wait:
+                # Still being written without events: wait another quiet period
+                entry.stat = current
+                entry.due = now + self.quiet_period
+                continue
+            del self._pending[path]
+            ready.append((path, entry.event_type))
+        return ready
@@ -3,24 +3,32 @@ File Watcher module for monitoring file system changes.
 
 This module provides the FileWatcher class which uses watchdog to monitor
 directories for new or modified files and queues them for processing.
+Events are coalesced per path and only handled once the file has settled
+(trailing-edge debounce), so a file being written or copied is queued once,
+after it is complete. With a manifest, start() also runs a catch-up scan
+for files that changed while the watcher was not running.
+
+Only lightweight path events are queued; text extraction happens in the
+ingestion pool, off the watchdog observer thread. With a FileManifest,
+files that have not changed (same size and mtime, or same bytes) are
+dropped here, and files whose bytes match another ingested file are queued
+as links to its document, before any text is extracted.
 """
 
-import hashlib
 import logging
-import time
+import threading
 from pathlib import Path
-from queue import Queue
+from queue import Full, Queue
 from typing import Any, Dict, Optional
 
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 from watchdog.observers import Observer
 
-# Optional PyMuPDF import
-try:
-    import fitz
-    HAS_PYMUPDF = True
-except ImportError:
-    HAS_PYMUPDF = False
+from mind_q_agent.ingestion.manifest import FileManifest
+from mind_q_agent.ingestion.text_reader import SUPPORTED_EXTENSIONS
+from mind_q_agent.config.manager import ConfigManager
+from mind_q_agent.watcher.debounce import EventCoalescer
+from mind_q_agent.watcher.scanner import CatchUpScanner
 
 logger = logging.getLogger(__name__)
 
@@ -37,48 +45,82 @@ class MindQFileHandler(FileSystemEventHandler):
         """Handle file creation events."""
         if event.is_directory:
             return
-        self.watcher.process_file(event.src_path, event_type="created")
+        self.watcher.schedule(event.src_path, event_type="created")
         
     def on_modified(self, event: FileSystemEvent) -> None:
         """Handle file modification events."""
         if event.is_directory:
             return
-        self.watcher.process_file(event.src_path, event_type="modified")
+        self.watcher.schedule(event.src_path, event_type="modified")
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        """Handle renames (including editors' write-then-rename saves)."""
+        if event.is_directory:
+            return
+        self.watcher.handle_moved(event.src_path, event.dest_path)
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        """Handle file deletion events."""
+        if event.is_directory:
+            return
+        self.watcher.handle_deleted(event.src_path)
 
 
 class FileWatcher:
     """
-    Monitors a directory for file changes and processes supported files.
+    Monitors a directory for file changes and queues supported files.
+    
+    When the queue is bounded and full, the observer thread blocks on it,
+    which applies backpressure instead of buffering file contents in memory.
     
     Attributes:
         watch_folder: Path to the folder to watch
-        queue: Queue to put processed file data into
-        debounce_window: Time in seconds to ignore duplicate events
+        queue: Queue to put file events into
+        debounce_window: Quiet seconds a path needs before it is queued
+        manifest: Optional record of already ingested files
     """
     
-    SUPPORTED_EXTENSIONS = {'.txt', '.md', '.pdf'}
+    SUPPORTED_EXTENSIONS = SUPPORTED_EXTENSIONS
+    # Seconds between stop checks while blocked on a full queue
+    PUT_POLL_INTERVAL = 0.5
     
     def __init__(
         self, 
         watch_folder: str, 
         queue: Queue, 
-        debounce_window: float = 1.0
+        debounce_window: float = 1.0,
+        manifest: Optional[FileManifest] = None,
+        scan_rate: Optional[float] = None
     ):
         """
         Initialize the FileWatcher.
         
         Args:
             watch_folder: Directory to watch
-            queue: Queue for processed data
-            debounce_window: Seconds to wait before re-processing same file
+            queue: Queue for file events (bounded queues apply backpressure)
+            debounce_window: Quiet seconds (no events, no size/mtime change) before a file is queued
+            manifest: File manifest checked before queueing (no content checks
+                      and no catch-up scan when None)
+            scan_rate: Files per second the catch-up scan may queue (default: config)
         """
         self.watch_folder = Path(watch_folder)
         self.queue = queue
         self.debounce_window = debounce_window
+        self.manifest = manifest
         
         self.observer = Observer()
         self.event_handler = MindQFileHandler(self)
-        self._last_processed: Dict[str, float] = {}
+        self._coalescer = EventCoalescer(self.process_file, quiet_period=debounce_window)
+        self.scanner: Optional[CatchUpScanner] = None
+        if manifest is not None:
+            self.scanner = CatchUpScanner(
+                manifest,
+                self.process_file,
+                max_rate=float(scan_rate if scan_rate is not None else ConfigManager.get("watcher", "scan_rate", 200)),
+                queue_load=self._queue_load
+            )
+        self._scan_thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
         
         # Create watch folder if needed
         self.watch_folder.mkdir(parents=True, exist_ok=True)
@@ -90,25 +132,93 @@ class FileWatcher:
             str(self.watch_folder), 
             recursive=True
         )
+        self._stopping.clear()
+        self._coalescer.start()
         self.observer.start()
         logger.info(f"Started watching: {self.watch_folder}")
+        
+        # Live events are already being captured, so nothing falls between scan and watch
+        if self.scanner is not None:
+            self._scan_thread = threading.Thread(
+                target=self.scanner.scan,
+                args=(self.watch_folder, self.SUPPORTED_EXTENSIONS, self._stopping),
+                name="FileWatcherCatchUp",
+                daemon=True
+            )
+            self._scan_thread.start()
 
     def stop(self) -> None:
         """Stop the file watcher."""
+        # Release an observer thread blocked on a full queue
+        self._stopping.set()
         self.observer.stop()
         self.observer.join()
+        if self._scan_thread is not None:
+            self._scan_thread.join()
+            self._scan_thread = None
+        self._coalescer.stop()
         logger.info("Stopped file watcher")
 
+    def schedule(self, filepath: str, event_type: str = "modified") -> None:
+        """
+        Register a file event; the file is queued once it has settled.
+        
+        Args:
+            filepath: Path to the file
+            event_type: Type of event (created, modified, moved)
+        """
+        if Path(filepath).suffix.lower() not in self.SUPPORTED_EXTENSIONS:
+            return
+        self._coalescer.add(filepath, event_type)
+
+    def handle_moved(self, src_path: str, dest_path: str) -> None:
+        """
+        Handle a rename: the stored document follows the file, then the new
+        path is scheduled.
+        
+        The manifest entry follows the file too, so a plain rename is not
+        re-ingested; a rename that changed content (editor saves) is.
+        """
+        self._coalescer.discard(src_path)
+        if self.manifest is not None:
+            self.manifest.move(src_path, dest_path)
+        if Path(dest_path).suffix.lower() in self.SUPPORTED_EXTENSIONS:
+            self._enqueue({
+                "filepath": dest_path,
+                "filename": Path(dest_path).name,
+                "src_path": src_path,
+                "event_type": "renamed"
+            })
+        self.schedule(dest_path, event_type="moved")
+
+    def handle_deleted(self, filepath: str) -> None:
+        """
+        Queue the removal of a deleted file from the knowledge base.
+        
+        It is also forgotten by the manifest, so re-creating it is ingested again.
+        """
+        self._coalescer.discard(filepath)
+        if self.manifest is not None:
+            self.manifest.forget(filepath)
+        if Path(filepath).suffix.lower() not in self.SUPPORTED_EXTENSIONS:
+            return
+        if self._enqueue({"filepath": filepath, "filename": Path(filepath).name, "event_type": "deleted"}):
+            logger.info(f"Queued removal: {Path(filepath).name}")
+
     def process_file(self, filepath: str, event_type: str = "detected") -> Optional[Dict[str, Any]]:
         """
-        Process a file: extract text and metadata.
+        Queue a file event for ingestion immediately (no debouncing; watchdog
+        events go through schedule()).
+        
+        The event carries only path and stat data, plus the raw-bytes hash
+        when a manifest is used; the text is never extracted here.
         
         Args:
             filepath: Path to the file
-            event_type: Type of event (created, modified, detected)
+            event_type: Type of event (created, modified, moved, detected)
             
         Returns:
-            Dict containing file data or None if skipped
+            Dict containing the queued event or None if skipped
         """
         path = Path(filepath)
         
@@ -116,74 +226,79 @@ class FileWatcher:
         if path.suffix.lower() not in self.SUPPORTED_EXTENSIONS:
             return None
             
-        # 2. Debouncing
-        current_time = time.time()
-        last_time = self._last_processed.get(filepath, 0)
-        
-        if (current_time - last_time) < self.debounce_window:
-            logger.debug(f"Debounced: {path.name}")
-            return None
-            
-        self._last_processed[filepath] = current_time
-        
         try:
-            # 3. Extract text
-            text = self._extract_text(path)
-            if not text:
-                logger.warning(f"No text extracted from {path.name}")
-                return None
-                
-            # 4. Calculate hash
-            file_hash = self._calculate_hash(text)
-            
-            # 5. Prepare data
+            # 2. Prepare event
             stat = path.stat()
             file_data = {
                 "filepath": str(path),
                 "filename": path.name,
-                "file_hash": file_hash,
-                "text": text,
                 "size_bytes": stat.st_size,
                 "modified_at": stat.st_mtime,
                 "file_type": path.suffix.lower(),
                 "event_type": event_type
             }
             
-            # 6. Add to queue
-            self.queue.put(file_data)
-            logger.info(f"Processed file: {path.name} ({event_type})")
+            # 3. Skip unchanged and byte-identical files
+            if self.manifest is not None and self._is_known(file_data):
+                return None
+            
+            # 4. Add to queue (blocks while the queue is full)
+            if not self._enqueue(file_data):
+                return None
+            logger.info(f"Queued file: {path.name} ({event_type})")
             return file_data
             
         except Exception as e:
             logger.error(f"Error processing {path.name}: {e}")
             return None
 
-    def _extract_text(self, path: Path) -> Optional[str]:
-        """Extract text content based on file type."""
-        ext = path.suffix.lower()
+    def _is_known(self, file_data: Dict[str, Any]) -> bool:
+        """
+        Check the manifest; adds the raw hash to `file_data` for new content.
         
-        try:
-            if ext in {'.txt', '.md'}:
-                return path.read_text(encoding='utf-8')
-                
-            elif ext == '.pdf':
-                if not HAS_PYMUPDF:
-                    logger.warning("PyMuPDF not installed, skipping PDF")
-                    return None
-                    
-                text = ""
-                with fitz.open(path) as doc:
-                    for page in doc:
-                        text += page.get_text()
-                return text
-                
-        except UnicodeDecodeError:
-            logger.warning(f"Encoding error reading {path.name}")
-        except Exception as e:
-            logger.error(f"Extraction failed for {path.name}: {e}")
-            
-        return None
+        A file with the same bytes as another ingested file is turned into a
+        "linked" event carrying that file's doc_hash: the writer links the
+        path to the stored document without extracting it again, and the
+        manifest records it once that has happened.
+        
+        Returns:
+            True if the file needs no ingestion
+        """
+        filepath = file_data["filepath"]
+        if self.manifest.is_unchanged(filepath, file_data["size_bytes"], file_data["modified_at"]):
+            logger.debug(f"Unchanged: {file_data['filename']}")
+            return True
+        
+        raw_hash = FileManifest.hash_file(Path(filepath))
+        entry = self.manifest.get(filepath)
+        if entry is not None and entry.raw_hash == raw_hash:
+            # Touched but not changed: only the stat data is new
+            self.manifest.record(
+                filepath, file_data["size_bytes"], file_data["modified_at"], raw_hash, entry.doc_hash
+            )
+            logger.debug(f"Unchanged content: {file_data['filename']}")
+            return True
+        
+        file_data["raw_hash"] = raw_hash
+        known = self.manifest.find_by_raw_hash(raw_hash)
+        if known is not None:
+            # Same bytes as an ingested file: link this path to its document, skip extraction
+            file_data["event_type"] = "linked"
+            file_data["doc_hash"] = known.doc_hash
+            logger.info(f"Byte-identical to {Path(known.path).name}: {file_data['filename']}")
+        return False
+
+    def _queue_load(self) -> float:
+        """Fill ratio of a bounded queue (0 for unbounded queues)."""
+        maxsize = getattr(self.queue, "maxsize", 0)
+        return self.queue.qsize() / maxsize if maxsize > 0 else 0.0
 
-    def _calculate_hash(self, text: str) -> str:
-        """Calculate SHA-256 hash of text content."""
-        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    def _enqueue(self, item: Dict[str, Any]) -> bool:
+        """Put an item on the queue, waiting for space unless the watcher stops."""
+        while not self._stopping.is_set():
+            try:
+                self.queue.put(item, timeout=self.PUT_POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
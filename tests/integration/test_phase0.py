@@ -48,7 +48,8 @@ class TestPhase0Integration:
             # 4. Assert event contains correct path and type
             assert event.get('type') == 'file_created' or event.get('type') == 'file_modified' or event.get('event_type') == 'created'
             assert event.get('filepath') == str(test_file)
-            assert event.get('text') == "Test content for integration"
+            # Events carry the path only; the ingestion pool reads the text
+            assert 'text' not in event
             
         finally:
             watcher.stop()
@@ -8,6 +8,7 @@ document storage, semantic search, and error handling.
 import pytest
 import shutil
 from pathlib import Path
+from unittest.mock import MagicMock
 
 from mind_q_agent.vector.chroma_vector import ChromaVectorDB
 
@@ -142,3 +143,20 @@ class TestChromaVectorDB:
         vector_db.add_documents([], [], [])
         assert vector_db.count() == initial_count
 
+
+class TestTokenCounting:
+    """Token counts used to size chunks for the embedding model."""
+
+    def test_count_includes_special_tokens(self, tmp_path):
+        """Test counts include [CLS]/[SEP], matching what max_seq_length limits."""
+        model = MagicMock()
+        model.max_seq_length = 4
+        # WordPiece-like: [CLS] + one id per word + [SEP]
+        model.tokenizer.side_effect = lambda text, **kwargs: {
+            "input_ids": [101] + [7] * len(text.split()) + [102]
+        }
+        db = ChromaVectorDB(str(tmp_path / "chroma"), model=model, client=MagicMock())
+
+        assert db.count_tokens("two words") == 4
+        assert db.count_tokens("now three words") > db.max_seq_length
+        assert model.tokenizer.call_args.kwargs["add_special_tokens"] is True
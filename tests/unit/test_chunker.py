@@ -0,0 +1,79 @@
+import pytest
+from mind_q_agent.ingestion.chunker import TextChunker
+
+
+class TestTextChunker:
+    """Unit tests for TextChunker."""
+
+    def test_short_text_single_chunk(self):
+        """Test text shorter than chunk_size stays in one chunk."""
+        chunks = TextChunker(chunk_size=100, overlap=10).split("  Hello small world.  ")
+        assert len(chunks) == 1
+        assert chunks[0].text == "Hello small world."
+        assert (chunks[0].start, chunks[0].end) == (2, 20)
+
+    def test_empty_text(self):
+        """Test empty input produces no chunks."""
+        assert TextChunker(chunk_size=100, overlap=10).split("   ") == []
+
+    def test_offsets_and_size(self):
+        """Test chunks respect chunk_size, never cut words and map back to the text."""
+        text = " ".join(f"word{i}" for i in range(500))
+        chunker = TextChunker(chunk_size=120, overlap=30)
+        chunks = chunker.split(text)
+        
+        assert len(chunks) > 1
+        for i, chunk in enumerate(chunks):
+            assert chunk.index == i
+            assert len(chunk.text) <= 120
+            assert text[chunk.start:chunk.end] == chunk.text
+            assert chunk.text.split()[0].startswith("word")
+        # Whole text is covered and the last word is included
+        assert chunks[0].start == 0
+        assert chunks[-1].end == len(text)
+
+    def test_overlap(self):
+        """Test consecutive chunks overlap without exceeding the overlap size."""
+        text = " ".join(f"w{i}" for i in range(300))
+        chunks = TextChunker(chunk_size=100, overlap=20).split(text)
+        for prev, nxt in zip(chunks, chunks[1:]):
+            assert nxt.start < prev.end
+            assert prev.end - nxt.start <= 20
+            assert nxt.start > prev.start
+
+    def test_prefers_sentence_boundary(self):
+        """Test chunks end at a sentence end when one is available."""
+        text = "First sentence is here. " + "filler " * 30
+        chunks = TextChunker(chunk_size=40, overlap=0).split(text)
+        assert chunks[0].text == "First sentence is here."
+
+    def test_token_limit(self):
+        """Test chunks are shrunk to fit the model token limit."""
+        text = " ".join(["tok"] * 200)
+        chunker = TextChunker(
+            chunk_size=1000, overlap=0,
+            token_counter=lambda t: len(t.split()), max_tokens=50
+        )
+        chunks = chunker.split(text)
+        assert all(len(c.text.split()) <= 50 for c in chunks)
+        assert sum(len(c.text.split()) for c in chunks) == 200
+
+    def test_token_limit_boundary(self):
+        """Test a chunk of exactly max_tokens (special tokens included) is kept whole."""
+        # Counter like the model's: two special tokens around the words
+        chunker = TextChunker(
+            chunk_size=1000, overlap=0,
+            token_counter=lambda t: len(t.split()) + 2, max_tokens=10
+        )
+
+        fits = chunker.split(" ".join(["tok"] * 8))
+        over = chunker.split(" ".join(["tok"] * 9))
+
+        assert [len(c.text.split()) for c in fits] == [8]
+        assert len(over) == 2
+        assert all(len(c.text.split()) + 2 <= 10 for c in over)
+
+    def test_invalid_overlap(self):
+        """Test overlap must be smaller than chunk_size."""
+        with pytest.raises(ValueError):
+            TextChunker(chunk_size=100, overlap=100)
@@ -0,0 +1,47 @@
+import pytest
+from mind_q_agent.ingestion.cooccurrence import count_cooccurrences
+
+
+class TestCooccurrence:
+    """Unit tests for windowed co-occurrence counting."""
+
+    def test_pairs_within_window(self):
+        """Test only mentions within the window are paired."""
+        mentions = [
+            {"text": "python", "token": 0},
+            {"text": "django", "token": 4},
+            {"text": "rust", "token": 20},
+        ]
+        counts = count_cooccurrences(mentions, window=10)
+        assert counts == {("django", "python"): 1}
+
+    def test_counts_are_aggregated(self):
+        """Test repeated co-occurrences increment the pair count."""
+        mentions = [
+            {"text": "b", "token": 0},
+            {"text": "a", "token": 1},
+            {"text": "b", "token": 2},
+            {"text": "a", "token": 3},
+        ]
+        counts = count_cooccurrences(mentions, window=2)
+        # (b0,a1), (a1,b2), (b2,a3) are within 2 tokens; (b0,a3) is not
+        assert counts == {("a", "b"): 3}
+
+    def test_self_pairs_ignored(self):
+        """Test a concept never co-occurs with itself."""
+        mentions = [{"text": "x", "token": 0}, {"text": "x", "token": 1}]
+        assert count_cooccurrences(mentions, window=5) == {}
+
+    def test_unsorted_input(self):
+        """Test mentions are ordered by token before windowing."""
+        mentions = [
+            {"text": "late", "token": 500},
+            {"text": "early", "token": 0},
+            {"text": "middle", "token": 3},
+        ]
+        assert count_cooccurrences(mentions, window=5) == {("early", "middle"): 1}
+
+    def test_invalid_window(self):
+        """Test non-positive windows are rejected."""
+        with pytest.raises(ValueError):
+            count_cooccurrences([], window=0)
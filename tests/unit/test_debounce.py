@@ -0,0 +1,84 @@
+"""
+Unit tests for trailing-edge event coalescing.
+"""
+
+import time
+
+import pytest
+
+from mind_q_agent.watcher.debounce import EventCoalescer, merge_event_types
+
+
+class TestEventCoalescer:
+    """Unit tests for EventCoalescer."""
+
+    @pytest.fixture
+    def fired(self):
+        return []
+
+    @pytest.fixture
+    def coalescer(self, fired):
+        coalescer = EventCoalescer(lambda path, event_type: fired.append((path, event_type)), quiet_period=0.1)
+        coalescer.start()
+        yield coalescer
+        coalescer.stop(timeout=1.0)
+
+    def _wait_for(self, fired, count, timeout=2.0):
+        deadline = time.time() + timeout
+        while len(fired) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_merge_event_types(self):
+        assert merge_event_types("created", "modified") == "created"
+        assert merge_event_types("modified", "moved") == "moved"
+        assert merge_event_types("modified", "modified") == "modified"
+
+    def test_burst_fires_once_after_quiet_period(self, coalescer, fired, tmp_path):
+        f = tmp_path / "a.txt"
+        f.write_text("a")
+        coalescer.add(str(f), "created")
+        for _ in range(3):
+            time.sleep(0.05)
+            coalescer.add(str(f), "modified")
+        assert fired == []
+
+        self._wait_for(fired, 1)
+        time.sleep(0.2)
+        assert fired == [(str(f), "created")]
+        assert coalescer.pending() == 0
+
+    def test_waits_while_file_keeps_growing(self, coalescer, fired, tmp_path):
+        """Test a file still changing without events is held back until it settles."""
+        f = tmp_path / "copy.pdf"
+        f.write_bytes(b"x")
+        coalescer.add(str(f), "created")
+        for i in range(4):
+            time.sleep(0.06)
+            with open(f, "ab") as out:
+                out.write(b"x" * (i + 1))
+        assert fired == []
+
+        self._wait_for(fired, 1)
+        assert fired == [(str(f), "created")]
+
+    def test_discarded_and_vanished_paths_never_fire(self, coalescer, fired, tmp_path):
+        kept = tmp_path / "kept.txt"
+        kept.write_text("k")
+        coalescer.add(str(kept), "created")
+        coalescer.add(str(tmp_path / "gone.txt"), "created")
+        coalescer.add(str(tmp_path / "discarded.txt"), "created")
+        assert coalescer.discard(str(tmp_path / "discarded.txt"))
+
+        self._wait_for(fired, 1)
+        time.sleep(0.2)
+        assert fired == [(str(kept), "created")]
+
+    def test_max_wait_bounds_busy_paths(self, fired, tmp_path):
+        f = tmp_path / "busy.log"
+        f.write_text("x")
+        coalescer = EventCoalescer(lambda *args: fired.append(args), quiet_period=0.05, max_wait=0.0)
+        coalescer.add(str(f), "modified")
+        f.write_text("xy")
+        time.sleep(0.06)
+
+        assert coalescer._pop_ready(time.monotonic()) == [(str(f), "modified")]
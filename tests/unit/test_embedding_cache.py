@@ -0,0 +1,98 @@
+"""
+Unit tests for the embedding cache and batched embedding lookup.
+"""
+
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+
+from mind_q_agent.utils.cache import LRUCache
+from mind_q_agent.vector.embedding_cache import EmbeddingCache
+from mind_q_agent.vector.chroma_vector import ChromaVectorDB
+
+
+class TestLRUCache:
+    """Test suite for LRUCache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.get("c") == 3
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("mind_q_agent.utils.cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(max_size=4, ttl=10)
+        cache.put("a", 1)
+
+        now[0] = 105.0
+        assert cache.get("a") == 1
+        now[0] = 111.0
+        assert cache.get("a") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            LRUCache(max_size=0)
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache."""
+
+    def test_memory_roundtrip(self):
+        cache = EmbeddingCache("model-a")
+        cache.put_many({"machine learning": [0.5, 0.25]})
+
+        assert cache.get_many(["machine learning", "other"]) == {"machine learning": [0.5, 0.25]}
+
+    def test_keys_are_model_scoped(self):
+        assert EmbeddingCache("model-a").key("x") != EmbeddingCache("model-b").key("x")
+
+    def test_persistent_store(self, tmp_path):
+        db_path = str(tmp_path / "embeddings.sqlite3")
+        cache = EmbeddingCache("model-a", db_path=db_path)
+        cache.put_many({"python": [0.5, -1.0]})
+        cache.close()
+
+        reopened = EmbeddingCache("model-a", db_path=db_path)
+        assert reopened.get_many(["python"]) == {"python": [0.5, -1.0]}
+        # A different model never sees another model's vectors
+        assert EmbeddingCache("model-b", db_path=db_path).get_many(["python"]) == {}
+        reopened.close()
+
+
+class TestChromaGetEmbeddings:
+    """Test batched embedding generation on ChromaVectorDB."""
+
+    @pytest.fixture
+    def vector_db(self, tmp_path):
+        model = MagicMock()
+        model.encode.side_effect = lambda texts, **kwargs: np.array([[float(len(t))] * 3 for t in texts])
+        return ChromaVectorDB(str(tmp_path / "chroma"), model=model, client=MagicMock())
+
+    def test_only_misses_are_encoded(self, vector_db):
+        first = vector_db.get_embeddings(["ai", "ml", "ai"])
+        assert first == [[2.0] * 3, [2.0] * 3, [2.0] * 3]
+        vector_db.model.encode.assert_called_once()
+        assert vector_db.model.encode.call_args.args[0] == ["ai", "ml"]
+
+        vector_db.model.encode.reset_mock()
+        second = vector_db.get_embeddings(["ml", "deep"])
+        assert second == [[2.0] * 3, [4.0] * 3]
+        assert vector_db.model.encode.call_args.args[0] == ["deep"]
+
+    def test_get_embedding_uses_cache(self, vector_db):
+        assert vector_db.get_embedding("abc") == [3.0] * 3
+        assert vector_db.get_embedding("abc") == [3.0] * 3
+        vector_db.model.encode.assert_called_once()
+
+    def test_empty_input(self, vector_db):
+        assert vector_db.get_embeddings([]) == []
+        vector_db.model.encode.assert_not_called()
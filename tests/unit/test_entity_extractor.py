@@ -84,3 +84,33 @@ class TestEntityExtractor:
         entities = [e["text"] for e in result["entities"]]
         assert "NY" not in entities
         assert "Al" not in entities
+
+    def test_extract_mentions(self, extractor):
+        """Test mentions carry token offsets for entities and concepts."""
+        text = "Elon Musk founded Tesla. Artificial Intelligence is transforming the world."
+        result = extractor.extract_all(text)
+        
+        mentions = result["mentions"]
+        names = [m["text"] for m in mentions]
+        assert "Tesla" in names
+        assert "artificial intelligence" in names
+        
+        tokens = [m["token"] for m in mentions]
+        assert tokens == sorted(tokens)
+
+    def test_extract_many(self, extractor):
+        """Test batched extraction matches single-document extraction."""
+        texts = ["Elon Musk works at Tesla in Texas.", "", "Contact me at test@example.com."]
+        results = list(extractor.extract_many(texts, batch_size=2))
+        
+        assert len(results) == 3
+        assert results[0] == extractor.extract_all(texts[0])
+        assert results[1]["entities"] == []
+        assert results[2]["emails"] == ["test@example.com"]
+
+    def test_extract_many_ner_only(self, extractor):
+        """Test NER-only extraction skips the parser and concepts."""
+        result = next(extractor.extract_many(["Elon Musk works at Tesla."], ner_only=True))
+        
+        assert "Elon Musk" in [e["text"] for e in result["entities"]]
+        assert result["concepts"] == []
@@ -0,0 +1,79 @@
+"""
+Unit tests for long-document segmentation in EntityExtractor.
+
+Uses a blank spaCy pipeline with an entity ruler so no trained model is needed.
+"""
+
+import pytest
+import spacy
+
+from mind_q_agent.extraction.entity_extractor import EntityExtractor
+from mind_q_agent.ingestion.cooccurrence import count_cooccurrences
+
+
+class TestEntitySegmentation:
+    """Test suite for segmented extraction."""
+
+    @pytest.fixture(scope="class")
+    def nlp(self):
+        nlp = spacy.blank("en")
+        ruler = nlp.add_pipe("entity_ruler")
+        ruler.add_patterns([
+            {"label": "ORG", "pattern": "Tesla"},
+            {"label": "PERSON", "pattern": [{"LOWER": "elon"}, {"LOWER": "musk"}]},
+        ])
+        return nlp
+
+    def _extractor(self, nlp, segment_size):
+        return EntityExtractor(segment_size=segment_size, nlp=nlp)
+
+    def test_segment_prefers_paragraph_boundaries(self, nlp):
+        extractor = self._extractor(nlp, segment_size=40)
+        text = "First paragraph is here.\n\nSecond paragraph follows it.\n\nThird one."
+
+        segments = extractor._segment(text)
+
+        assert all(len(seg) <= 40 for _, seg in segments)
+        assert "".join(seg for _, seg in segments) == text
+        assert segments[0][1].endswith("\n\n")
+        for start, seg in segments:
+            assert text[start:start + len(seg)] == seg
+
+    def test_segment_without_boundaries(self, nlp):
+        extractor = self._extractor(nlp, segment_size=10)
+        segments = extractor._segment("x" * 25)
+        assert [len(seg) for _, seg in segments] == [10, 10, 5]
+
+    def test_segmented_offsets_are_global(self, nlp):
+        text = "Tesla builds cars.\n\n" + "filler words here. " * 20 + "\n\nElon Musk runs Tesla."
+        segmented = self._extractor(nlp, segment_size=60).extract_all(text)
+        whole = self._extractor(nlp, segment_size=100000).extract_all(text)
+
+        assert segmented["mentions"] == whole["mentions"]
+        assert segmented["entities"] == whole["entities"]
+        for mention in segmented["mentions"]:
+            assert text[mention["char"]:].startswith(mention["text"])
+
+    def test_segmented_cooccurrence_matches_whole(self, nlp):
+        text = ("Elon Musk met Tesla engineers.\n\n" + "word " * 30) * 5
+        segmented = self._extractor(nlp, segment_size=50).extract_all(text)
+        whole = self._extractor(nlp, segment_size=100000).extract_all(text)
+
+        assert count_cooccurrences(segmented["mentions"], 10) == count_cooccurrences(whole["mentions"], 10)
+
+    def test_extract_many_keeps_documents_apart(self, nlp):
+        extractor = self._extractor(nlp, segment_size=30)
+        texts = ["Tesla " * 20, "", "Elon Musk " * 10]
+
+        results = list(extractor.extract_many(texts, batch_size=4))
+
+        assert len(results) == 3
+        assert {e["text"] for e in results[0]["entities"]} == {"Tesla"}
+        assert len(results[0]["mentions"]) == 20
+        assert results[1]["mentions"] == []
+        assert {e["text"] for e in results[2]["entities"]} == {"Elon Musk"}
+        assert [m["token"] for m in results[2]["mentions"]] == list(range(0, 20, 2))
+
+    def test_invalid_segment_size(self, nlp):
+        with pytest.raises(ValueError):
+            EntityExtractor(segment_size=0, nlp=nlp)
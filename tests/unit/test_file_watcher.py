@@ -2,13 +2,18 @@
 Unit tests for File Watcher module.
 """
 
+import os
 import threading
 import time
 from queue import Queue
 from pathlib import Path
 
+from unittest.mock import MagicMock, patch
+
 import pytest
 from mind_q_agent.watcher.file_watcher import FileWatcher
+from mind_q_agent.ingestion.manifest import FileManifest
+from mind_q_agent.ingestion.pool import extract_document
 
 
 class TestFileWatcher:
@@ -41,8 +46,11 @@ class TestFileWatcher:
         
         assert result is not None
         assert result['filename'] == "test.txt"
-        assert result['text'] == content
+        assert result['filepath'] == str(test_file)
+        assert result['size_bytes'] == len(content)
         assert result['file_type'] == ".txt"
+        # Only the path is queued; text is extracted by the ingestion pool
+        assert 'text' not in result
         assert not queue.empty()
 
     def test_ignore_unsupported(self, watcher_setup):
@@ -57,21 +65,55 @@ class TestFileWatcher:
         assert result is None
         assert queue.empty()
         
-    def test_debouncing(self, watcher_setup):
-        """Test that rapid events are debounced."""
-        watcher, queue, path = watcher_setup
-        watcher.debounce_window = 1.0
-        
-        test_file = path / "debounce.md"
-        test_file.write_text("# Test", encoding='utf-8')
-        
-        # First process: Should succeed
-        res1 = watcher.process_file(str(test_file), "modified")
-        assert res1 is not None
-        
-        # Second process immediately: Should be skipped
-        res2 = watcher.process_file(str(test_file), "modified")
-        assert res2 is None
+    def test_debouncing(self, tmp_path):
+        """Test that a burst of events is queued once, after it settles (trailing edge)."""
+        queue = Queue()
+        watcher = FileWatcher(str(tmp_path), queue, debounce_window=0.2)
+        watcher._coalescer.start()
+        try:
+            test_file = tmp_path / "debounce.md"
+            for i in range(5):
+                test_file.write_text(f"# Version {i}", encoding='utf-8')
+                watcher.schedule(str(test_file), "created" if i == 0 else "modified")
+                time.sleep(0.05)
+            
+            # Nothing is queued while events keep arriving
+            assert queue.empty()
+            event = queue.get(timeout=2.0)
+            assert event['event_type'] == "created"
+            assert event['size_bytes'] == len("# Version 4")
+            time.sleep(0.3)
+            assert queue.empty()
+            assert watcher._coalescer.pending() == 0
+        finally:
+            watcher._coalescer.stop()
+    
+    def test_moved_and_deleted(self, tmp_path):
+        """Test renames and deletes update the manifest and are queued for the stores."""
+        manifest = FileManifest()
+        queue = Queue()
+        watcher = FileWatcher(str(tmp_path), queue, manifest=manifest)
+        manifest.record(str(tmp_path / "old.txt"), 1, 1.0, "raw", "doc")
+        
+        watcher.schedule(str(tmp_path / "old.txt"))
+        watcher.handle_moved(str(tmp_path / "old.txt"), str(tmp_path / "new.txt"))
+        assert manifest.get(str(tmp_path / "old.txt")) is None
+        assert manifest.get(str(tmp_path / "new.txt")).doc_hash == "doc"
+        assert watcher._coalescer.pending() == 1
+        renamed = queue.get_nowait()
+        assert renamed["event_type"] == "renamed"
+        assert renamed["src_path"] == str(tmp_path / "old.txt")
+        assert renamed["filepath"] == str(tmp_path / "new.txt")
+        
+        watcher.handle_deleted(str(tmp_path / "new.txt"))
+        assert manifest.get(str(tmp_path / "new.txt")) is None
+        assert watcher._coalescer.pending() == 0
+        deleted = queue.get_nowait()
+        assert deleted == {"filepath": str(tmp_path / "new.txt"), "filename": "new.txt", "event_type": "deleted"}
+        
+        # Unsupported files are not queued
+        watcher.handle_deleted(str(tmp_path / "image.png"))
+        assert queue.empty()
         
     def test_file_hash_consistency(self, watcher_setup):
         """Test that same content produces same hash."""
@@ -88,9 +130,74 @@ class TestFileWatcher:
         res1 = watcher.process_file(str(file1))
         res2 = watcher.process_file(str(file2))
         
-        assert res1['file_hash'] == res2['file_hash']
+        # Hashing happens at extraction time, on the text
+        with patch("mind_q_agent.ingestion.pool._extractor", MagicMock()):
+            doc1 = extract_document(res1['filepath'])
+            doc2 = extract_document(res2['filepath'])
+        
+        assert doc1.file_hash == doc2.file_hash
         assert res1['filepath'] != res2['filepath']
 
+    def test_manifest_skips_known_files(self, tmp_path):
+        """Test unchanged files are skipped and byte-identical ones linked, before extraction."""
+        manifest = FileManifest()
+        watcher = FileWatcher(str(tmp_path), Queue(), debounce_window=0, manifest=manifest)
+        original = tmp_path / "original.pdf"
+        original.write_bytes(b"same bytes")
+        
+        event = watcher.process_file(str(original))
+        assert event["raw_hash"] == FileManifest.hash_file(original)
+        
+        # The pool records the file once it is ingested
+        stat = original.stat()
+        manifest.record(str(original), stat.st_size, stat.st_mtime, event["raw_hash"], "doc-hash")
+        
+        # Same size and mtime: skipped without hashing
+        with patch.object(FileManifest, "hash_file") as hash_file:
+            assert watcher.process_file(str(original), "modified") is None
+            hash_file.assert_not_called()
+        
+        # Touched but unchanged: skipped, with the new stat data remembered
+        os.utime(original, (stat.st_atime, stat.st_mtime + 10))
+        assert watcher.process_file(str(original), "modified") is None
+        assert manifest.get(str(original)).mtime == stat.st_mtime + 10
+        
+        # Byte-identical copy: queued as a link to the stored document, not extracted;
+        # the pool records it once the link is written
+        copy = tmp_path / "copy.pdf"
+        copy.write_bytes(b"same bytes")
+        linked = watcher.process_file(str(copy))
+        assert linked["event_type"] == "linked"
+        assert linked["doc_hash"] == "doc-hash"
+        assert manifest.get(str(copy)) is None
+        
+        # Changed content is queued again
+        original.write_bytes(b"new bytes!")
+        assert watcher.process_file(str(original), "modified") is not None
+
+    def test_backpressure_on_full_queue(self, tmp_path):
+        """Test the watcher blocks on a full queue and gives up when stopped."""
+        queue = Queue(maxsize=1)
+        watcher = FileWatcher(str(tmp_path), queue, debounce_window=0)
+        watcher.PUT_POLL_INTERVAL = 0.05
+        for name in ["a.txt", "b.txt"]:
+            (tmp_path / name).write_text(name)
+        
+        assert watcher.process_file(str(tmp_path / "a.txt")) is not None
+        
+        results = []
+        blocked = threading.Thread(
+            target=lambda: results.append(watcher.process_file(str(tmp_path / "b.txt")))
+        )
+        blocked.start()
+        time.sleep(0.2)
+        assert blocked.is_alive()  # waiting for space
+        
+        queue.get()
+        blocked.join(timeout=1.0)
+        assert not blocked.is_alive()
+        assert results[0]['filename'] == "b.txt"
+
     def test_integration_threading(self, watcher_setup):
         """Integration test with actual background thread."""
         watcher, queue, path = watcher_setup
@@ -1,10 +1,13 @@
+import asyncio
 import logging
 import pytest
-from unittest.mock import MagicMock, ANY
+from unittest.mock import MagicMock, ANY, patch
 from pathlib import Path
+from mind_q_agent.ingestion.manifest import FileManifest
 from mind_q_agent.ingestion.pipeline import IngestionPipeline
 from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
 from mind_q_agent.vector.chroma_vector import ChromaVectorDB
+from mind_q_agent.search.lexical import LexicalIndex
 
 from mind_q_agent.extraction.entity_extractor import EntityExtractor
 
@@ -13,11 +16,19 @@ class TestIngestionPipeline:
     
     @pytest.fixture
     def mock_graph_db(self):
-        return MagicMock(spec=KuzuGraphDB)
+        graph = MagicMock(spec=KuzuGraphDB)
+        graph.get_concept_names.return_value = set()
+        graph.existing_concepts.return_value = set()
+        graph.get_documents_by_path.return_value = []
+        graph.get_document_paths.return_value = []
+        return graph
 
     @pytest.fixture
     def mock_vector_store(self):
-        return MagicMock(spec=ChromaVectorDB)
+        store = MagicMock(spec=ChromaVectorDB)
+        store.max_seq_length = 256
+        store.count_tokens.side_effect = lambda text: len(text.split())
+        return store
 
     @pytest.fixture
     def mock_extractor(self):
@@ -29,7 +40,8 @@ class TestIngestionPipeline:
         # But the __init__ creates it: self.extractor = EntityExtractor()
         # So we should patch the class instantiation or set the attribute after init.
         # Let's use patch in the context of the test, or just set the attribute.
-        pipe = IngestionPipeline(mock_graph_db, mock_vector_store)
+        with patch("mind_q_agent.ingestion.pipeline.EntityExtractor"):
+            pipe = IngestionPipeline(mock_graph_db, mock_vector_store)
         pipe.extractor = mock_extractor
         return pipe
 
@@ -48,7 +60,7 @@ class TestIngestionPipeline:
         path = Path("/tmp/test.txt")
         text = "Duplicate content"
         
-        result = pipeline.process_document(path, text)
+        result = asyncio.run(pipeline.process_document(path, text))
         
         assert result is False
         mock_graph_db.execute.assert_called_once() # Checked existence
@@ -62,7 +74,7 @@ class TestIngestionPipeline:
         mock_graph_db.execute.return_value = mock_result
         
         # 2. Setup Vector Store embedding return
-        mock_vector_store.get_embedding.return_value = [0.1] * 384
+        mock_vector_store.get_embeddings.side_effect = lambda texts: [[0.1] * 384 for _ in texts]
         
         # 3. Setup Extractor return
         mock_extractor.extract_all.return_value = {
@@ -75,7 +87,7 @@ class TestIngestionPipeline:
         path = Path("/tmp/new_doc.txt")
         text = "Musk likes space."
         
-        result = pipeline.process_document(path, text)
+        result = asyncio.run(pipeline.process_document(path, text))
         
         assert result is True
         
@@ -83,51 +95,275 @@ class TestIngestionPipeline:
         args, _ = mock_graph_db.execute.call_args_list[0]
         assert "MATCH (d:Document" in args[0]
         
-        # Verify Vector Storage
+        # Verify Vector Storage (chunked, ids are hash:n)
         mock_vector_store.add_documents.assert_called_once()
+        kwargs = mock_vector_store.add_documents.call_args.kwargs
+        assert kwargs["documents"] == [text]
+        assert kwargs["ids"][0].endswith(":0")
+        assert kwargs["metadatas"][0]["start_char"] == 0
+        assert kwargs["metadatas"][0]["end_char"] == len(text)
         
         # Verify Graph Storage
         # Expected: Document + Concept(space, General) + Concept(Musk, PERSON)
+        # written in bulk inside a single transaction
+        mock_graph_db.transaction.assert_called_once()
+        rows = mock_graph_db.upsert_concepts.call_args.args[0]
+        assert {(r["name"], r["category"]) for r in rows} == {("space", "General"), ("Musk", "PERSON")}
+        mock_graph_db.link_document.assert_called_once_with(ANY, ["space", "Musk"])
+        # Concept embeddings are requested in one batch
+        mock_vector_store.get_embeddings.assert_called_once_with(["space", "Musk"])
         
+    def test_chunks_record_pages(self, pipeline, mock_vector_store):
+        """Test chunks of page-broken (PDF) text carry their page range."""
+        pipeline.chunker.chunk_size = 40
+        pipeline.chunker.overlap = 0
+        text = "\f".join(["first page words here", "second page text", "third page text"])
+        
+        pipeline._store_chunks(Path("/tmp/doc.pdf"), "hash", text)
+        
+        metadatas = mock_vector_store.add_documents.call_args.kwargs["metadatas"]
+        assert metadatas[0]["page_start"] == 1
+        assert metadatas[-1]["page_end"] == 3
+        assert all(m["page_start"] <= m["page_end"] for m in metadatas)
+        
+        pipeline._store_chunks(Path("/tmp/doc.txt"), "hash", "no pages")
+        assert "page_start" not in mock_vector_store.add_documents.call_args.kwargs["metadatas"][0]
+
     def test_cooccurrence_edges(self, pipeline, mock_graph_db, mock_vector_store, mock_extractor):
         """Test creation of RELATED_TO edges between co-occurring concepts."""
         # Setup clean path through process_document
         mock_graph_db.execute.return_value.empty = True # New doc
-        mock_vector_store.get_embedding.return_value = [0.0] * 384
+        mock_vector_store.get_embeddings.side_effect = lambda texts: [[0.0] * 384 for _ in texts]
+        pipeline.cooccurrence_window = 5
         
         # Setup Extractor to return multiple items
         mock_extractor.extract_all.return_value = {
             "entities": [{"text": "Alice", "label": "PERSON"}, {"text": "Tesla", "label": "ORG"}],
             "dates": [],
             "emails": [],
-            "concepts": ["Innovation"]
+            "concepts": ["Innovation"],
+            "mentions": [
+                {"text": "Alice", "token": 0},
+                {"text": "Tesla", "token": 3},
+                {"text": "Innovation", "token": 50},
+                {"text": "Tesla", "token": 52},
+            ]
+        }
+        
+        asyncio.run(pipeline.process_document(Path("/tmp/test.txt"), "Alice works at Tesla on Innovation."))
+        
+        # Only mentions within the window co-occur:
+        # (Alice, Tesla) and (Innovation, Tesla); Alice is too far from Innovation.
+        # Written as a single bulk call with per-pair counts.
+        mock_graph_db.upsert_cooccurrence_edges.assert_called_once_with({
+            ("Alice", "Tesla"): 1,
+            ("Innovation", "Tesla"): 1,
+        })
+        
+        # No per-pair round trips
+        query_strings = [call.args[0] for call in mock_graph_db.execute.call_args_list]
+        assert not [q for q in query_strings if "RELATED_TO" in q]
+
+    def test_graph_failure_propagates(self, pipeline, mock_graph_db, mock_vector_store, mock_extractor):
+        """Test that a failing bulk write aborts the document."""
+        mock_graph_db.execute.return_value.empty = True
+        mock_vector_store.get_embeddings.side_effect = lambda texts: [[0.0] * 384 for _ in texts]
+        mock_extractor.extract_all.return_value = {
+            "entities": [], "dates": [], "emails": [], "concepts": ["a", "b"]
+        }
+        mock_graph_db.upsert_concepts.side_effect = RuntimeError("write failed")
+        
+        with pytest.raises(RuntimeError):
+            asyncio.run(pipeline.process_document(Path("/tmp/fail.txt"), "a b"))
+        
+        mock_graph_db.upsert_cooccurrence_edges.assert_not_called()
+        # The chunks already written are discarded with the rolled-back graph write
+        mock_vector_store.add_documents.assert_called_once()
+        mock_vector_store.delete_document.assert_called_once_with(pipeline._calculate_hash("a b"))
+
+    def test_existing_concepts_not_reembedded(self, pipeline, mock_graph_db, mock_vector_store, mock_extractor):
+        """Test that existing concepts are counted, not embedded or re-created."""
+        mock_graph_db.execute.return_value.empty = True
+        mock_graph_db.existing_concepts.return_value = {"space"}
+        mock_vector_store.get_embeddings.side_effect = lambda texts: [[0.0] * 384 for _ in texts]
+        mock_extractor.extract_all.return_value = {
+            "entities": [{"text": "Musk", "label": "PERSON"}], "dates": [], "emails": [], "concepts": ["space"]
+        }
+        
+        asyncio.run(pipeline.process_document(Path("/tmp/doc.txt"), "Musk likes space."))
+        
+        mock_graph_db.existing_concepts.assert_called_once_with(["space", "Musk"])
+        mock_vector_store.get_embeddings.assert_called_once_with(["Musk"])
+        rows = mock_graph_db.upsert_concepts.call_args.args[0]
+        assert [r["name"] for r in rows] == ["Musk"]
+        mock_graph_db.increment_concept_frequency.assert_called_once_with(["space"], 1)
+        mock_graph_db.link_document.assert_called_once_with(ANY, ["space", "Musk"])
+
+    def test_known_concepts_skip_probe(self, mock_graph_db, mock_vector_store, mock_extractor):
+        """Test that concepts loaded at startup are never probed or embedded again."""
+        mock_graph_db.get_concept_names.return_value = {"space", "Musk"}
+        with patch("mind_q_agent.ingestion.pipeline.EntityExtractor"):
+            pipe = IngestionPipeline(mock_graph_db, mock_vector_store)
+        pipe.extractor = mock_extractor
+        mock_graph_db.execute.return_value.empty = True
+        mock_extractor.extract_all.return_value = {
+            "entities": [{"text": "Musk", "label": "PERSON"}], "dates": [], "emails": [], "concepts": ["space"]
+        }
+        
+        asyncio.run(pipe.process_document(Path("/tmp/doc.txt"), "Musk likes space."))
+        
+        mock_graph_db.existing_concepts.assert_not_called()
+        mock_vector_store.get_embeddings.assert_not_called()
+        mock_graph_db.increment_concept_frequency.assert_called_once_with(["space", "Musk"], 1)
+
+    def test_process_batch(self, pipeline, mock_graph_db, mock_vector_store, mock_extractor):
+        """Test batch ingestion drops duplicates before extraction and isolates failures."""
+        mock_graph_db.execute.return_value.empty = True
+        mock_vector_store.get_embeddings.side_effect = lambda texts: [[0.0] * 384 for _ in texts]
+        empty = {"entities": [], "dates": [], "emails": [], "concepts": [], "mentions": []}
+        mock_extractor.extract_many.side_effect = lambda texts, **kwargs: (dict(empty) for _ in texts)
+        mock_vector_store.add_documents.side_effect = [RuntimeError("store failed"), None]
+        
+        processed = asyncio.run(pipeline.process_batch([
+            (Path("/tmp/a.txt"), "alpha"),
+            (Path("/tmp/b.txt"), "beta"),
+            (Path("/tmp/a_copy.txt"), "alpha"),
+            (Path("/tmp/blank.txt"), "   "),
+        ]))
+        
+        # "alpha" fails to store, "beta" succeeds; the copy and blank are never extracted
+        assert processed == 1
+        assert mock_vector_store.add_documents.call_count == 2
+        mock_extractor.extract_all.assert_not_called()
+        assert mock_extractor.extract_many.call_args.kwargs["batch_size"] == pipeline.nlp_batch_size
+
+    def test_process_batch_reports_progress_and_embeds_once(self, pipeline, mock_graph_db, mock_vector_store, mock_extractor):
+        """Test every batch document is reported and new concepts are embedded across documents."""
+        mock_graph_db.execute.return_value.empty = True
+        mock_vector_store.get_embeddings.side_effect = lambda texts: [[0.0] * 384 for _ in texts]
+        mock_extractor.extract_many.side_effect = lambda texts, **kwargs: (
+            {"entities": [], "dates": [], "emails": [], "concepts": [text], "mentions": []} for text in texts
+        )
+        reported = []
+        
+        async def progress(path, status, error):
+            reported.append((path.name, status))
+        
+        asyncio.run(pipeline.process_batch([
+            (Path("/tmp/a.txt"), "alpha"),
+            (Path("/tmp/b.txt"), "beta"),
+            (Path("/tmp/a_copy.txt"), "alpha"),
+        ], progress=progress))
+        
+        assert sorted(reported) == [("a.txt", "completed"), ("a_copy.txt", "duplicate"), ("b.txt", "completed")]
+        # The first call embeds the concepts of the whole window
+        assert mock_vector_store.get_embeddings.call_args_list[0].args[0] == ["alpha", "beta"]
+
+    def test_modified_document_applies_delta(self, pipeline, mock_graph_db, mock_vector_store, mock_extractor):
+        """Test a new version of a path reuses embeddings and adjusts the graph by the difference."""
+        mock_graph_db.execute.return_value.empty = True
+        mock_graph_db.existing_concepts.return_value = {"Alice", "Tesla"}
+        mock_graph_db.get_documents_by_path.return_value = [
+            {"hash": "old", "cooccurrence": '[["Alice", "Tesla", 2], ["Alice", "Old", 1]]'}
+        ]
+        mock_graph_db.get_document_concepts.return_value = ["Alice", "Tesla", "Old"]
+        mock_graph_db.delete_orphan_concepts.return_value = {"Old"}
+        mock_vector_store.get_document_chunks.return_value = {"Alice works at Tesla.": [0.5] * 384}
+        pipeline.cooccurrence_window = 5
+        mock_extractor.extract_all.return_value = {
+            "entities": [{"text": "Alice", "label": "PERSON"}, {"text": "Tesla", "label": "ORG"}],
+            "dates": [], "emails": [], "concepts": [],
+            "mentions": [{"text": "Alice", "token": 0}, {"text": "Tesla", "token": 3}]
         }
         
-        pipeline.process_document(Path("/tmp/test.txt"), "Alice works at Tesla on Innovation.")
+        assert asyncio.run(pipeline.process_document(Path("/tmp/doc.txt"), "Alice works at Tesla.")) is True
         
-        # We expect edges between:
-        # (Alice, Tesla), (Alice, Innovation), (Innovation, Tesla)
-        # Total 3 pairs (unique).
+        # The unchanged chunk keeps its embedding
+        assert mock_vector_store.add_documents.call_args.kwargs["embeddings"] == [[0.5] * 384]
+        # Only the dropped concept and the shrunk pair counts change
+        mock_graph_db.increment_concept_frequency.assert_called_once_with(["Old"], -1)
+        mock_graph_db.upsert_cooccurrence_edges.assert_not_called()
+        mock_graph_db.weaken_cooccurrence_edges.assert_called_once_with({
+            ("Alice", "Tesla"): 1, ("Alice", "Old"): 1
+        })
+        mock_graph_db.delete_document.assert_called_once_with("old")
+        mock_graph_db.delete_orphan_concepts.assert_called_once_with(["Old"])
+        mock_vector_store.delete_document.assert_called_once_with("old")
+        assert "Old" not in pipeline._known_concepts
+
+    def test_remove_and_move_document(self, pipeline, mock_graph_db, mock_vector_store):
+        """Test deleted files leave both stores and renamed files are re-keyed."""
+        mock_graph_db.get_documents_by_path.return_value = []
+        assert asyncio.run(pipeline.remove_document(Path("/tmp/unknown.txt"))) is False
+        
+        mock_graph_db.get_documents_by_path.return_value = [{"hash": "h1", "cooccurrence": '[["A", "B", 1]]'}]
+        mock_graph_db.get_document_concepts.return_value = ["A", "B"]
+        assert asyncio.run(pipeline.remove_document(Path("/tmp/a.txt"))) is True
+        mock_graph_db.increment_concept_frequency.assert_called_once_with(["A", "B"], -1)
+        mock_graph_db.weaken_cooccurrence_edges.assert_called_once_with({("A", "B"): 1})
+        mock_graph_db.delete_document.assert_called_once_with("h1")
+        mock_vector_store.delete_document.assert_called_once_with("h1")
         
-        # Get all execute calls
-        execute_calls = mock_graph_db.execute.call_args_list
-        query_strings = [call.args[0] for call in execute_calls]
+        mock_graph_db.get_documents_by_path.side_effect = lambda path: (
+            [{"hash": "h1", "cooccurrence": "[]", "source": "/tmp/a.txt"}] if path == "/tmp/a.txt" else []
+        )
+        assert asyncio.run(pipeline.move_document(Path("/tmp/a.txt"), Path("/tmp/b.txt"))) is True
+        mock_graph_db.move_document.assert_called_once_with("h1", "/tmp/b.txt", "b.txt")
+        mock_vector_store.update_document_source.assert_called_once_with("h1", "/tmp/b.txt", "b.txt")
+
+    def test_shared_content_outlives_one_path(self, pipeline, mock_graph_db, mock_vector_store):
+        """Test a document held by two paths survives either one being deleted, not both."""
+        h1 = pipeline._calculate_hash("same text")
+        manifest = FileManifest()
+        manifest.record("/docs/a.txt", 1, 1.0, "raw", h1)
+        manifest.record("/docs/b.txt", 1, 1.0, "raw", h1)
+        pipeline.manifest = manifest
+        paths = {"/docs/a.txt": h1}
+        mock_graph_db.get_document_paths.side_effect = lambda doc_hash: sorted(
+            path for path, linked in paths.items() if linked == doc_hash
+        )
+        mock_graph_db.add_document_path.side_effect = lambda doc_hash, path: paths.__setitem__(path, doc_hash)
+        mock_graph_db.remove_document_path.side_effect = lambda path: paths.pop(path, None)
+        mock_graph_db.get_documents_by_path.side_effect = lambda path: (
+            [{"hash": h1, "cooccurrence": "[]", "source": "/docs/a.txt"}] if path in paths else []
+        )
+        mock_graph_db.get_document_concepts.return_value = []
         
-        # Filter for RELATED_TO queries
-        edge_queries = [q for q in query_strings if "RELATED_TO" in q]
+        # Byte-identical copy: linked to the stored document, nothing extracted
+        mock_graph_db.execute.return_value.empty = False
+        assert asyncio.run(pipeline.process_document(Path("/docs/b.txt"), "same text")) is False
+        assert paths == {"/docs/a.txt": h1, "/docs/b.txt": h1}
         
-        assert len(edge_queries) == 3
+        # The original goes away: the copy keeps the document, which now shows the copy's path
+        assert asyncio.run(pipeline.remove_document(Path("/docs/a.txt"))) is True
+        mock_graph_db.delete_document.assert_not_called()
+        mock_vector_store.delete_document.assert_not_called()
+        mock_graph_db.move_document.assert_called_once_with(h1, "/docs/b.txt", "b.txt")
+        mock_vector_store.update_document_source.assert_called_once_with(h1, "/docs/b.txt", "b.txt")
+        
+        # The last path goes away: the document is deleted and every manifest entry for it forgotten
+        assert asyncio.run(pipeline.remove_document(Path("/docs/b.txt"))) is True
+        mock_graph_db.delete_document.assert_called_once_with(h1)
+        mock_vector_store.delete_document.assert_called_once_with(h1)
+        assert len(manifest) == 0
+
+    def test_lexical_index_follows_chunks(self, mock_graph_db, mock_vector_store):
+        """Test the lexical index receives, moves and drops the same chunks as the vector store."""
+        lexical = LexicalIndex()
+        with patch("mind_q_agent.ingestion.pipeline.EntityExtractor"):
+            pipe = IngestionPipeline(mock_graph_db, mock_vector_store, lexical_index=lexical)
         
-        # Check specific combinations were attempted (order sorted alphabetically in implementation)
-        # Concepts: Alice, Innovation, Tesla
-        # Pairs: (Alice, Innovation), (Alice, Tesla), (Innovation, Tesla)
+        pipe._store_chunks(Path("/tmp/a.txt"), "h1", "Chunked text mentioning ERR_TIMEOUT.")
+        ids = mock_vector_store.add_documents.call_args.kwargs["ids"]
+        assert [r["id"] for r in lexical.search("err_timeout")] == ids
         
-        # Verify one call args for correctness
-        found_alice_tesla = False
-        for call in execute_calls:
-            params = call.args[1] if len(call.args) > 1 else {}
-            if params.get('c1') == 'Alice' and params.get('c2') == 'Tesla':
-                found_alice_tesla = True
-                break
+        mock_graph_db.get_documents_by_path.side_effect = lambda path: (
+            [{"hash": "h1", "cooccurrence": "[]", "source": "/tmp/a.txt"}] if path == "/tmp/a.txt" else []
+        )
+        asyncio.run(pipe.move_document(Path("/tmp/a.txt"), Path("/tmp/b.txt")))
+        assert lexical.search("err_timeout")[0]["metadata"]["source"] == "/tmp/b.txt"
         
-        assert found_alice_tesla, "Edge between Alice and Tesla not found"
+        mock_graph_db.get_documents_by_path.side_effect = lambda path: [{"hash": "h1", "cooccurrence": "[]"}]
+        mock_graph_db.get_document_concepts.return_value = []
+        asyncio.run(pipe.remove_document(Path("/tmp/b.txt")))
+        assert len(lexical) == 0
@@ -0,0 +1,200 @@
+"""
+Unit tests for the parallel ingestion pool.
+"""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from mind_q_agent.ingestion import pool as pool_module
+from mind_q_agent.ingestion.manifest import FileManifest
+from mind_q_agent.ingestion.pool import IngestionPool, IngestionStats, extract_document
+from mind_q_agent.ingestion.pipeline import IngestionPipeline
+
+
+class TestIngestionPool:
+    """Unit tests for IngestionPool."""
+
+    @pytest.fixture
+    def extractor(self):
+        extractor = MagicMock()
+        extractor.extract_all.side_effect = lambda text: {"concepts": [text.split()[0]]}
+        with patch.object(pool_module, "_extractor", extractor):
+            yield extractor
+
+    @pytest.fixture
+    def pipeline(self):
+        pipeline = MagicMock(spec=IngestionPipeline)
+        pipeline.process_document.return_value = True
+        return pipeline
+
+    @pytest.fixture
+    def pool(self, pipeline, extractor):
+        # Threads instead of processes so the patched extractor is visible
+        pool = IngestionPool(pipeline, workers=2, queue_size=4, executor=ThreadPoolExecutor(2))
+        pool.start()
+        return pool
+
+    def _event(self, path):
+        return {"filepath": str(path), "filename": path.name}
+
+    def test_extract_document(self, tmp_path, extractor):
+        """Test the extraction stage reads, hashes and extracts a file."""
+        f = tmp_path / "doc.txt"
+        f.write_text("alpha beta")
+
+        document = extract_document(str(f))
+
+        assert document.text == "alpha beta"
+        assert document.extracted_data == {"concepts": ["alpha"]}
+        assert len(document.file_hash) == 64
+
+        empty = tmp_path / "empty.txt"
+        empty.write_text("   ")
+        assert extract_document(str(empty)) is None
+
+    def test_documents_flow_to_single_writer(self, tmp_path, pool, pipeline):
+        """Test every queued file is extracted and written exactly once."""
+        files = []
+        for i in range(10):
+            f = tmp_path / f"doc{i}.txt"
+            f.write_text(f"word{i} text")
+            files.append(f)
+            pool.queue.put(self._event(f))
+
+        pool.stop(timeout=5.0)
+
+        written = [c.args[0] for c in pipeline.process_document.call_args_list]
+        assert sorted(written) == sorted(files)
+        # Extraction results are handed to the pipeline, not recomputed
+        assert pipeline.process_document.call_args_list[0].args[2] == {"concepts": ["word0"]}
+
+        stats = pool.stats.snapshot()
+        assert stats["queued"] == 10
+        assert stats["extracted"] == 10
+        assert stats["written"] == 10
+        assert stats["failed"] == 0
+
+    def test_failures_are_counted(self, tmp_path, pool, pipeline):
+        """Test writer failures and empty files do not stop the pool."""
+        good = tmp_path / "good.txt"
+        good.write_text("good text")
+        bad = tmp_path / "bad.txt"
+        bad.write_text("bad text")
+        empty = tmp_path / "empty.txt"
+        empty.write_text("")
+        def process_document(path, *args):
+            if path == bad:
+                raise RuntimeError("boom")
+            return True
+        pipeline.process_document.side_effect = process_document
+
+        for f in [bad, empty, good, "not-an-event"]:
+            pool.queue.put(self._event(f) if isinstance(f, Path) else f)
+        pool.stop(timeout=5.0)
+
+        stats = pool.stats.snapshot()
+        assert stats["written"] == 1
+        assert stats["failed"] == 1
+        assert stats["empty"] == 1
+
+    def test_path_events_skip_extraction(self, tmp_path, pool, pipeline):
+        """Test deletes and renames go straight to the writer, after earlier documents."""
+        calls = []
+        pipeline.process_document.side_effect = lambda path, *args: calls.append(("write", path)) or True
+        pipeline.remove_document.side_effect = lambda path: calls.append(("remove", path)) or True
+        pipeline.move_document.side_effect = lambda src, dest: calls.append(("move", src, dest)) or True
+        doc = tmp_path / "doc.txt"
+        doc.write_text("doc text")
+
+        pool.queue.put(self._event(doc))
+        pool.queue.put({"filepath": str(doc), "filename": doc.name, "event_type": "deleted"})
+        pool.queue.put({
+            "filepath": str(tmp_path / "new.txt"), "filename": "new.txt",
+            "src_path": str(tmp_path / "old.txt"), "event_type": "renamed"
+        })
+        pool.stop(timeout=5.0)
+
+        assert calls == [
+            ("write", doc),
+            ("remove", doc),
+            ("move", tmp_path / "old.txt", tmp_path / "new.txt"),
+        ]
+        stats = pool.stats.snapshot()
+        assert stats["queued"] == 1
+        assert stats["changed"] == 2
+
+    def test_written_files_are_recorded(self, tmp_path, pipeline, extractor):
+        """Test the writer records handled files in the manifest, but not failed ones."""
+        manifest = FileManifest()
+        pool = IngestionPool(pipeline, workers=1, executor=ThreadPoolExecutor(1), manifest=manifest)
+        good = tmp_path / "good.txt"
+        good.write_text("good text")
+        bad = tmp_path / "bad.txt"
+        bad.write_text("bad text")
+        def process_document(path, *args):
+            if path == bad:
+                raise RuntimeError("boom")
+            return True
+        pipeline.process_document.side_effect = process_document
+
+        pool.start()
+        for f in [good, bad]:
+            stat = f.stat()
+            pool.queue.put({
+                "filepath": str(f), "filename": f.name, "size_bytes": stat.st_size,
+                "modified_at": stat.st_mtime, "raw_hash": FileManifest.hash_file(f)
+            })
+        pool.stop(timeout=5.0)
+
+        entry = manifest.get(str(good))
+        assert entry.doc_hash == hashlib.sha256(b"good text").hexdigest()
+        assert manifest.is_unchanged(str(good), good.stat().st_size, good.stat().st_mtime)
+        assert manifest.get(str(bad)) is None
+
+    def test_copies_are_linked(self, tmp_path, pipeline, extractor):
+        """Test byte-identical files are linked without extraction, or ingested if their document is gone."""
+        manifest = FileManifest()
+        pool = IngestionPool(pipeline, workers=1, executor=ThreadPoolExecutor(1), manifest=manifest)
+        assert pipeline.manifest is manifest
+        linked = tmp_path / "copy.txt"
+        linked.write_text("shared text")
+        orphan = tmp_path / "orphan.txt"
+        orphan.write_text("orphan text")
+        pipeline.link_document.side_effect = lambda path, doc_hash: path == linked
+
+        pool.start()
+        for f in [linked, orphan]:
+            stat = f.stat()
+            pool.queue.put({
+                "filepath": str(f), "filename": f.name, "size_bytes": stat.st_size,
+                "modified_at": stat.st_mtime, "raw_hash": FileManifest.hash_file(f),
+                "event_type": "linked", "doc_hash": "stored-hash"
+            })
+        pool.stop(timeout=5.0)
+
+        extractor.extract_all.assert_not_called()
+        assert manifest.get(str(linked)).doc_hash == "stored-hash"
+        # The stored document was gone: the file was read and ingested itself
+        pipeline.process_document.assert_called_once_with(orphan, "orphan text", None)
+        assert manifest.get(str(orphan)).doc_hash == hashlib.sha256(b"orphan text").hexdigest()
+
+    def test_queue_is_bounded(self, pipeline):
+        """Test the event queue applies backpressure."""
+        pool = IngestionPool(pipeline, workers=1, queue_size=3, executor=ThreadPoolExecutor(1))
+        assert pool.queue.maxsize == 3
+
+
+class TestIngestionStats:
+    """Unit tests for IngestionStats."""
+
+    def test_snapshot_rates(self):
+        stats = IngestionStats(started_at=0.0)
+        stats.add(extracted=4, written=2)
+        snapshot = stats.snapshot()
+        assert snapshot["extracted"] == 4
+        assert snapshot["written"] == 2
+        assert snapshot["extract_rate"] > 0
@@ -283,6 +283,159 @@ class TestKuzuGraphDB:
         assert concept['name'] == "Persistent"
         graph2.close()
     
+    def test_upsert_concepts_bulk(self, graph_db):
+        """Test bulk concept creation skips existing names."""
+        graph_db.create_concept("Python", [0.1] * 384, "programming_language")
+        
+        graph_db.upsert_concepts([
+            {"name": "Python", "category": "other", "embedding": [0.2] * 384},
+            {"name": "Rust", "category": "programming_language", "embedding": [0.3] * 384},
+            {"name": "Rust", "category": "duplicate", "embedding": [0.3] * 384},
+        ])
+        
+        assert graph_db.get_node_count() == 2
+        assert graph_db.get_concept("Python")['category'] == "programming_language"
+        assert graph_db.get_concept("Rust")['category'] == "programming_language"
+    
+    def test_upsert_concepts_invalid_embedding(self, graph_db):
+        """Test bulk concept creation validates embedding dimension."""
+        with pytest.raises(ValueError, match="must be 384-dimensional"):
+            graph_db.upsert_concepts([{"name": "Bad", "embedding": [0.1] * 10}])
+    
+    def test_existing_concepts_and_frequency(self, graph_db):
+        """Test bulk existence probe and frequency increment."""
+        graph_db.upsert_concepts([
+            {"name": name, "embedding": [0.1] * 384} for name in ["A", "B"]
+        ])
+        
+        assert graph_db.existing_concepts(["A", "C", "B", "A"]) == {"A", "B"}
+        assert graph_db.existing_concepts([]) == set()
+        assert graph_db.get_concept_names() == {"A", "B"}
+        
+        graph_db.increment_concept_frequency(["A", "Missing"])
+        assert graph_db.get_concept("A")['global_frequency'] == 2
+        assert graph_db.get_concept("B")['global_frequency'] == 1
+    
+    def test_link_document_and_cooccurrence_edges(self, graph_db):
+        """Test bulk DISCUSSES and RELATED_TO creation."""
+        graph_db.execute("CREATE (d:Document {hash: 'doc1', title: 'Doc'})")
+        graph_db.upsert_concepts([
+            {"name": name, "embedding": [0.1] * 384} for name in ["A", "B", "C"]
+        ])
+        
+        graph_db.link_document("doc1", ["A", "B", "C", "Missing"])
+        graph_db.upsert_cooccurrence_edges({("B", "A"): 2, ("A", "C"): 1, ("A", "B"): 1})
+        # Linking again is idempotent; edges are strengthened, not duplicated
+        graph_db.link_document("doc1", ["A"])
+        graph_db.upsert_cooccurrence_edges({("A", "B"): 3})
+        
+        discusses = graph_db.execute("MATCH (:Document)-[r:DISCUSSES]->(:Concept) RETURN count(r) AS n")
+        assert discusses.iloc[0]['n'] == 3
+        
+        edges = graph_db.execute("""
+            MATCH (a:Concept)-[r:RELATED_TO]->(b:Concept)
+            RETURN a.name AS src, b.name AS dst, r.sample_size AS n, r.base_weight AS w
+            ORDER BY src, dst
+        """)
+        assert list(zip(edges["src"], edges["dst"])) == [("A", "B"), ("A", "C")]
+        assert list(edges["n"]) == [6, 1]
+        assert list(edges["w"]) == [6.0, 1.0]
+    
+    def test_document_versions_and_deletion(self, graph_db):
+        """Test path lookup, edge weakening, document deletion and orphan cleanup."""
+        graph_db.execute(
+            "CREATE (d:Document {hash: 'v1', title: 'a.txt', source_path: '/docs/a.txt', cooccurrence: '[]'})"
+        )
+        graph_db.upsert_concepts([
+            {"name": name, "embedding": [0.1] * 384} for name in ["A", "B", "C"]
+        ])
+        graph_db.link_document("v1", ["A", "B"])
+        graph_db.upsert_cooccurrence_edges({("A", "B"): 3, ("A", "C"): 1})
+
+        assert graph_db.get_documents_by_path("/docs/a.txt") == [
+            {"hash": "v1", "cooccurrence": "[]", "source": "/docs/a.txt"}
+        ]
+        assert graph_db.get_documents_by_path("/docs/other.txt") == []
+        assert sorted(graph_db.get_document_concepts("v1")) == ["A", "B"]
+
+        graph_db.move_document("v1", "/docs/b.txt", "b.txt")
+        assert graph_db.get_documents_by_path("/docs/a.txt") == []
+        assert graph_db.get_documents_by_path("/docs/b.txt")[0]["hash"] == "v1"
+
+        graph_db.weaken_cooccurrence_edges({("B", "A"): 1, ("A", "C"): 1})
+        edges = graph_db.execute("""
+            MATCH (a:Concept)-[r:RELATED_TO]->(b:Concept)
+            RETURN a.name AS src, b.name AS dst, r.sample_size AS n
+        """)
+        assert list(zip(edges["src"], edges["dst"], edges["n"])) == [("A", "B", 2)]
+
+        graph_db.delete_document("v1")
+        graph_db.increment_concept_frequency(["A", "B"], -1)
+        # B still has no documents, but A is only cleaned up once its frequency reaches zero
+        graph_db.increment_concept_frequency(["A"], 1)
+        assert graph_db.delete_orphan_concepts(["A", "B"]) == {"B"}
+        assert graph_db.get_concept("B") is None
+        assert graph_db.get_concept("A") is not None
+
+    def test_document_paths(self, graph_db):
+        """Test several paths can hold one document and are dropped with it."""
+        graph_db.execute(
+            "CREATE (d:Document {hash: 'v1', title: 'a.txt', source_path: '/docs/a.txt', cooccurrence: '[]'})"
+        )
+        graph_db.add_document_path("v1", "/docs/a.txt")
+        graph_db.add_document_path("v1", "/docs/copy.txt")
+
+        assert graph_db.get_document_paths("v1") == ["/docs/a.txt", "/docs/copy.txt"]
+        assert graph_db.get_documents_by_path("/docs/copy.txt")[0]["source"] == "/docs/a.txt"
+
+        graph_db.remove_document_path("/docs/a.txt")
+        assert graph_db.get_document_paths("v1") == ["/docs/copy.txt"]
+
+        graph_db.delete_document("v1")
+        assert graph_db.get_document_paths("v1") == []
+        assert graph_db.get_documents_by_path("/docs/copy.txt") == []
+
+    def test_graph_expansion_queries(self, graph_db):
+        """Test concept linking, weighted neighbor expansion and document ranking."""
+        graph_db.upsert_concepts([
+            {"name": name, "embedding": [0.1] * 384} for name in ["Python", "asyncio", "GIL", "web"]
+        ])
+        graph_db.upsert_cooccurrence_edges({("Python", "asyncio"): 3, ("GIL", "Python"): 1, ("asyncio", "web"): 1})
+        for doc_hash in ("d1", "d2"):
+            graph_db.execute(f"CREATE (d:Document {{hash: '{doc_hash}', title: '{doc_hash}.md', source_path: '/{doc_hash}.md'}})")
+        graph_db.link_document("d1", ["asyncio", "web"])
+        graph_db.link_document("d2", ["GIL"])
+
+        assert sorted(graph_db.find_concepts(["python", "gil", "unknown"])) == ["GIL", "Python"]
+        assert graph_db.find_concepts([]) == []
+
+        neighbors = graph_db.get_related_concepts(["Python"], limit=5)
+        # Weights are co-occurrence counts, summed over the seeds
+        assert [(n["name"], n["weight"]) for n in neighbors] == [("asyncio", 3.0), ("GIL", 1.0)]
+        assert graph_db.get_related_concepts(["Python", "web"])[0] == {"name": "asyncio", "weight": 4.0}
+        assert graph_db.get_related_concepts(["Python"], limit=1)[0]["name"] == "asyncio"
+
+        docs = graph_db.get_documents_discussing({"asyncio": 1.0, "web": 0.5, "GIL": 0.2})
+        assert [d["hash"] for d in docs] == ["d1", "d2"]
+        assert docs[0]["score"] == pytest.approx(1.5)
+        assert sorted(docs[0]["via"]) == ["asyncio", "web"]
+        assert docs[0]["source"] == "/d1.md"
+        assert graph_db.get_documents_discussing({}) == []
+
+    def test_transaction_rollback(self, graph_db):
+        """Test that a failing transaction leaves no partial writes."""
+        with pytest.raises(RuntimeError):
+            with graph_db.transaction():
+                graph_db.upsert_concepts([{"name": "Temp", "embedding": [0.1] * 384}])
+                raise RuntimeError("boom")
+        
+        assert graph_db.get_concept("Temp") is None
+        
+        with graph_db.transaction():
+            graph_db.upsert_concepts([{"name": "Kept", "embedding": [0.1] * 384}])
+        
+        assert graph_db.get_concept("Kept") is not None
+    
     def test_close_connection(self, graph_db):
         """Test closing the database connection."""
         # Should not raise any exceptions
@@ -0,0 +1,81 @@
+import pytest
+
+from mind_q_agent.search.lexical import LexicalIndex, fts_query
+
+
+class TestLexicalIndex:
+    """Unit tests for the BM25 chunk index."""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        index = LexicalIndex(str(tmp_path / "lexical.sqlite3"))
+        index.add(
+            ["a:0", "a:1", "b:0"],
+            [
+                "The connection failed with ERR_TIMEOUT after retries.",
+                "Retries use exponential backoff.",
+                "Kuzu stores the concept graph on disk.",
+            ],
+            [
+                {"doc_hash": "a", "source": "/docs/a.md", "filename": "a.md"},
+                {"doc_hash": "a", "source": "/docs/a.md", "filename": "a.md"},
+                {"doc_hash": "b", "source": "/docs/b.md", "filename": "b.md"},
+            ]
+        )
+        yield index
+        index.close()
+
+    def test_fts_query(self):
+        """Test queries become quoted OR-ed terms, punctuation dropped."""
+        assert fts_query('err_timeout "AND" kuzu?') == '"err_timeout" OR "and" OR "kuzu"'
+        assert fts_query("  ?! ") is None
+
+    def test_search_ranks_by_bm25(self, index):
+        """Test exact identifiers match and results use the vector store format."""
+        results = index.search("ERR_TIMEOUT", n_results=5)
+        
+        assert [r["id"] for r in results] == ["a:0"]
+        assert results[0]["metadata"]["filename"] == "a.md"
+        assert "ERR_TIMEOUT" in results[0]["document"]
+        
+        results = index.search("retries backoff", n_results=5)
+        assert [r["id"] for r in results] == ["a:1", "a:0"]
+        assert results[0]["distance"] <= results[1]["distance"]
+        assert index.search("?!") == []
+
+    def test_where_filter(self, index):
+        """Test equality filters apply and operator filters are rejected."""
+        assert index.search("retries kuzu", where={"doc_hash": "b"})[0]["id"] == "b:0"
+        assert index.search("retries", where={"doc_hash": "b"}) == []
+        with pytest.raises(ValueError):
+            index.search("retries", where={"$or": [{"doc_hash": "a"}]})
+
+    def test_replace_delete_and_move(self, index):
+        """Test re-adding an id replaces it and deletes/moves are per document."""
+        index.add(["b:0"], ["Rewritten chunk about graphs."], [{"doc_hash": "b", "source": "/docs/b.md"}])
+        assert len(index) == 3
+        assert index.search("kuzu") == []
+        assert index.search("rewritten")[0]["id"] == "b:0"
+        
+        index.update_document_source("a", "/docs/moved.md", "moved.md")
+        assert index.search("backoff")[0]["metadata"]["source"] == "/docs/moved.md"
+        
+        index.delete_document("a")
+        assert len(index) == 1
+        assert index.search("retries") == []
+
+    def test_backfill_and_persistence(self, index, tmp_path):
+        """Test backfilled chunks are searchable and survive reopening."""
+        path = str(tmp_path / "backfill.sqlite3")
+        fresh = LexicalIndex(path)
+        records = [
+            {"id": f"c:{i}", "document": f"chunk number {i}", "metadata": {"doc_hash": "c"}}
+            for i in range(1500)
+        ]
+        assert fresh.backfill(iter(records)) == 1500
+        fresh.close()
+        
+        reopened = LexicalIndex(path)
+        assert len(reopened) == 1500
+        assert reopened.search("1499")[0]["id"] == "c:1499"
+        reopened.close()
@@ -0,0 +1,146 @@
+import asyncio
+import sys
+import time
+import pytest
+from types import ModuleType
+from unittest.mock import MagicMock, patch
+
+from mind_q_agent.llm.config import ModelConfig
+from mind_q_agent.llm.provider import LLMProvider
+from mind_q_agent.llm.registry import LlamaModelHost, ProviderRegistry
+
+
+class FakeProvider(LLMProvider):
+    """Provider holding a registry-owned HTTP client."""
+
+    def __init__(self, config, client):
+        self.config = config
+        self.client = client
+
+    async def generate(self, prompt, system_prompt=None):
+        return f"{self.config.temperature}"
+
+    async def stream(self, prompt, system_prompt=None):
+        yield f"{self.config.temperature}"
+
+    def get_provider_name(self):
+        return self.config.provider
+
+
+class TestProviderRegistry:
+    """Unit tests for the long-lived provider registry."""
+
+    @pytest.fixture
+    def registry(self):
+        registry = ProviderRegistry()
+        create = lambda self, config: FakeProvider(config, self._http_client(config.api_base or "default"))
+        with patch.object(ProviderRegistry, "_create", autospec=True, side_effect=create) as mock_create:
+            registry.mock_create = mock_create
+            yield registry
+        asyncio.run(registry.aclose())
+
+    def test_provider_reused_per_model(self, registry):
+        """Test one provider per (provider, model, base_url), with per-request settings."""
+        cold = registry.get(ModelConfig(provider="ollama", model_name="qwen2.5:3b", temperature=0.1))
+        warm = registry.get(ModelConfig(provider="ollama", model_name="qwen2.5:3b", temperature=0.9))
+        other = registry.get(ModelConfig(provider="ollama", model_name="llama3"))
+        remote = registry.get(ModelConfig(provider="ollama", model_name="llama3", api_base="http://gpu:11434"))
+
+        assert registry.mock_create.call_count == 3
+        assert cold.client is warm.client is other.client
+        assert remote.client is not other.client
+        assert (cold.config.temperature, warm.config.temperature) == (0.1, 0.9)
+        assert asyncio.run(cold.generate("hi")) == "0.1"
+
+        stats = registry.stats()
+        assert stats["connection_pools"] == 2
+        assert "ollama:qwen2.5:3b" in stats["providers"]
+
+    def test_aclose_releases_pools(self, registry):
+        """Test aclose closes shared clients and forgets cached providers."""
+        provider = registry.get(ModelConfig(provider="ollama", model_name="qwen2.5:3b"))
+
+        asyncio.run(registry.aclose())
+
+        assert provider.client.is_closed
+        assert registry.stats()["providers"] == []
+        registry.get(ModelConfig(provider="ollama", model_name="qwen2.5:3b"))
+        assert registry.mock_create.call_count == 2
+
+    def test_cache_bounded_and_llamacpp_shared(self, registry):
+        """Test the least recently used provider is evicted and llama.cpp ignores the model name."""
+        registry._providers.max_size = 2
+        first = registry.get(ModelConfig(provider="ollama", model_name="a"))
+        registry.get(ModelConfig(provider="ollama", model_name="b"))
+        registry.get(ModelConfig(provider="ollama", model_name="a"))
+        registry.get(ModelConfig(provider="ollama", model_name="c"))
+        
+        assert sorted(registry.stats()["providers"]) == ["ollama:a", "ollama:c"]
+        assert registry.get(ModelConfig(provider="ollama", model_name="a")).client is first.client
+        assert registry.mock_create.call_count == 3
+        
+        registry.get(ModelConfig(provider="llamacpp", model_name="x"))
+        registry.get(ModelConfig(provider="llamacpp", model_name="y"))
+        assert registry.mock_create.call_count == 4
+        assert "llamacpp" in registry.stats()["providers"]
+
+    def test_unsupported_provider(self):
+        """Test unknown providers are rejected."""
+        with pytest.raises(ValueError):
+            ProviderRegistry().get(ModelConfig(provider="unknown", model_name="x"))
+
+
+class TestLlamaModelHost:
+    """Unit tests for the resident llama.cpp model."""
+
+    @pytest.fixture
+    def llama_cpp(self):
+        module = ModuleType("llama_cpp")
+        module.Llama = MagicMock()
+        with patch.dict(sys.modules, {"llama_cpp": module}):
+            yield module
+
+    async def _use(self, host, times=1):
+        for _ in range(times):
+            async with host.session() as llm:
+                llm.create_chat_completion()
+
+    def test_model_loaded_once(self, llama_cpp):
+        """Test the model is loaded on first use and reused across sessions."""
+        host = LlamaModelHost(model_path="/models/m.gguf", n_ctx=512, n_gpu_layers=0, idle_unload_seconds=0)
+        assert not host.loaded
+
+        asyncio.run(self._use(host, times=3))
+
+        assert host.loaded
+        llama_cpp.Llama.assert_called_once_with(
+            model_path="/models/m.gguf", n_ctx=512, n_gpu_layers=0, verbose=False
+        )
+        assert llama_cpp.Llama.return_value.create_chat_completion.call_count == 3
+
+    def test_idle_model_unloaded(self, llama_cpp):
+        """Test an idle model is unloaded, a recently used one is kept, and reloads on demand."""
+        host = LlamaModelHost(model_path="/models/m.gguf", idle_unload_seconds=60)
+        asyncio.run(self._use(host))
+
+        host._unload_if_idle()
+        assert host.loaded
+
+        host._last_used = time.monotonic() - 61
+        host._unload_if_idle()
+        assert not host.loaded
+        llama_cpp.Llama.return_value.close.assert_called_once()
+
+        asyncio.run(self._use(host))
+        assert host.loaded
+        assert llama_cpp.Llama.call_count == 2
+        host.unload()
+
+    def test_load_failure(self, llama_cpp):
+        """Test a model that fails to load surfaces as RuntimeError."""
+        llama_cpp.Llama.side_effect = ValueError("bad gguf")
+        host = LlamaModelHost(model_path="/models/missing.gguf", idle_unload_seconds=0)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(self._use(host))
+        assert not host.loaded
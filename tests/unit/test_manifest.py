@@ -0,0 +1,70 @@
+"""
+Unit tests for the file manifest.
+"""
+
+import hashlib
+
+import pytest
+
+from mind_q_agent.ingestion.manifest import FileManifest
+
+
+class TestFileManifest:
+    """Unit tests for FileManifest."""
+
+    @pytest.fixture
+    def manifest(self):
+        manifest = FileManifest()
+        yield manifest
+        manifest.close()
+
+    def test_record_and_lookup(self, manifest):
+        manifest.record("/docs/a.txt", 10, 1.5, "raw-a", "doc-a")
+
+        assert manifest.get("/docs/a.txt").doc_hash == "doc-a"
+        assert manifest.is_unchanged("/docs/a.txt", 10, 1.5)
+        assert not manifest.is_unchanged("/docs/a.txt", 10, 2.0)
+        assert not manifest.is_unchanged("/docs/b.txt", 10, 1.5)
+        assert manifest.find_by_raw_hash("raw-a").path == "/docs/a.txt"
+
+    def test_files_without_document_are_not_matched_by_hash(self, manifest):
+        """Test empty files are remembered by stat but never used for byte-identical skips."""
+        manifest.record("/docs/empty.txt", 0, 1.0, "raw-empty", None)
+
+        assert manifest.is_unchanged("/docs/empty.txt", 0, 1.0)
+        assert manifest.find_by_raw_hash("raw-empty") is None
+
+    def test_forget(self, manifest):
+        manifest.record("/docs/a.txt", 10, 1.5, "raw-a", "doc-a")
+        manifest.forget("/docs/a.txt")
+        assert manifest.get("/docs/a.txt") is None
+        assert len(manifest) == 0
+
+    def test_forget_document(self, manifest):
+        """Test every path recorded for a deleted document is forgotten."""
+        manifest.record("/docs/a.txt", 10, 1.5, "raw-a", "doc-a")
+        manifest.record("/docs/copy.txt", 10, 1.5, "raw-a", "doc-a")
+        manifest.record("/docs/b.txt", 10, 1.5, "raw-b", "doc-b")
+
+        assert manifest.forget_document("doc-a") == 2
+        assert manifest.find_by_raw_hash("raw-a") is None
+        assert manifest.get("/docs/b.txt") is not None
+
+    def test_persists_to_disk(self, tmp_path):
+        db_path = str(tmp_path / "state" / "manifest.sqlite3")
+        first = FileManifest(db_path)
+        first.record("/docs/a.txt", 10, 1.5, "raw-a", "doc-a")
+        first.close()
+
+        second = FileManifest(db_path)
+        assert second.is_unchanged("/docs/a.txt", 10, 1.5)
+        second.close()
+
+    def test_hash_file(self, tmp_path):
+        f = tmp_path / "a.bin"
+        f.write_bytes(b"x" * 10)
+        FileManifest.HASH_CHUNK_SIZE = 3
+        try:
+            assert FileManifest.hash_file(f) == hashlib.sha256(b"x" * 10).hexdigest()
+        finally:
+            FileManifest.HASH_CHUNK_SIZE = 1024 * 1024
@@ -0,0 +1,83 @@
+"""
+Unit tests for the shared PDF extractor.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import fitz
+import pytest
+
+from mind_q_agent.ingestion import pdf_extractor
+from mind_q_agent.ingestion.pdf_extractor import PAGE_BREAK, PdfExtractor, page_at, page_offsets
+
+
+def _write_pdf(path, pages):
+    doc = fitz.open()
+    for content in pages:
+        page = doc.new_page()
+        page.insert_text((72, 72), content)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestPdfExtractor:
+    """Unit tests for PdfExtractor."""
+
+    @pytest.fixture
+    def extractor(self):
+        extractor = PdfExtractor(max_workers=3, pages_per_task=2, executor=ThreadPoolExecutor(3))
+        yield extractor
+        extractor.shutdown()
+
+    def test_page_ranges(self, extractor):
+        assert extractor._page_ranges(3) == [(0, 3)]
+        assert extractor._page_ranges(7) == [(0, 3), (3, 6), (6, 7)]
+        assert PdfExtractor(max_workers=1)._page_ranges(100) == [(0, 100)]
+
+    def test_extracts_pages_in_parallel_ranges(self, extractor, tmp_path):
+        """Test pages come back in order with their start offsets."""
+        path = _write_pdf(tmp_path / "doc.pdf", [f"page number {i}" for i in range(7)])
+
+        with patch.object(pdf_extractor, "extract_page_range", wraps=pdf_extractor.extract_page_range) as ranges:
+            result = extractor.extract(path)
+
+        assert ranges.call_count == 3
+        pages = result.text.split(PAGE_BREAK)
+        assert [p.strip() for p in pages] == [f"page number {i}" for i in range(7)]
+        assert result.page_count == 7
+        assert result.page_offsets == page_offsets(result.text)
+        assert result.page_at(result.text.index("page number 4")) == 5
+
+    def test_cache_by_content_hash(self, extractor, tmp_path):
+        """Test identical bytes are parsed once, even under another name."""
+        first = _write_pdf(tmp_path / "a.pdf", ["hello"])
+        copy = tmp_path / "b.pdf"
+        copy.write_bytes(first.read_bytes())
+
+        with patch("mind_q_agent.ingestion.pdf_extractor.fitz.open", wraps=fitz.open) as opened:
+            text = extractor.extract(first).text
+            assert extractor.extract(copy).text == text
+            assert extractor.extract_bytes(first.read_bytes()).text == text
+
+        assert opened.call_count == 1
+        assert extractor.cache.stats()["hits"] == 2
+
+    def test_invalid_pages_per_task(self):
+        with pytest.raises(ValueError):
+            PdfExtractor(pages_per_task=0)
+
+
+class TestPageOffsets:
+    """Tests for the page offset helpers."""
+
+    def test_offsets_and_lookup(self):
+        text = PAGE_BREAK.join(["aa", "bbb", "c"])
+        offsets = page_offsets(text)
+
+        assert offsets == [0, 3, 7]
+        assert page_at(offsets, 0) == 1
+        assert page_at(offsets, 2) == 1
+        assert page_at(offsets, 3) == 2
+        assert page_at(offsets, 7) == 3
@@ -0,0 +1,196 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from mind_q_agent.api.settings import settings
+from mind_q_agent.graph.kuzu_graph import KuzuGraphDB
+from mind_q_agent.rag.context import ContextBuilder
+from mind_q_agent.rag.packer import ContextPacker, TokenCounter
+from mind_q_agent.search.engine import SearchEngine
+
+
+def _hit(doc_hash, text, source):
+    return {"id": doc_hash, "text": text, "score": 0.1, "metadata": {"doc_hash": doc_hash, "source": source}}
+
+
+class TestContextBuilder:
+    """Unit tests for graph-aware RAG context assembly."""
+
+    @pytest.fixture
+    def search_engine(self):
+        engine = MagicMock(spec=SearchEngine)
+        engine.search.side_effect = lambda query, limit=5, where=None, mode=None: (
+            [_hit("g1", "Graph passage.", "/g1.md")] if where else
+            [_hit("v1", "Vector passage.", "/v1.md"), _hit("v2", "Second passage.", "/v2.md")]
+        )
+        return engine
+
+    @pytest.fixture
+    def graph_db(self):
+        graph = MagicMock(spec=KuzuGraphDB)
+        graph.find_concepts.return_value = ["asyncio"]
+        graph.get_related_concepts.return_value = [{"name": "event loop", "weight": 2.0}]
+        graph.get_documents_discussing.return_value = [
+            {"hash": "v2", "via": ["asyncio"], "score": 4.0},
+            {"hash": "g1", "via": ["event loop"], "score": 2.0},
+        ]
+        return graph
+
+    @pytest.fixture
+    def builder(self, search_engine, graph_db):
+        return ContextBuilder(
+            search_engine, graph_db, graph_expansion=True, max_context_tokens=1000,
+            token_counter=TokenCounter(str.split)
+        )
+
+    def test_query_phrases(self):
+        """Test words and n-grams up to three words are candidates."""
+        phrases = ContextBuilder.query_phrases("how does machine learning work?")
+        assert "machine learning" in phrases
+        assert "does machine learning" in phrases
+        assert "how does machine learning" not in phrases
+
+    def test_graph_documents_merged(self, builder, search_engine, graph_db):
+        """Test graph-linked documents are fused with vector hits, deduplicated."""
+        context = builder.retrieve("asyncio event loop", max_docs=2)
+        
+        graph_db.get_related_concepts.assert_called_once_with(["asyncio"], limit=builder.graph_neighbors)
+        graph_db.get_documents_discussing.assert_called_once_with(
+            {"asyncio": 2.0, "event loop": 2.0}, limit=builder.graph_documents
+        )
+        # Only the graph document without a vector hit needs its passage fetched
+        search_engine.search.assert_called_with(
+            "asyncio event loop", limit=1, where={"doc_hash": {"$in": ["g1"]}}, mode="semantic"
+        )
+        # v2 is in both rankings and rises to the top
+        assert [d["id"] for d in context.documents] == ["v2", "v1", "g1"]
+        assert context.documents[2]["graph_concepts"] == ["event loop"]
+        assert "[Source: /g1.md]\nGraph passage." in context.text
+        assert set(context.timings) == {"vector", "graph_link", "graph_expand", "graph_passages", "merge", "pack"}
+
+    def test_budget_and_graph_failure(self, builder, search_engine, graph_db):
+        """Test the token budget drops what does not fit and graph errors keep vector hits."""
+        graph_db.find_concepts.side_effect = RuntimeError("graph locked")
+        block = ContextPacker.format_document({"source": "/v1.md"}, "Vector passage.")
+        builder.max_context_tokens = len(block.split())
+        
+        context = builder.retrieve("query")
+        
+        assert [d["id"] for d in context.documents] == ["v1"]
+        assert context.tokens <= builder.max_context_tokens
+        assert "graph_link" not in context.timings
+
+    def test_no_graph_db_skips_expansion(self, search_engine):
+        """Test a builder without a graph database uses vector hits only."""
+        builder = ContextBuilder(search_engine, graph_expansion=True, token_counter=TokenCounter(str.split))
+
+        context = builder.retrieve("asyncio event loop", max_docs=2)
+
+        assert not builder.graph_expansion
+        assert "graph_link" not in context.timings
+        assert [d["id"] for d in context.documents] == ["v1", "v2"]
+
+    def test_budget_and_tokenizer_per_model(self, search_engine):
+        """Test each model gets its own context window and tokenizer, unknown ones an estimate."""
+        builder = ContextBuilder(search_engine, graph_expansion=False)
+        builder.max_context_tokens = 0
+        builder.models = {
+            "ollama": {"tokenizer": "", "n_ctx": 4096},
+            "ollama/qwen": {"tokenizer": "qwen-vocab", "n_ctx": 8192},
+        }
+        reserve = settings.LLAMACPP_ANSWER_RESERVE
+
+        with patch("mind_q_agent.rag.context.load_tokenizer", return_value=str.split) as load:
+            assert builder.budget_for("ollama", "qwen") == 8192 - reserve
+            assert builder.budget_for("ollama", "llama3") == 4096 - reserve
+            assert builder.budget_for("gemini", "pro") == settings.LLAMACPP_N_CTX - reserve
+
+            assert builder.packer_for("ollama", "qwen").counter.exact
+            assert builder.packer_for("ollama", "qwen") is builder.packer_for("ollama", "qwen")
+            builder.packer_for("ollama", "llama3")
+        assert [c.args[0] for c in load.call_args_list] == ["qwen-vocab", ""]
+
+        builder.max_context_tokens = 100
+        assert builder.budget_for("ollama", "qwen") == 100
+
+    def test_system_prompt_uses_result_text(self, builder):
+        """Test the prompt contains the passages (search results carry 'text')."""
+        prompt = builder.build_system_prompt("asyncio")
+        assert "Vector passage." in prompt
+        assert "No content" not in prompt
+
+    def test_system_prompt_fits_model_context(self, builder):
+        """Test template, query and context together stay within the budget."""
+        from mind_q_agent.llm.prompts.manager import prompt_manager
+        template = len(prompt_manager.get_system_prompt(context=" ").split())
+        builder.graph_expansion = False
+        # Room for the template, margin, the one-word query and one 4-token block
+        builder.max_context_tokens = template + ContextBuilder.PROMPT_MARGIN + 1 + 4
+        
+        prompt = builder.build_system_prompt("asyncio")
+        
+        assert len(prompt.split()) <= template + 4
+        assert "Vector passage." in prompt
+        assert "Second passage." not in prompt
+
+
+class TestContextPacker:
+    """Unit tests for token-budgeted context packing."""
+
+    @pytest.fixture
+    def tokenize(self):
+        return MagicMock(side_effect=str.split)
+
+    @pytest.fixture
+    def packer(self, tokenize):
+        return ContextPacker(TokenCounter(tokenize), min_tokens=4)
+
+    def test_everything_fits_without_tokenizing(self, packer, tokenize):
+        """Test the byte-length bound skips tokenization when all documents fit."""
+        docs = [_hit("a", "One two.", "/a"), _hit("b", "Three.", "/b")]
+        
+        packed, text, tokens = packer.pack(docs, budget=1000)
+        
+        assert [d["id"] for d in packed] == ["a", "b"]
+        assert text.startswith("[Source: /a]\nOne two.")
+        assert tokens <= 1000
+        tokenize.assert_not_called()
+
+    def test_greedy_trim_at_sentence_boundaries(self, packer, tokenize):
+        """Test documents are taken best first and the overflow is trimmed to whole sentences."""
+        docs = [
+            _hit("a", "Alpha beta gamma.", "/a"),
+            _hit("b", "First sentence here. Second sentence here. Third one.", "/b"),
+            _hit("c", "Never reached at all because budget is gone.", "/c"),
+        ]
+        # Blocks cost 2 header tokens + words: a = 5, b's first two sentences = 8
+        packed, text, tokens = packer.pack(docs, budget=13)
+        
+        assert [d["id"] for d in packed] == ["a", "b"]
+        assert packed[1]["trimmed"] is True
+        assert packed[1]["text"] == "First sentence here. Second sentence here."
+        assert tokens == 13
+        assert len(text.split()) == 13
+        
+        # Counts are cached per text
+        calls = tokenize.call_count
+        packer.pack(docs, budget=13)
+        assert tokenize.call_count == calls
+
+    def test_small_remainder_skips_instead_of_trimming(self, packer):
+        """Test a remainder below min_tokens is left for smaller documents."""
+        docs = [
+            _hit("a", "Alpha beta gamma.", "/a"),
+            _hit("b", "A long document. That does not fit.", "/b"),
+            _hit("c", "Tiny.", "/c"),
+        ]
+        packed, _, tokens = packer.pack(docs, budget=8)
+        
+        assert [d["id"] for d in packed] == ["a", "c"]
+        assert tokens == 8
+
+    def test_estimate_without_tokenizer(self):
+        """Test counts fall back to a character estimate."""
+        counter = TokenCounter()
+        assert not counter.exact
+        assert counter.count("") == 0
+        assert counter.count("x" * 40) == 11
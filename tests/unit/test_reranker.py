@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from mind_q_agent.search import reranker as reranker_module
+from mind_q_agent.search.reranker import CrossEncoderReranker
+
+
+class TestCrossEncoderReranker:
+    """Unit tests for the budgeted cross-encoder reranker."""
+
+    @pytest.fixture
+    def model(self):
+        model = MagicMock()
+        # Relevance = passage length, so the expected order is easy to state
+        model.predict.side_effect = lambda pairs, **kwargs: np.array([float(len(p[1])) for p in pairs])
+        return model
+
+    @pytest.fixture
+    def hits(self):
+        return [
+            {"id": f"d:{i}", "document": "x" * length, "distance": 0.1 * i, "metadata": {}}
+            for i, length in enumerate([1, 5, 3, 4])
+        ]
+
+    def test_rerank_orders_by_score(self, model, hits):
+        """Test candidates are reordered by cross-encoder score, in batches."""
+        reranker = CrossEncoderReranker(model=model, batch_size=3, budget_ms=0, cache_size=16)
+        
+        results = reranker.rerank("query", hits)
+        
+        assert [r["id"] for r in results] == ["d:1", "d:3", "d:2", "d:0"]
+        assert results[0]["rerank_score"] == 5.0
+        assert results[0]["distance"] == -5.0
+        assert model.predict.call_count == 2
+        assert reranker.rerank("query", []) == []
+
+    def test_scores_cached_per_query_and_chunk(self, model, hits):
+        """Test repeated pairs are not rescored, but a new query is."""
+        reranker = CrossEncoderReranker(model=model, batch_size=8, budget_ms=0, cache_size=16)
+        
+        reranker.rerank("Query", hits)
+        reranker.rerank("  query ", hits + [{"id": "d:9", "document": "xx"}])
+        
+        assert model.predict.call_count == 2
+        assert len(model.predict.call_args.args[0]) == 1
+        reranker.rerank("other", hits)
+        assert model.predict.call_count == 3
+        assert reranker.stats()["hits"] == 4
+
+    def test_budget_cuts_off_batches(self, model, hits):
+        """Test no batch starts after the budget; unscored hits keep retrieval order."""
+        reranker = CrossEncoderReranker(model=model, batch_size=2, budget_ms=100, cache_size=16)
+        
+        # Deadline set at t=0; the first batch starts at 0.05, the second at 0.2
+        with patch.object(reranker_module.time, "monotonic", side_effect=[0.0, 0.05, 0.2]):
+            results = reranker.rerank("query", hits)
+        
+        assert model.predict.call_count == 1
+        assert [r["id"] for r in results] == ["d:1", "d:0", "d:2", "d:3"]
+        assert "rerank_score" not in results[2]
+        assert reranker.stats()["truncated"] == 1
+
+    def test_batches_sized_to_remaining_budget(self, model, hits):
+        """Test a batch holds only the pairs the remaining budget can pay for."""
+        reranker = CrossEncoderReranker(model=model, batch_size=4, budget_ms=100, cache_size=16)
+        reranker.pair_ms = 30.0
+        
+        # 100 ms left for the first batch (3 pairs at 30 ms), 40 ms for the last pair
+        with patch.object(reranker_module.time, "monotonic", side_effect=[0.0, 0.0, 0.06]):
+            results = reranker.rerank("query", hits)
+        
+        assert [len(c.args[0]) for c in model.predict.call_args_list] == [3, 1]
+        assert [r["id"] for r in results] == ["d:1", "d:3", "d:2", "d:0"]
+        assert reranker.stats()["truncated"] == 0
+
+    def test_skips_until_model_loaded(self, model, hits):
+        """Test searches pass through unscored while the model loads in the background."""
+        with patch.object(reranker_module, "CrossEncoder", return_value=model) as cross_encoder:
+            reranker = CrossEncoderReranker(batch_size=2, budget_ms=0, cache_size=16)
+            with patch.object(reranker, "load_in_background") as load_in_background:
+                assert reranker.rerank("query", hits) == hits
+            load_in_background.assert_called_once()
+            assert reranker.stats()["skipped"] == 1
+            
+            reranker.load()
+            reranker.load()
+        
+        cross_encoder.assert_called_once_with(reranker.model_name)
+        # The warm-up pass measured the cost per pair
+        assert reranker.loaded and reranker.pair_ms is not None
+        assert reranker.rerank("query", hits)[0]["id"] == "d:1"
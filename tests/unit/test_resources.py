@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi import HTTPException
+
+from mind_q_agent.api import resources
+from mind_q_agent.api.resources import ResourceRegistry
+
+
+class TestResourceRegistry:
+    """Unit tests for the shared resource registry."""
+
+    @pytest.fixture
+    def registry(self):
+        with patch.object(resources, "SentenceTransformer") as model_cls, \
+             patch.object(resources, "KuzuGraphDB", side_effect=lambda *a: MagicMock()) as graph_cls, \
+             patch.object(resources, "ChromaVectorDB") as vector_cls, \
+             patch.object(resources, "IngestionPipeline") as pipeline_cls:
+            reg = ResourceRegistry("/tmp/graph", "/tmp/chroma", "test-model")
+            reg.mocks = {
+                "model": model_cls, "graph": graph_cls,
+                "vector": vector_cls, "pipeline": pipeline_cls
+            }
+            yield reg
+
+    def test_single_instances(self, registry):
+        """Test each resource is created exactly once."""
+        assert registry.get_graph_db() is registry.get_graph_db()
+        assert registry.get_vector_db() is registry.get_vector_db()
+        assert registry.get_pipeline() is registry.get_pipeline()
+        assert registry.get_search_engine() is registry.get_search_engine()
+
+        registry.mocks["graph"].assert_called_once_with("/tmp/graph")
+        registry.mocks["model"].assert_called_once_with("test-model")
+        registry.mocks["vector"].assert_called_once()
+        registry.mocks["pipeline"].assert_called_once()
+
+    def test_vector_db_shares_model(self, registry):
+        """Test the vector DB receives the shared embedding model."""
+        registry.get_vector_db()
+        kwargs = registry.mocks["vector"].call_args.kwargs
+        assert kwargs["model"] is registry.get_embedding_model()
+
+    def test_shutdown_releases(self, registry):
+        """Test shutdown closes the graph DB and drops cached handles."""
+        graph = registry.get_graph_db()
+        registry.shutdown()
+        graph.close.assert_called_once()
+        assert registry.get_graph_db() is not graph
+
+    def test_dependency_error_maps_to_http(self):
+        """Test dependency providers surface init failures as HTTP 500."""
+        with patch.object(resources.registry, "get_graph_db", side_effect=RuntimeError("locked")):
+            with pytest.raises(HTTPException) as exc:
+                resources.get_graph_db()
+        assert exc.value.status_code == 500
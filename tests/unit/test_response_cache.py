@@ -0,0 +1,172 @@
+import asyncio
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from mind_q_agent.llm.response_cache import SemanticResponseCache
+from mind_q_agent.vector.chroma_vector import ChromaVectorDB
+
+# Toy embeddings: the two phrasings of the first question are near-identical
+VECTORS = {
+    "what is kuzu?": [1.0, 0.0, 0.0],
+    "what is kuzu": [0.99, 0.05, 0.0],
+    "how do i install chroma?": [0.0, 1.0, 0.0],
+}
+
+
+def _chunk(doc_hash, distance):
+    return {"id": f"{doc_hash}:0", "document": "", "metadata": {"doc_hash": doc_hash}, "distance": distance}
+
+
+class TestSemanticResponseCache:
+    """Unit tests for the semantic answer cache."""
+
+    @pytest.fixture
+    def vector_store(self):
+        store = MagicMock(spec=ChromaVectorDB)
+        store.encode_query.side_effect = lambda text: VECTORS[text.lower()]
+        store.generation = 5
+        store.document_generation.return_value = 0
+        store.documents_added_since.return_value = []
+        # Chunk distances to every query, filtered like the real doc_hash filter
+        store.chunks = [_chunk("d1", 0.2), _chunk("d2", 0.4), _chunk("d2", 0.1)]
+        store.query_by_embedding.side_effect = lambda embedding, n_results=5, where=None: sorted(
+            (c for c in store.chunks if c["metadata"]["doc_hash"] in where["doc_hash"]["$in"]),
+            key=lambda c: c["distance"]
+        )[:n_results]
+        return store
+
+    @pytest.fixture
+    def cache(self, vector_store):
+        return SemanticResponseCache(vector_store, threshold=0.95, max_size=2, ttl=0)
+
+    def test_similar_question_hits_within_scope(self, cache):
+        """Test near-identical questions hit, other models and questions miss."""
+        scope = ("ollama", "qwen2.5:3b")
+        cache.store(scope, "What is Kuzu?", "A graph DB [Source: /kuzu.md]", ["d1"], generation=5)
+        
+        hit = cache.lookup(scope, "what is kuzu")
+        
+        assert hit is not None and hit.response.startswith("A graph DB")
+        assert cache.lookup(("ollama", "llama3"), "What is Kuzu?") is None
+        assert cache.lookup(scope, "How do I install Chroma?") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+    def test_invalidated_when_sources_change_or_closer_documents_arrive(self, cache, vector_store):
+        """Test entries go stale when a source changes or a new document could outrank their context."""
+        scope = ("ollama", "m")
+        cache.store(scope, "What is Kuzu?", "answer", ["d1", "d2"], generation=5)
+        cache.store(scope, "How do I install Chroma?", "no docs answer", [], generation=5)
+        
+        # The weakest context document (d1) sets the cutoff
+        assert cache.lookup(scope, "What is Kuzu?").cutoff == 0.2
+        
+        # A new document farther from the question leaves the grounded answer valid...
+        vector_store.chunks.append(_chunk("d9", 0.7))
+        vector_store.documents_added_since.return_value = ["d9"]
+        assert cache.lookup(scope, "What is Kuzu?") is not None
+        # ...but an answer given without context may now be answerable
+        assert cache.lookup(scope, "How do I install Chroma?") is None
+        
+        vector_store.chunks.append(_chunk("d9", 0.15))
+        assert cache.lookup(scope, "What is Kuzu?") is None
+        
+        cache.store(scope, "What is Kuzu?", "answer", ["d1", "d2"], generation=6)
+        vector_store.documents_added_since.return_value = []
+        vector_store.document_generation.side_effect = lambda h: 7 if h == "d2" else 0
+        assert cache.lookup(scope, "What is Kuzu?") is None
+        assert cache.stats()["stale"] == 3
+        assert cache.stats()["size"] == 0
+
+    def test_lru_eviction_and_empty_answers(self, cache):
+        """Test the least recently used answer is evicted and blank answers are not stored."""
+        scope = ("ollama", "m")
+        cache.store(scope, "What is Kuzu?", "a", ["d1"], generation=5)
+        cache.store(scope, "How do I install Chroma?", "b", ["d2"], generation=5)
+        cache.lookup(scope, "What is Kuzu?")
+        cache.store(scope, "what is kuzu", "c", ["d3"], generation=5)
+        cache.store(scope, "what is kuzu", "   ", ["d3"], generation=5)
+        
+        assert cache.stats()["size"] == 2
+        assert cache.lookup(scope, "How do I install Chroma?") is None
+
+
+    def test_document_generations_from_vector_store(self, tmp_path):
+        """Test ChromaVectorDB stamps the documents each write touches."""
+        import chromadb
+        model = MagicMock()
+        model.encode.side_effect = lambda texts, **kwargs: np.ones((len(texts), 3))
+        store = ChromaVectorDB(
+            str(tmp_path / "chroma"), collection_name="generations", model=model,
+            client=chromadb.EphemeralClient()
+        )
+        store.encode_query = MagicMock(side_effect=lambda text: VECTORS[text.lower()])
+        cache = SemanticResponseCache(store, threshold=0.95, max_size=4, ttl=0)
+        add = lambda doc_hash, embedding: store.add_documents(
+            ["text"], [{"doc_hash": doc_hash, "source": f"/{doc_hash}.md"}], [f"{doc_hash}:0"], embeddings=[embedding]
+        )
+        add("d1", [1.0, 1.0, 0.0])
+        add("d2", [0.0, 1.0, 0.0])
+        cache.store(("ollama", "m"), "What is Kuzu?", "answer", ["d1"], generation=store.generation)
+        
+        # Moving another document, or adding one farther from the question, keeps the answer
+        store.update_document_source("d2", "/moved.md", "moved.md")
+        add("d3", [0.0, 0.0, 1.0])
+        assert store.document_generation("d1") == 1
+        assert store.documents_added_since(2) == ["d3"]
+        assert cache.lookup(("ollama", "m"), "What is Kuzu?") is not None
+        
+        # A closer new document could outrank the context
+        add("d4", [1.0, 0.0, 0.0])
+        assert cache.lookup(("ollama", "m"), "What is Kuzu?") is None
+        
+        cache.store(("ollama", "m"), "What is Kuzu?", "answer", ["d1"], generation=store.generation)
+        store.delete_document("d1")
+        assert store.document_generation("d1") == 6
+        assert cache.lookup(("ollama", "m"), "What is Kuzu?") is None
+
+
+class TestChatServiceCache:
+    """Tests for the answer cache in front of ChatService."""
+
+    @pytest.fixture
+    def chat(self):
+        # The chat router imports every provider SDK
+        return pytest.importorskip("mind_q_agent.api.routers.chat")
+
+    @pytest.fixture
+    def service(self, chat):
+        store = MagicMock(spec=ChromaVectorDB)
+        store.encode_query.side_effect = lambda text: VECTORS[text.lower()]
+        store.generation = 1
+        store.document_generation.return_value = 0
+        store.documents_added_since.return_value = []
+        store.query_by_embedding.return_value = [
+            {"id": "d1:0", "document": "", "metadata": {"doc_hash": "d1"}, "distance": 0.2}
+        ]
+        builder = MagicMock()
+        builder.prepare.return_value = ("system", MagicMock(documents=[{"id": "d1"}]))
+        service = chat.ChatService(builder, SemanticResponseCache(store, threshold=0.95, max_size=8, ttl=0))
+        provider = MagicMock()
+        provider.generate = AsyncMock(return_value="Kuzu is a graph DB [Source: /kuzu.md]")
+        provider.close = AsyncMock()
+        service._get_provider = MagicMock(return_value=provider)
+        return service
+
+    def test_repeat_question_skips_retrieval_and_generation(self, chat, service):
+        """Test a repeated question is answered (and streamed) from the cache."""
+        first = asyncio.run(service.get_response(chat.ChatRequest(message="What is Kuzu?")))
+        again = asyncio.run(service.get_response(chat.ChatRequest(message="what is kuzu")))
+        
+        assert again.response == first.response
+        assert again.sources == ["/kuzu.md"]
+        assert service.context_builder.prepare.call_count == 1
+        assert service._get_provider.call_count == 1
+        # Queries are embedded without touching the persistent embedding cache
+        service.response_cache.vector_store.get_embedding.assert_not_called()
+        
+        async def collect():
+            return [chunk async for chunk in service.stream_response(chat.ChatRequest(message="What is Kuzu?", stream=True))]
+        assert "".join(asyncio.run(collect())) == first.response
+        assert service._get_provider.call_count == 1
@@ -0,0 +1,102 @@
+"""
+Unit tests for the asyncio ingestion runner.
+"""
+
+import asyncio
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from mind_q_agent.ingestion.pipeline import IngestionPipeline
+from mind_q_agent.ingestion.runner import IngestionRunner
+
+
+class TestIngestionRunner:
+    """Unit tests for IngestionRunner."""
+
+    @pytest.fixture
+    def pipeline(self):
+        pipeline = MagicMock(spec=IngestionPipeline)
+        pipeline.process_document.return_value = True
+        pipeline.process_batch.side_effect = lambda docs, progress=None: len(docs)
+        return pipeline
+
+    @pytest.fixture
+    def runner(self, pipeline):
+        return IngestionRunner(pipeline, concurrency=2)
+
+    def test_ingest_awaits_pipeline(self, runner, pipeline):
+        """Test the pipeline coroutine is actually awaited."""
+        result = asyncio.run(runner.ingest(Path("/tmp/a.txt"), "alpha"))
+
+        assert result is True
+        pipeline.process_document.assert_awaited_once_with(Path("/tmp/a.txt"), "alpha", None)
+
+    def test_ingest_reads_missing_text(self, runner, pipeline, tmp_path):
+        """Test path-only documents are read off the event loop."""
+        f = tmp_path / "doc.md"
+        f.write_text("# Title")
+        empty = tmp_path / "empty.txt"
+        empty.write_text("")
+
+        assert asyncio.run(runner.ingest(f)) is True
+        assert asyncio.run(runner.ingest(empty)) is False
+        pipeline.process_document.assert_awaited_once_with(f, "# Title", None)
+
+    def test_concurrency_is_bounded(self, runner, pipeline):
+        """Test no more than `concurrency` documents are in flight."""
+        active = 0
+        peak = 0
+
+        async def process_document(path, text, extracted_data=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return text != "dup"
+
+        pipeline.process_document.side_effect = process_document
+        documents = [(Path(f"/tmp/{i}.txt"), "dup" if i == 0 else f"text {i}") for i in range(8)]
+
+        assert asyncio.run(runner.ingest_many(documents)) == 7
+        assert peak == 2
+
+    def test_ingest_many_isolates_failures(self, runner, pipeline):
+        """Test one failing document does not abort the others."""
+        pipeline.process_document.side_effect = [RuntimeError("boom"), True]
+
+        count = asyncio.run(runner.ingest_many([(Path("/tmp/a.txt"), "a"), (Path("/tmp/b.txt"), "b")]))
+
+        assert count == 1
+
+    def test_ingest_batch(self, runner, pipeline, tmp_path):
+        """Test batches read missing texts, drop empty ones and go through process_batch."""
+        f = tmp_path / "doc.txt"
+        f.write_text("from disk")
+
+        count = asyncio.run(runner.ingest_batch([
+            (f, None), (Path("/tmp/inline.txt"), "inline"), (tmp_path / "missing.txt", None)
+        ]))
+
+        assert count == 2
+        pipeline.process_batch.assert_awaited_once_with(
+            [(f, "from disk"), (Path("/tmp/inline.txt"), "inline")], progress=None
+        )
+
+    def test_shared_across_event_loops(self, runner, pipeline):
+        """Test one runner can serve several threads, each with its own loop."""
+        results = []
+
+        def worker(i):
+            results.append(asyncio.run(runner.ingest(Path(f"/tmp/{i}.txt"), f"text {i}")))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == [True, True, True]
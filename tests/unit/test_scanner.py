@@ -0,0 +1,103 @@
+"""
+Unit tests for the startup catch-up scan.
+"""
+
+import os
+import threading
+import time
+from queue import Queue
+
+import pytest
+
+from mind_q_agent.ingestion.manifest import FileManifest
+from mind_q_agent.watcher.file_watcher import FileWatcher
+from mind_q_agent.watcher.scanner import CatchUpScanner, iter_files
+
+EXTENSIONS = {".txt", ".md", ".pdf"}
+
+
+class TestCatchUpScanner:
+    """Unit tests for CatchUpScanner."""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        (tmp_path / "sub" / "deeper").mkdir(parents=True)
+        (tmp_path / ".hidden").mkdir()
+        files = {
+            "old.txt": 1000, "sub/newest.md": 3000, "sub/deeper/middle.pdf": 2000,
+            "image.png": 4000, ".hidden/secret.txt": 5000
+        }
+        for name, mtime in files.items():
+            f = tmp_path / name
+            f.write_text(name)
+            os.utime(f, (mtime, mtime))
+        return tmp_path
+
+    def test_iter_files_is_recursive(self, tree):
+        names = sorted(os.path.relpath(e.path, tree) for e in iter_files(tree, EXTENSIONS))
+        assert names == ["old.txt", os.path.join("sub", "deeper", "middle.pdf"), os.path.join("sub", "newest.md")]
+
+    def test_queues_only_changed_files_newest_first(self, tree):
+        manifest = FileManifest()
+        old = tree / "old.txt"
+        manifest.record(str(old), old.stat().st_size, old.stat().st_mtime, "raw", "doc")
+        submitted = []
+        scanner = CatchUpScanner(manifest, lambda path, event_type: submitted.append(path) or {}, max_rate=0)
+
+        stats = scanner.scan(tree, EXTENSIONS).snapshot()
+
+        assert [os.path.basename(p) for p in submitted] == ["newest.md", "middle.pdf"]
+        assert stats["scanned"] == 3
+        assert stats["unchanged"] == 1
+        assert stats["queued"] == 2
+        assert stats["scan_rate"] > 0
+
+    def test_rate_limit(self, tree):
+        submitted = []
+        scanner = CatchUpScanner(FileManifest(), lambda *args: submitted.append(time.monotonic()), max_rate=20)
+
+        scanner.scan(tree, EXTENSIONS)
+
+        # Three files at 20/s: the last one no earlier than 0.1s after the first
+        assert submitted[-1] - submitted[0] >= 0.09
+
+    def test_pauses_while_queue_is_busy_and_stops(self, tree):
+        load = [1.0]
+        submitted = []
+        stopping = threading.Event()
+        scanner = CatchUpScanner(
+            FileManifest(), lambda *args: submitted.append(args), max_rate=0, queue_load=lambda: load[0]
+        )
+        thread = threading.Thread(target=scanner.scan, args=(tree, EXTENSIONS, stopping))
+        thread.start()
+        time.sleep(0.3)
+        assert submitted == []
+
+        load[0] = 0.0
+        time.sleep(0.3)
+        stopping.set()
+        thread.join(timeout=1.0)
+        assert len(submitted) == 3
+
+
+class TestWatcherCatchUp:
+    """Tests for the scan run by FileWatcher.start."""
+
+    def test_start_queues_files_added_while_down(self, tmp_path):
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "nested" / "missed.txt").write_text("added while down")
+        queue = Queue()
+        watcher = FileWatcher(str(tmp_path), queue, debounce_window=0.1, manifest=FileManifest(), scan_rate=0)
+
+        watcher.start()
+        try:
+            event = queue.get(timeout=2.0)
+        finally:
+            watcher.stop()
+
+        assert event["filename"] == "missed.txt"
+        assert event["event_type"] == "detected"
+        assert watcher.scanner.stats.queued == 1
+
+    def test_no_scan_without_manifest(self, tmp_path):
+        assert FileWatcher(str(tmp_path), Queue()).scanner is None
@@ -1,6 +1,13 @@
+import numpy as np
 import pytest
 from unittest.mock import MagicMock
-from mind_q_agent.search.engine import SearchEngine
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mind_q_agent.api import resources
+from mind_q_agent.api.routers import search as search_router
+from mind_q_agent.search.engine import SearchEngine, reciprocal_rank_fusion
+from mind_q_agent.search.lexical import LexicalIndex
+from mind_q_agent.search.reranker import CrossEncoderReranker
 from mind_q_agent.vector.chroma_vector import ChromaVectorDB
 
 class TestSearchEngine:
@@ -8,7 +15,9 @@ class TestSearchEngine:
 
     @pytest.fixture
     def mock_vector_store(self):
-        return MagicMock(spec=ChromaVectorDB)
+        store = MagicMock(spec=ChromaVectorDB)
+        store.generation = 0
+        return store
 
     @pytest.fixture
     def search_engine(self, mock_vector_store):
@@ -28,8 +37,10 @@ class TestSearchEngine:
         
         results = search_engine.search("relevant doc", limit=3)
         
-        # Verify vector store call
-        mock_vector_store.query_similar.assert_called_once_with("relevant doc", n_results=3)
+        # Verify vector store call (chunks are over-fetched before collapsing)
+        mock_vector_store.query_similar.assert_called_once_with(
+            "relevant doc", n_results=3 * SearchEngine.CHUNK_OVERFETCH, where=None
+        )
         
         # Verify result format
         assert len(results) == 1
@@ -39,6 +50,25 @@ class TestSearchEngine:
         assert res["score"] == 0.25
         assert res["metadata"]["source"] == "doc1.txt"
 
+    def test_search_collapses_chunks(self, search_engine, mock_vector_store):
+        """Test chunk hits are collapsed to one result per document."""
+        mock_vector_store.query_similar.return_value = [
+            {"id": "docA:3", "document": "best A", "distance": 0.1,
+             "metadata": {"doc_hash": "docA", "chunk_index": 3}},
+            {"id": "docB:0", "document": "best B", "distance": 0.2,
+             "metadata": {"doc_hash": "docB", "chunk_index": 0}},
+            {"id": "docA:1", "document": "worse A", "distance": 0.3,
+             "metadata": {"doc_hash": "docA", "chunk_index": 1}},
+            {"id": "docC:0", "document": "best C", "distance": 0.4,
+             "metadata": {"doc_hash": "docC", "chunk_index": 0}},
+        ]
+        
+        results = search_engine.search("query", limit=2)
+        
+        assert [r["id"] for r in results] == ["docA", "docB"]
+        assert results[0]["text"] == "best A"
+        assert results[0]["metadata"]["chunk_index"] == 3
+
     def test_search_empty_query(self, search_engine, mock_vector_store):
         """Test that empty queries return empty list immediately."""
         results = search_engine.search("   ")
@@ -54,3 +84,178 @@ class TestSearchEngine:
         # Should return empty list and log error (not raise)
         assert results == []
         mock_vector_store.query_similar.assert_called_once()
+
+    def test_results_are_cached_per_generation(self, mock_vector_store):
+        """Test repeat queries hit the cache until the vector store is written to."""
+        mock_vector_store.query_similar.return_value = [
+            {"id": "a:0", "document": "A", "distance": 0.1, "metadata": {"doc_hash": "a"}}
+        ]
+        engine = SearchEngine(mock_vector_store, cache_size=8, cache_ttl=60)
+        
+        first = engine.search("Hello  World", limit=2)
+        first[0]["text"] = "modified by caller"
+        again = engine.search("  hello world ", limit=2)
+        
+        assert mock_vector_store.query_similar.call_count == 1
+        assert again[0]["text"] == "A"
+        # Different limit or filter is a different entry
+        engine.search("hello world", limit=3)
+        engine.search("hello world", limit=2, where={"filename": "a.txt"})
+        assert mock_vector_store.query_similar.call_count == 3
+        
+        # A write to the collection invalidates every entry
+        mock_vector_store.generation = 1
+        engine.search("hello world", limit=2)
+        assert mock_vector_store.query_similar.call_count == 4
+        
+        stats = engine.cache_stats()
+        assert stats["hits"] == 1
+        assert stats["generation"] == 1
+        
+        # search_many answers cached queries without the vector store
+        mock_vector_store.query_many.return_value = [[]]
+        results = engine.search_many(["HELLO world", "other", "other"], limit=2)
+        mock_vector_store.query_many.assert_called_once_with(
+            ["other"], n_results=2 * SearchEngine.CHUNK_OVERFETCH, where=None
+        )
+        assert [len(hits) for hits in results] == [1, 0, 0]
+
+    def test_cache_disabled(self, mock_vector_store):
+        """Test a zero-size cache searches every time."""
+        mock_vector_store.query_similar.return_value = [{"id": "a", "document": "A", "distance": 0.1}]
+        engine = SearchEngine(mock_vector_store, cache_size=0)
+        
+        engine.search("q")
+        engine.search("q")
+        
+        assert mock_vector_store.query_similar.call_count == 2
+        assert engine.cache_stats() == {"enabled": False}
+
+    def test_search_many(self, search_engine, mock_vector_store):
+        """Test several queries go to the vector store in one call, blanks skipped."""
+        mock_vector_store.query_many.return_value = [
+            [{"id": "a:0", "document": "A", "distance": 0.1, "metadata": {"doc_hash": "a"}}],
+            [],
+        ]
+        
+        results = search_engine.search_many(["first", " ", "second"], limit=2)
+        
+        mock_vector_store.query_many.assert_called_once_with(
+            ["first", "second"], n_results=2 * SearchEngine.CHUNK_OVERFETCH, where=None
+        )
+        assert [[r["id"] for r in hits] for hits in results] == [["a"], [], []]
+        
+        mock_vector_store.query_many.side_effect = RuntimeError("down")
+        assert search_engine.search_many(["first"]) == [[]]
+
+    def test_reciprocal_rank_fusion(self):
+        """Test chunks ranked well in both lists rise above single-list leaders."""
+        semantic = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+        lexical = [{"id": "c"}, {"id": "d"}, {"id": "b"}]
+        
+        fused = reciprocal_rank_fusion([semantic, lexical], k=60)
+        
+        assert [r["id"] for r in fused] == ["c", "b", "a", "d"]
+        assert fused[0]["distance"] == pytest.approx(-(1 / 63 + 1 / 61))
+        assert fused[0]["distance"] < fused[-1]["distance"]
+
+    def test_hybrid_and_lexical_modes(self, mock_vector_store):
+        """Test hybrid fuses both rankings and lexical mode never embeds."""
+        lexical = MagicMock(spec=LexicalIndex)
+        lexical.search.return_value = [
+            {"id": "b:0", "document": "B", "distance": -3.0, "metadata": {"doc_hash": "b"}}
+        ]
+        mock_vector_store.query_similar.return_value = [
+            {"id": "a:0", "document": "A", "distance": 0.1, "metadata": {"doc_hash": "a"}},
+            {"id": "b:0", "document": "B", "distance": 0.2, "metadata": {"doc_hash": "b"}},
+        ]
+        engine = SearchEngine(mock_vector_store, cache_size=0, lexical_index=lexical, default_mode="hybrid")
+        
+        assert [r["id"] for r in engine.search("q", limit=2)] == ["b", "a"]
+        lexical.search.assert_called_once_with("q", n_results=2 * SearchEngine.CHUNK_OVERFETCH, where=None)
+        
+        mock_vector_store.query_similar.reset_mock()
+        assert [r["id"] for r in engine.search("q", limit=2, mode="lexical")] == ["b"]
+        assert engine.search_many(["q", "r"], mode="lexical")[1][0]["id"] == "b"
+        mock_vector_store.query_similar.assert_not_called()
+        mock_vector_store.query_many.assert_not_called()
+        
+        # A filter the lexical index cannot apply degrades hybrid to semantic
+        lexical.search.side_effect = ValueError("operators")
+        assert [r["id"] for r in engine.search("q", limit=2, where={"$or": []})] == ["a", "b"]
+        
+        with pytest.raises(ValueError):
+            engine.search("q", mode="fuzzy")
+        # Hybrid is opt-in: the shipped default keeps plain vector ranking
+        assert SearchEngine(mock_vector_store, cache_size=0, lexical_index=lexical).default_mode == "semantic"
+        # Without a lexical index every mode is served semantically
+        assert SearchEngine(mock_vector_store, cache_size=0).search("q", mode="lexical")[0]["id"] == "a"
+
+    def test_rerank_stage(self, mock_vector_store):
+        """Test reranking over-fetches candidates and reorders them before collapsing."""
+        mock_vector_store.query_similar.return_value = [
+            {"id": "a:0", "document": "A", "distance": 0.1, "metadata": {"doc_hash": "a"}},
+            {"id": "b:0", "document": "B", "distance": 0.2, "metadata": {"doc_hash": "b"}},
+        ]
+        reranker = MagicMock(spec=CrossEncoderReranker)
+        reranker.rerank.side_effect = lambda query, hits: [
+            {**hit, "distance": -float(i)} for i, hit in reversed(list(enumerate(hits)))
+        ]
+        reranker.stats.return_value = {"truncated": 0}
+        engine = SearchEngine(mock_vector_store, cache_size=0, reranker=reranker)
+        
+        results = engine.search("q", limit=1)
+        
+        mock_vector_store.query_similar.assert_called_once_with(
+            "q", n_results=engine.rerank_factor, where=None
+        )
+        assert [r["id"] for r in results] == ["b"]
+        assert engine.cache_stats()["rerank"] == {"truncated": 0}
+        
+        # A failing reranker leaves the retrieval order in place
+        reranker.rerank.side_effect = RuntimeError("model missing")
+        assert [r["id"] for r in engine.search("q", limit=1)] == ["a"]
+
+    def test_query_many_single_pass(self, tmp_path):
+        """Test ChromaVectorDB.query_many encodes once and queries Chroma once."""
+        import chromadb
+        model = MagicMock()
+        vectors = {"cat": [1.0, 0.0, 0.0], "dog": [0.0, 1.0, 0.0], "fish": [0.0, 0.0, 1.0]}
+        model.encode.side_effect = lambda texts, **kwargs: np.array([vectors[t] for t in texts])
+        vector_db = ChromaVectorDB(
+            str(tmp_path / "chroma"), collection_name="query_many", model=model,
+            client=chromadb.EphemeralClient()
+        )
+        vector_db.add_documents(["cat", "dog", "fish"], [{"n": i} for i in range(3)], ["c", "d", "f"])
+        model.encode.reset_mock()
+        
+        results = vector_db.query_many(["dog", "cat"], n_results=1)
+        
+        model.encode.assert_called_once()
+        assert [hits[0]["id"] for hits in results] == ["d", "c"]
+        assert vector_db.query_similar("fish", n_results=1)[0]["document"] == "fish"
+        assert vector_db.query_many([]) == []
+
+    def test_batch_endpoint(self, search_engine, mock_vector_store):
+        """Test POST /search/batch returns one result list per query."""
+        mock_vector_store.query_many.return_value = [
+            [{"id": "a:0", "document": "A", "distance": 0.1, "metadata": {"doc_hash": "a"}}],
+            [],
+        ]
+        app = FastAPI()
+        app.include_router(search_router.router)
+        app.dependency_overrides[resources.get_search_engine] = lambda: search_engine
+        with TestClient(app) as client:
+            response = client.post("/search/batch", json={"queries": ["x", "y"], "limit": 3})
+            assert response.status_code == 200
+            body = response.json()
+            assert [entry["query"] for entry in body] == ["x", "y"]
+            assert body[0]["results"][0]["id"] == "a"
+            assert body[1]["results"] == []
+            
+            assert client.post("/search/batch", json={"queries": []}).status_code == 422
+            assert client.get("/search/", params={"q": "x", "mode": "fuzzy"}).status_code == 422
+            
+            stats = client.get("/search/cache")
+            assert stats.status_code == 200
+            assert stats.json()["enabled"] is True
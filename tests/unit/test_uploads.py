@@ -0,0 +1,294 @@
+"""
+Unit tests for background upload ingestion and job tracking.
+"""
+
+import asyncio
+import hashlib
+import io
+import tarfile
+import zipfile
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+from mind_q_agent.api import resources
+from mind_q_agent.api.routers import documents
+from mind_q_agent.ingestion.jobs import BATCH, COMPLETED, DUPLICATE, FAILED, QUEUED, JobStore
+from mind_q_agent.ingestion.runner import IngestionRunner
+from mind_q_agent.ingestion.uploads import ArchiveLimitError, UploadIngestor
+
+
+class TestJobStore:
+    """Unit tests for JobStore."""
+
+    def test_create_and_update(self):
+        store = JobStore()
+        job = store.create("a.txt", size_bytes=3)
+
+        assert store.get(job.id).status == QUEUED
+        store.update(job.id, status=FAILED, error="bad")
+        assert store.get(job.id).to_dict()["error"] == "bad"
+        assert store.get("unknown") is None
+
+    def test_evicts_finished_jobs_first(self):
+        store = JobStore(max_jobs=2)
+        done = store.create("done.txt")
+        store.update(done.id, status=COMPLETED)
+        running = store.create("running.txt")
+        store.create("new.txt")
+
+        assert store.get(done.id) is None
+        assert store.get(running.id) is not None
+
+
+class TestUploadIngestor:
+    """Unit tests for UploadIngestor."""
+
+    @pytest.fixture
+    def runner(self):
+        runner = MagicMock(spec=IngestionRunner)
+        runner.ingest.return_value = True
+        return runner
+
+    @pytest.fixture
+    def uploads(self, runner, tmp_path):
+        return UploadIngestor(runner, JobStore(), upload_dir=str(tmp_path))
+
+    def _upload(self, name, content):
+        return UploadFile(file=io.BytesIO(content), filename=name)
+
+    def test_save_streams_and_hashes(self, uploads, tmp_path):
+        """Test uploads are copied in chunks and hashed incrementally."""
+        uploads.CHUNK_SIZE = 4
+        content = b"hello streaming world"
+
+        path, digest, size = asyncio.run(uploads.save(self._upload("../../evil.txt", content)))
+
+        assert path == tmp_path / "evil.txt"
+        assert path.read_bytes() == content
+        assert digest == hashlib.sha256(content).hexdigest()
+        assert size == len(content)
+        assert not list(tmp_path.glob(".*.part"))
+
+    def test_accept_runs_job_in_background(self, uploads, runner):
+        """Test accept returns a queued job that completes in the background."""
+        async def scenario():
+            job = await uploads.accept(self._upload("doc.txt", b"some text"))
+            assert job.status == QUEUED
+            await uploads.wait()
+            return job
+
+        job = asyncio.run(scenario())
+
+        assert uploads.jobs.get(job.id).status == COMPLETED
+        args = runner.ingest.call_args.args
+        assert args[0].name == "doc.txt"
+        assert args[1] == "some text"
+
+    def test_same_name_uploads_kept_apart(self, uploads, runner):
+        """Test concurrent uploads with the same name are saved to separate paths."""
+        async def scenario():
+            jobs = await asyncio.gather(
+                uploads.accept(self._upload("notes.txt", b"first")),
+                uploads.accept(self._upload("notes.txt", b"second"))
+            )
+            await uploads.wait()
+            return jobs
+
+        first, second = asyncio.run(scenario())
+
+        ingested = {call.args[0]: call.args[1] for call in runner.ingest.call_args_list}
+        assert sorted(ingested.values()) == ["first", "second"]
+        assert len(ingested) == 2
+        assert all(path.name == "notes.txt" for path in ingested)
+        assert first.sha256 == hashlib.sha256(b"first").hexdigest()
+        assert second.sha256 == hashlib.sha256(b"second").hexdigest()
+
+    def test_duplicate_and_empty_uploads(self, uploads, runner):
+        """Test duplicate and unparseable uploads are reported on the job."""
+        runner.ingest.return_value = False
+
+        async def scenario():
+            dup = await uploads.accept(self._upload("dup.md", b"# same"))
+            empty = await uploads.accept(self._upload("empty.txt", b"   "))
+            await uploads.wait()
+            return dup, empty
+
+        dup, empty = asyncio.run(scenario())
+
+        assert uploads.jobs.get(dup.id).status == DUPLICATE
+        assert uploads.jobs.get(empty.id).status == FAILED
+
+
+    def _zip(self, members):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            for name, content in members.items():
+                zf.writestr(name, content)
+        return buffer.getvalue()
+
+    def test_accept_batch_unpacks_archives(self, uploads, runner, tmp_path):
+        """Test batches unpack archives safely and ingest everything through ingest_batch."""
+        async def ingest_batch(documents, progress=None):
+            for path, text in documents:
+                await progress(path, COMPLETED if text != "dup" else DUPLICATE, None)
+            return len(documents)
+        runner.ingest_batch.side_effect = ingest_batch
+
+        archive = self._zip({"../../escape.txt": "escaped", "docs/notes.md": "dup", "image.png": "binary"})
+        tar_buffer = io.BytesIO()
+        with tarfile.open(fileobj=tar_buffer, mode="w:gz") as tf:
+            data = b"from tar"
+            info = tarfile.TarInfo("nested/notes.md")
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+
+        async def scenario():
+            job = await uploads.accept_batch([
+                self._upload("bundle.zip", archive),
+                self._upload("more.tar.gz", tar_buffer.getvalue()),
+                self._upload("empty.txt", b""),
+            ])
+            await uploads.wait()
+            return job
+
+        job = asyncio.run(scenario())
+        result = uploads.jobs.get(job.id).to_dict()
+
+        assert result["kind"] == BATCH
+        assert result["status"] == COMPLETED
+        statuses = {entry["filename"]: entry["status"] for entry in result["files"]}
+        assert statuses == {
+            "escape.txt": COMPLETED, "notes.md": DUPLICATE, "notes-1.md": COMPLETED, "empty.txt": FAILED
+        }
+        assert result["done"] == result["total"] == 4
+        batch_dir = tmp_path / f"batch-{job.id}"
+        assert sorted(p.name for p in batch_dir.iterdir()) == ["empty.txt", "escape.txt", "notes-1.md", "notes.md"]
+        assert not (tmp_path.parent / "escape.txt").exists()
+        runner.ingest_batch.assert_awaited_once()
+
+    def test_failed_batch_save_marks_job_failed(self, uploads, runner, tmp_path):
+        """Test a batch whose files cannot be saved fails its job and leaves no files behind."""
+        good = self._upload("a.txt", b"alpha")
+        bad = self._upload("b.txt", b"beta")
+        bad.read = MagicMock(side_effect=OSError("No space left on device"))
+
+        created = []
+        create = uploads.jobs.create
+
+        def track(*args, **kwargs):
+            created.append(create(*args, **kwargs))
+            return created[-1]
+
+        with patch.object(uploads.jobs, "create", side_effect=track):
+            with pytest.raises(OSError):
+                asyncio.run(uploads.accept_batch([good, bad]))
+
+        job = uploads.jobs.get(created[0].id)
+        assert job.status == FAILED
+        assert "No space left" in job.error
+        assert not (tmp_path / f"batch-{job.id}").exists()
+        runner.ingest_batch.assert_not_called()
+
+    def test_archive_limits_fail_the_batch(self, runner, tmp_path):
+        """Test archives unpacking to too many bytes or files fail the job and leave nothing behind."""
+        archive = self._zip({"a.txt": "x" * 1000, "b.txt": "y" * 1000, "c.txt": "z"})
+        for limits in ({"max_archive_bytes": 1500}, {"max_archive_members": 2}):
+            uploads = UploadIngestor(runner, JobStore(), upload_dir=str(tmp_path), **limits)
+            with pytest.raises(ArchiveLimitError):
+                asyncio.run(uploads.accept_batch([self._upload("bomb.zip", archive)]))
+        assert list(tmp_path.iterdir()) == []
+        runner.ingest_batch.assert_not_called()
+
+    def test_corrupt_archive_is_a_file_error(self, uploads, runner):
+        """Test an unreadable archive is recorded as a failed file of the batch."""
+        runner.ingest_batch.return_value = 0
+
+        async def scenario():
+            job = await uploads.accept_batch([
+                self._upload("broken.zip", b"not a zip"),
+                self._upload("a.txt", b"alpha"),
+            ])
+            await uploads.wait()
+            return job
+
+        result = uploads.jobs.get(asyncio.run(scenario()).id).to_dict()
+
+        broken = next(entry for entry in result["files"] if entry["filename"] == "broken.zip")
+        assert broken["status"] == FAILED
+        assert broken["error"].startswith("Could not unpack archive")
+        assert result["total"] == 2
+
+    def test_batch_progress_events(self, uploads, runner):
+        """Test each finished file of a batch is published on the event bus."""
+        async def ingest_batch(documents, progress=None):
+            for path, _ in documents:
+                await progress(path, COMPLETED, None)
+            return len(documents)
+        runner.ingest_batch.side_effect = ingest_batch
+        emitted = []
+
+        async def emit(event_type, data):
+            emitted.append((event_type, data))
+
+        async def scenario():
+            with patch("mind_q_agent.ingestion.uploads.event_bus") as bus:
+                bus.emit.side_effect = emit
+                await uploads.accept_batch([self._upload("a.txt", b"alpha"), self._upload("b.txt", b"beta")])
+                await uploads.wait()
+
+        asyncio.run(scenario())
+
+        types = [event_type for event_type, _ in emitted]
+        assert types == ["batch_started", "batch_file_progress", "batch_file_progress", "batch_completed"]
+        assert emitted[2][1]["done"] == 2
+        assert emitted[-1][1]["status"] == COMPLETED
+
+
+class TestUploadEndpoints:
+    """Tests for the upload and job status endpoints."""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        runner = MagicMock(spec=IngestionRunner)
+        runner.ingest.return_value = True
+        runner.ingest_batch.return_value = 0
+        jobs = JobStore()
+        uploads = UploadIngestor(runner, jobs, upload_dir=str(tmp_path))
+
+        app = FastAPI()
+        app.include_router(documents.router)
+        app.dependency_overrides[resources.get_upload_ingestor] = lambda: uploads
+        app.dependency_overrides[resources.get_job_store] = lambda: jobs
+        with TestClient(app) as client:
+            yield client
+
+    def test_upload_returns_job_id(self, client):
+        response = client.post("/documents/upload", files={"file": ("a.txt", b"alpha text", "text/plain")})
+
+        assert response.status_code == 202
+        body = response.json()
+        assert body["sha256"] == hashlib.sha256(b"alpha text").hexdigest()
+
+        status = client.get(f"/documents/jobs/{body['job_id']}")
+        assert status.status_code == 200
+        assert status.json()["filename"] == "a.txt"
+
+    def test_unknown_job(self, client):
+        assert client.get("/documents/jobs/nope").status_code == 404
+
+    def test_batch_upload(self, client):
+        response = client.post("/documents/batch", files=[
+            ("files", ("a.txt", b"alpha", "text/plain")),
+            ("files", ("a.txt", b"another alpha", "text/plain")),
+        ])
+
+        assert response.status_code == 202
+        body = response.json()
+        assert body["files"] == ["a.txt", "a-1.txt"]
+
+        status = client.get(f"/documents/jobs/{body['job_id']}").json()
+        assert status["kind"] == "batch"
+        assert status["total"] == 2
@@ -1,6 +1,7 @@
 import queue
 import threading
 import time
+from pathlib import Path
 from unittest.mock import MagicMock, ANY
 
 import pytest
@@ -45,11 +46,8 @@ class TestIngestionWorker:
         
         assert not worker.is_alive()
         
-        # Verify pipeline called
-        mock_pipeline.process_document.assert_called_once()
-        args, _ = mock_pipeline.process_document.call_args
-        assert str(args[0]) == "/tmp/test.txt"
-        assert args[1] == "Hello"
+        # Verify pipeline called with a batch of (path, text) pairs
+        mock_pipeline.process_batch.assert_called_once_with([(Path("/tmp/test.txt"), "Hello")], progress=None)
 
     def test_stop_signal(self, worker, event_queue, mock_pipeline):
         """Test stopping via Sentinel."""
@@ -57,12 +55,13 @@ class TestIngestionWorker:
         event_queue.put("STOP")
         worker.join(timeout=1.0)
         assert not worker.is_alive()
-        mock_pipeline.process_document.assert_not_called()
+        mock_pipeline.process_batch.assert_not_called()
 
-    def test_exception_resilience(self, worker, event_queue, mock_pipeline):
+    def test_exception_resilience(self, event_queue, mock_pipeline):
         """Test worker survives pipeline exceptions."""
-        # 1. First item: causes error
-        mock_pipeline.process_document.side_effect = RuntimeError("Pipeline Boom")
+        # One document per batch; first batch causes error
+        worker = IngestionWorker(event_queue, mock_pipeline, batch_size=1)
+        mock_pipeline.process_batch.side_effect = [RuntimeError("Pipeline Boom"), 1]
         
         event1 = {"filepath": "/tmp/bad.txt", "text": "bad", "filename": "bad.txt"}
         event2 = {"filepath": "/tmp/good.txt", "text": "good", "filename": "good.txt"}
@@ -78,7 +77,7 @@ class TestIngestionWorker:
         assert not worker.is_alive()
         
         # Verify both attempts made
-        assert mock_pipeline.process_document.call_count == 2
+        assert mock_pipeline.process_batch.call_count == 2
         
         # Verify queue Empty
         assert event_queue.empty()
@@ -93,4 +92,40 @@ class TestIngestionWorker:
         worker.join(timeout=1.0)
         
         # Pipeline should NOT be called for invalid item
-        mock_pipeline.process_document.assert_not_called()
+        mock_pipeline.process_batch.assert_not_called()
+
+    def test_queued_events_are_batched(self, worker, event_queue, mock_pipeline):
+        """Test events waiting in the queue are processed as one batch."""
+        for name in ["a", "b", "c"]:
+            event_queue.put({"filepath": f"/tmp/{name}.txt", "text": name, "filename": f"{name}.txt"})
+        event_queue.put("STOP")
+        
+        worker.start()
+        worker.join(timeout=2.0)
+        
+        mock_pipeline.process_batch.assert_called_once_with([
+            (Path("/tmp/a.txt"), "a"), (Path("/tmp/b.txt"), "b"), (Path("/tmp/c.txt"), "c")
+        ], progress=None)
+        assert event_queue.unfinished_tasks == 0
+
+    def test_path_events_follow_batch(self, worker, event_queue, mock_pipeline):
+        """Test deletes and renames end the batch and are applied in queue order."""
+        calls = []
+        mock_pipeline.process_batch.side_effect = lambda batch, progress=None: calls.append("batch") or len(batch)
+        mock_pipeline.remove_document.side_effect = lambda path: calls.append(("remove", path)) or True
+        mock_pipeline.move_document.side_effect = lambda src, dest: calls.append(("move", src, dest)) or True
+        
+        event_queue.put({"filepath": "/tmp/a.txt", "text": "a", "filename": "a.txt"})
+        event_queue.put({"filepath": "/tmp/a.txt", "filename": "a.txt", "event_type": "deleted"})
+        event_queue.put({"filepath": "/tmp/c.txt", "filename": "c.txt", "src_path": "/tmp/b.txt", "event_type": "renamed"})
+        event_queue.put("STOP")
+        
+        worker.start()
+        worker.join(timeout=2.0)
+        
+        assert calls == [
+            "batch",
+            ("remove", Path("/tmp/a.txt")),
+            ("move", Path("/tmp/b.txt"), Path("/tmp/c.txt")),
+        ]
+        assert event_queue.unfinished_tasks == 0